@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Dict, List, Optional
+import httpx
+
+
+DEFAULT_CITIES = ["cdmx", "monterrey", "guadalajara", "cancun", "puebla", "merida", "tijuana", "oaxaca"]
+
+def percentile(values: List[float], percent: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round((len(latencies) + errors) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+async def run_load(
+    base_url: str,
+    cities: List[str],
+    total: int,
+    concurrency: int,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60, transport=transport) as client:
+        async def worker() -> None:
+            nonlocal errors
+            for index in counter:
+                city = cities[index % len(cities)]
+                started = time.perf_counter()
+                try:
+                    response = await client.get("/api/forecast/", params={"city": city})
+                    if response.status_code >= 500:
+                        errors += 1
+                        continue
+                    latencies.append(time.perf_counter() - started)
+                except httpx.HTTPError:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, errors, elapsed)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test /api/forecast/ against a running server.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--cities", default=",".join(DEFAULT_CITIES))
+    parser.add_argument("--label", default="server")
+    parser.add_argument("--output", help="Write the summary as JSON to this file.")
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_load(args.base_url, args.cities.split(","), args.requests, args.concurrency))
+    summary["label"] = args.label
+    summary["concurrency"] = args.concurrency
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(summary, output, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import sys
+import timeit
+from typing import Any, Callable, Dict
+from benchmarks.offline_load import configure_offline_environment
+from benchmarks.results import report
+from benchmarks.stubs import build_onecall, build_places
+
+
+def measure(function: Callable[[], Any], number: int, repeat: int) -> Dict[str, float]:
+    best = min(timeit.repeat(function, number=number, repeat=repeat))
+    return {"calls": number, "us_per_call": round(best / number * 1_000_000, 3)}
+
+def run_micro(number: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    import django
+
+    django.setup()
+    from unittest.mock import Mock
+    from weather.services.city_service_impl import build_cities
+    from weather.services.weather_service_impl import WeatherService
+    from weather.clients.openweather_impl import extract_daily_forecast
+    from weather.json_codec import JsonCodec, get_codec
+    from weather.services.cache_serializers import CompactSerializer
+    from weather.services.projection import ForecastProjection
+    from weather.views import WeatherForecastView
+
+    places = build_places("benchmark", count=20)
+    onecall = build_onecall(19.43, -99.13)
+    weather_service = WeatherService(Mock())
+    view = WeatherForecastView(Mock(), weather_service)
+    cities = build_cities(places)
+    forecasts = [weather_service._build_daily_forecast(onecall) for _ in cities]
+    result = view._build_results(cities[:1], forecasts[:1])[0]
+    raw_onecall = JsonCodec().dumps(onecall)
+    std_codec, fast_codec = JsonCodec(), get_codec()
+    projection = ForecastProjection(days=3, fields=("temperature_max", "weather"))
+    projected = [projection.apply(forecast) for forecast in forecasts]
+
+    return {
+        "build_cities": measure(lambda: build_cities(places), number, repeat),
+        "build_daily_forecast": measure(lambda: weather_service._build_daily_forecast(onecall), number, repeat),
+        "build_response": measure(lambda: view._build_response(cities, forecasts), number, repeat),
+        "build_response_projected": measure(lambda: view._build_response(cities, [projection.apply(forecast) for forecast in forecasts]), number, repeat),
+        "response_bytes": {"bytes": len(view._build_response(cities, forecasts).content)},
+        "response_bytes_projected": {"bytes": len(view._build_response(cities, projected).content)},
+        "decode_onecall_json": measure(lambda: extract_daily_forecast(std_codec.loads(raw_onecall)), number, repeat),
+        f"decode_onecall_{fast_codec.name}": measure(lambda: extract_daily_forecast(fast_codec.loads(raw_onecall)), number, repeat),
+        "forecast_cache_entry": {"bytes": len(CompactSerializer().dumps((0.0, forecasts[0])))},
+        "city_cache_entry": {"bytes": len(CompactSerializer().dumps((0.0, cities)))},
+        "encode_stream_event": measure(lambda: view._encode_stream_event("forecast", result, "ndjson"), number, repeat),
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the forecast hot path.")
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--label", default="micro")
+    parser.add_argument("--output", default="")
+    parser.add_argument("--baseline", default="")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    configure_offline_environment()
+    scenarios = run_micro(args.number, args.repeat)
+    sys.exit(report(args.label, scenarios, args.output, args.baseline, args.tolerance))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+import httpx
+from benchmarks.load_forecast import DEFAULT_CITIES, run_load, summarize
+from benchmarks.results import report
+from benchmarks.stubs import PROFILES, StubUpstreams
+
+
+BASE_URL = "http://testserver"
+
+def configure_offline_environment() -> None:
+    # Must run before Django settings and the container are imported.
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "weather_api.settings")
+    os.environ.setdefault("DJANGO_SECRET_KEY", "benchmark")
+    os.environ["OPENWEATHER_API_KEY"] = "benchmark"
+    os.environ["DJANGO_ALLOWED_HOSTS"] = "testserver"
+    os.environ["GAZETTEER_ENABLED"] = "false"
+    # The stubs have no quota to protect, so the scheduler must not throttle the run.
+    os.environ["OPENWEATHER_RATE_LIMIT_PER_SECOND"] = "1000000"
+    os.environ["OPENWEATHER_RATE_LIMIT_BURST"] = "1000000"
+    os.environ["UPSTREAM_MAX_CONCURRENCY_PER_HOST"] = "100000"
+    os.environ.pop("CACHE_URL", None)
+
+def install_stubs(stubs: StubUpstreams) -> Any:
+    from weather.inject_container import get_container
+
+    container = get_container()
+    container.http_pool.transport = stubs.transport()
+    return container
+
+def reset_caches(container: Any) -> None:
+    container.cache.clear()
+
+def cold_queries(total: int) -> List[str]:
+    return [f"{DEFAULT_CITIES[index % len(DEFAULT_CITIES)]} {index}" for index in range(total)]
+
+def run_asgi(cities: List[str], total: int, concurrency: int) -> Dict[str, float]:
+    from weather_api.asgi import application
+
+    return asyncio.run(run_load(BASE_URL, cities, total, concurrency, transport=httpx.ASGITransport(app=application)))
+
+def run_wsgi(cities: List[str], total: int, concurrency: int) -> Dict[str, float]:
+    from weather_api.wsgi import application
+
+    latencies: List[float] = []
+    errors = 0
+    client = httpx.Client(base_url=BASE_URL, transport=httpx.WSGITransport(app=application), timeout=60)
+
+    def request(index: int) -> None:
+        nonlocal errors
+        started = time.perf_counter()
+        try:
+            response = client.get("/api/forecast/", params={"city": cities[index % len(cities)]})
+        except httpx.HTTPError:
+            errors += 1
+            return
+        if response.status_code >= 500:
+            errors += 1
+            return
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with client, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(request, range(total)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+RUNNERS = {"asgi": run_asgi, "wsgi": run_wsgi}
+
+def run_suite(modes: List[str], total: int, concurrency: int, stubs: StubUpstreams) -> Dict[str, Dict[str, Any]]:
+    container = install_stubs(stubs)
+    scenarios = {}
+    for mode in modes:
+        reset_caches(container)
+        scenarios[f"{mode}_cold"] = RUNNERS[mode](cold_queries(total), total, concurrency)
+        RUNNERS[mode](DEFAULT_CITIES, len(DEFAULT_CITIES), concurrency)
+        scenarios[f"{mode}_warm"] = RUNNERS[mode](DEFAULT_CITIES, total, concurrency)
+    scenarios["upstream_calls"] = dict(stubs.calls)
+    return scenarios
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark /api/forecast/ in-process against stubbed upstream APIs.")
+    parser.add_argument("--modes", default="asgi,wsgi")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--reservamos-profile", choices=PROFILES, default="fast")
+    parser.add_argument("--openweather-profile", choices=PROFILES, default="normal")
+    parser.add_argument("--open-meteo-profile", choices=PROFILES, default="normal")
+    parser.add_argument("--label", default="offline")
+    parser.add_argument("--output", default="", help="Results file, defaults to benchmarks/results/<label>.json.")
+    parser.add_argument("--baseline", default="", help="Results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    configure_offline_environment()
+    stubs = StubUpstreams(PROFILES[args.reservamos_profile], PROFILES[args.openweather_profile], open_meteo=PROFILES[args.open_meteo_profile])
+    scenarios = run_suite(args.modes.split(","), args.requests, args.concurrency, stubs)
+    sys.exit(report(args.label, scenarios, args.output, args.baseline, args.tolerance))
+
+if __name__ == "__main__":
+    main()
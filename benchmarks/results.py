@@ -0,0 +1,64 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Any, Dict, List
+
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "us_per_call", "bytes")
+HIGHER_IS_BETTER = ("rps",)
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def save_results(label: str, scenarios: Dict[str, Dict[str, Any]], path: str = "") -> str:
+    path = path or os.path.join(RESULTS_DIR, f"{label}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    document = {
+        "label": label,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scenarios": scenarios,
+    }
+    with open(path, "w") as output:
+        json.dump(document, output, indent=2)
+    return path
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path) as results_file:
+        return json.load(results_file)["scenarios"]
+
+def compare_results(baseline: Dict[str, Dict[str, Any]], current: Dict[str, Dict[str, Any]], tolerance: float = 0.1) -> List[str]:
+    regressions = []
+    for scenario, metrics in current.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        for metric in LOWER_IS_BETTER + HIGHER_IS_BETTER:
+            if metric not in metrics or not previous.get(metric):
+                continue
+            change = (metrics[metric] - previous[metric]) / previous[metric]
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append(f"{scenario} {metric}: {previous[metric]} -> {metrics[metric]} ({change:+.0%} worse)")
+    return regressions
+
+def report(label: str, scenarios: Dict[str, Dict[str, Any]], output: str = "", baseline: str = "", tolerance: float = 0.1) -> int:
+    print(json.dumps(scenarios, indent=2))
+    print(f"Results written to {save_results(label, scenarios, output)}")
+    if not baseline:
+        return 0
+    regressions = compare_results(load_results(baseline), scenarios, tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(f"No regressions beyond {tolerance:.0%} against {baseline}")
+    return 1 if regressions else 0
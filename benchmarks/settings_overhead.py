@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+import httpx
+from benchmarks.load_forecast import DEFAULT_CITIES, summarize
+from benchmarks.offline_load import BASE_URL, configure_offline_environment, install_stubs
+from benchmarks.results import report
+from benchmarks.stubs import PROFILES, StubUpstreams
+
+
+SETTINGS_PROFILES = {"full": "weather_api.settings", "api": "weather_api.settings_api"}
+
+async def sequential_requests(application: Any, params: Dict[str, str], total: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    async with httpx.AsyncClient(base_url=BASE_URL, transport=httpx.ASGITransport(app=application), timeout=60) as client:
+        started = time.perf_counter()
+        for _ in range(total):
+            request_started = time.perf_counter()
+            response = await client.get("/api/forecast/", params=params)
+            if response.status_code >= 500:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - request_started)
+        elapsed = time.perf_counter() - started
+    return summarize(latencies, errors, elapsed)
+
+def run_child(total: int) -> Dict[str, Dict[str, Any]]:
+    configure_offline_environment()
+    started = time.perf_counter()
+    from weather_api.asgi import application
+
+    startup_ms = round((time.perf_counter() - started) * 1000, 2)
+    install_stubs(StubUpstreams(PROFILES["fast"], PROFILES["fast"]))
+
+    async def run() -> Dict[str, Dict[str, Any]]:
+        # The first request pays for lazy imports; keep it out of both scenarios.
+        await sequential_requests(application, {}, 1)
+        await sequential_requests(application, {"city": DEFAULT_CITIES[0]}, 1)
+        return {
+            "startup": {"mean_ms": startup_ms},
+            "bad_request": await sequential_requests(application, {}, total),
+            "warm_forecast": await sequential_requests(application, {"city": DEFAULT_CITIES[0]}, total),
+        }
+
+    return asyncio.run(run())
+
+def run_profile(settings_module: str, total: int) -> Dict[str, Dict[str, Any]]:
+    # Each profile gets a fresh interpreter: Django settings can only be configured once per process.
+    environment = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.settings_overhead", "--child", "--requests", str(total)],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    scenarios = json.loads(completed.stdout)
+    scenarios["process"] = {"mean_ms": round((time.perf_counter() - started) * 1000, 2)}
+    return scenarios
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare per-request overhead and startup time of the full and API settings profiles.")
+    parser.add_argument("--profiles", default="full,api")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--label", default="settings_overhead")
+    parser.add_argument("--output", default="", help="Results file, defaults to benchmarks/results/<label>.json.")
+    parser.add_argument("--baseline", default="", help="Results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.requests)))
+        return
+
+    scenarios = {}
+    for profile in args.profiles.split(","):
+        for name, metrics in run_profile(SETTINGS_PROFILES[profile], args.requests).items():
+            scenarios[f"{profile}_{name}"] = metrics
+    sys.exit(report(args.label, scenarios, args.output, args.baseline, args.tolerance))
+
+if __name__ == "__main__":
+    main()
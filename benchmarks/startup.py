@@ -0,0 +1,125 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+import httpx
+from benchmarks.load_forecast import percentile
+from benchmarks.offline_load import BASE_URL, configure_offline_environment
+from benchmarks.results import report
+
+
+MANAGE_PY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "manage.py")
+
+async def lifespan_startup(application: Any) -> None:
+    messages = [{"type": "lifespan.startup"}]
+    sent: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        if messages:
+            return messages.pop(0)
+        # Park the lifespan loop like a server would until shutdown.
+        await asyncio.Event().wait()
+
+    async def send(message: Dict[str, Any]) -> None:
+        sent.append(message)
+
+    task = asyncio.ensure_future(application({"type": "lifespan"}, receive, send))
+    while not sent:
+        await asyncio.sleep(0)
+    task.cancel()
+    if sent[0]["type"] != "lifespan.startup.complete":
+        raise RuntimeError(f"ASGI startup failed: {sent[0]}")
+
+def run_child(preload: bool = False) -> Dict[str, float]:
+    configure_offline_environment()
+    timings = {}
+    started = time.perf_counter()
+    import django
+
+    django.setup()
+    timings["django_setup"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    import weather.views  # noqa: F401
+
+    timings["import_views"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    from weather_api.asgi import application
+
+    timings["import_asgi"] = time.perf_counter() - started
+
+    if preload:
+        # What a worker forked from a preloading gunicorn master has left to do.
+        from weather.inject_container import preload as preload_modules
+
+        started = time.perf_counter()
+        preload_modules()
+        timings["preload"] = time.perf_counter() - started
+
+    async def boot() -> None:
+        started = time.perf_counter()
+        await lifespan_startup(application)
+        timings["lifespan_startup"] = time.perf_counter() - started
+        async with httpx.AsyncClient(base_url=BASE_URL, transport=httpx.ASGITransport(app=application)) as client:
+            started = time.perf_counter()
+            await client.get("/api/forecast/")
+            timings["first_response"] = time.perf_counter() - started
+
+    asyncio.run(boot())
+    return timings
+
+def run_process(args: List[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, *args], env=dict(os.environ), capture_output=True, text=True, check=True)
+    return time.perf_counter() - started
+
+def summarize_timings(samples: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 2),
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+    }
+
+def run_suite(runs: int) -> Dict[str, Dict[str, float]]:
+    configure_offline_environment()
+    samples: Dict[str, List[float]] = {"manage_check": [], "worker_ready": []}
+    for _ in range(runs):
+        samples["manage_check"].append(run_process([MANAGE_PY, "check"]))
+        samples["worker_ready"].append(run_process(["-m", "benchmarks.startup", "--child"]))
+        for prefix, extra_args in (("", []), ("preloaded_", ["--preload"])):
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.startup", "--child", *extra_args],
+                env=dict(os.environ),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            for name, value in json.loads(completed.stdout).items():
+                samples.setdefault(prefix + name, []).append(value)
+    return {name: summarize_timings(values) for name, values in samples.items()}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure manage.py and ASGI worker startup time in fresh processes.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--preload", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--label", default="startup")
+    parser.add_argument("--output", default="", help="Results file, defaults to benchmarks/results/<label>.json.")
+    parser.add_argument("--baseline", default="", help="Results file to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.preload)))
+        return
+
+    sys.exit(report(args.label, run_suite(args.runs), args.output, args.baseline, args.tolerance))
+
+if __name__ == "__main__":
+    main()
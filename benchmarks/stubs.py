@@ -0,0 +1,106 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+import httpx
+
+
+RESERVAMOS_HOST = "search.reservamos.mx"
+OPENWEATHER_HOST = "api.openweathermap.org"
+OPEN_METEO_HOST = "api.open-meteo.com"
+
+@dataclass(frozen=True)
+class UpstreamProfile:
+    latency: float = 0.05 # seconds before the stub answers
+    jitter: float = 0.0 # extra uniform random latency in seconds
+    error_rate: float = 0.0 # share of requests answered with error_status
+    error_status: int = 503
+
+    def delay(self, rng: random.Random) -> float:
+        return self.latency + (rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+PROFILES = {
+    "fast": UpstreamProfile(latency=0.005),
+    "normal": UpstreamProfile(latency=0.05, jitter=0.05),
+    "slow": UpstreamProfile(latency=0.3, jitter=0.3),
+    "flaky": UpstreamProfile(latency=0.05, jitter=0.05, error_rate=0.2),
+}
+
+def build_places(query: str, count: int = 3) -> List[Dict[str, Any]]:
+    seed = sum(ord(char) for char in query)
+    return [
+        {
+            "display": f"{query.title()} {index}",
+            "state": "Benchmark",
+            "result_type": "city",
+            "country": "México",
+            "lat": str(round(14 + (seed * (index + 1)) % 18 + index * 0.1, 4)),
+            "long": str(round(-117 + (seed * (index + 3)) % 30 + index * 0.1, 4)),
+        }
+        for index in range(count)
+    ]
+
+def build_onecall(latitude: float, longitude: float, days: int = 8) -> Dict[str, Any]:
+    today = int(time.time()) // 86400 * 86400
+    return {
+        "lat": latitude,
+        "lon": longitude,
+        "timezone": "America/Mexico_City",
+        "current": {"dt": today, "temp": 20.0, "weather": [{"description": "clear sky"}]},
+        "daily": [
+            {
+                "dt": today + day * 86400,
+                "temp": {"day": 21.0, "min": 12.0 + day % 3, "max": 24.0 + day % 4, "night": 14.0},
+                "humidity": 40 + day,
+                "wind_speed": 3.2,
+                "weather": [{"id": 800, "main": "Clear", "description": "clear sky", "icon": "01d"}],
+            }
+            for day in range(days)
+        ],
+    }
+
+def build_open_meteo(latitude: float, longitude: float, days: int = 8) -> Dict[str, Any]:
+    today = int(time.time()) // 86400 * 86400
+    return {
+        "latitude": latitude,
+        "longitude": longitude,
+        "timezone": "America/Mexico_City",
+        "daily_units": {"time": "unixtime", "weather_code": "wmo code", "temperature_2m_max": "°C", "temperature_2m_min": "°C"},
+        "daily": {
+            "time": [today + day * 86400 for day in range(days)],
+            "weather_code": [day % 4 for day in range(days)],
+            "temperature_2m_max": [24.0 + day % 4 for day in range(days)],
+            "temperature_2m_min": [12.0 + day % 3 for day in range(days)],
+        },
+    }
+
+class StubUpstreams:
+    def __init__(
+        self,
+        reservamos: UpstreamProfile = PROFILES["fast"],
+        openweather: UpstreamProfile = PROFILES["normal"],
+        seed: Optional[int] = 0,
+        open_meteo: UpstreamProfile = PROFILES["normal"],
+    ) -> None:
+        self.profiles = {RESERVAMOS_HOST: reservamos, OPENWEATHER_HOST: openweather, OPEN_METEO_HOST: open_meteo}
+        self.calls = {RESERVAMOS_HOST: 0, OPENWEATHER_HOST: 0, OPEN_METEO_HOST: 0}
+        self.rng = random.Random(seed)
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        profile = self.profiles.get(host)
+        if profile is None:
+            return httpx.Response(404)
+        self.calls[host] += 1
+        await asyncio.sleep(profile.delay(self.rng))
+        if profile.error_rate and self.rng.random() < profile.error_rate:
+            return httpx.Response(profile.error_status)
+        if host == RESERVAMOS_HOST:
+            return httpx.Response(201, json=build_places(request.url.params.get("q", "")))
+        if host == OPEN_METEO_HOST:
+            return httpx.Response(200, json=build_open_meteo(float(request.url.params["latitude"]), float(request.url.params["longitude"])))
+        return httpx.Response(200, json=build_onecall(float(request.url.params["lat"]), float(request.url.params["lon"])))
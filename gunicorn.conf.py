@@ -0,0 +1,39 @@
+import multiprocessing
+import os
+
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+
+# ASGI mode runs the async views natively on one event loop per worker, so a
+# worker per core is enough; WSGI mode (sync workers) needs the classic 2n+1.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+_default_workers = multiprocessing.cpu_count() if "uvicorn" in worker_class else multiprocessing.cpu_count() * 2 + 1
+workers = int(os.getenv("GUNICORN_WORKERS", _default_workers))
+
+# The app is imported once in the master and inherited by forked workers; each
+# worker still builds its own container (pools, caches) on first use.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+
+def when_ready(server):
+    if preload_app:
+        from weather.inject_container import preload
+
+        preload()
+
+
+def post_worker_init(worker):
+    # Uvicorn workers warm up through the ASGI lifespan; sync workers build the container here, before taking traffic.
+    if "uvicorn" in worker_class:
+        return
+    from weather.inject_container import get_container
+
+    container = get_container()
+    container.warm_up_caches()
+    container.warm_up_gazetteer()
@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Optional
+from weather.clients.clients_constants import (
+    CIRCUIT_FAILURE_RATE_THRESHOLD,
+    CIRCUIT_HALF_OPEN_MAX_CALLS,
+    CIRCUIT_MIN_CALLS,
+    CIRCUIT_OPEN_DURATION,
+    CIRCUIT_SLOW_CALL_THRESHOLD,
+    CIRCUIT_WINDOW_SIZE,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+)
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+Call = Callable[[], Awaitable[Any]]
+IsError = Callable[[Any], bool]
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = CIRCUIT_FAILURE_RATE_THRESHOLD,
+        slow_call_threshold: float = CIRCUIT_SLOW_CALL_THRESHOLD,
+        window_size: int = CIRCUIT_WINDOW_SIZE,
+        min_calls: int = CIRCUIT_MIN_CALLS,
+        open_duration: float = CIRCUIT_OPEN_DURATION,
+        half_open_max_calls: int = CIRCUIT_HALF_OPEN_MAX_CALLS,
+    ) -> None:
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+
+    def allow_request(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.open_duration:
+                return False
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._half_open_calls >= self.half_open_max_calls:
+                return False
+            self._half_open_calls += 1
+        return True
+
+    def release(self) -> None:
+        # A cancelled call says nothing about the upstream, so its half-open slot goes back to the next probe.
+        if self.state == HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    def record(self, success: bool, latency: float) -> None:
+        failed = not success or latency > self.slow_call_threshold
+        if self.state == HALF_OPEN:
+            self._transition(OPEN if failed else CLOSED)
+            return
+        self._outcomes.append(failed)
+        if self.state == CLOSED and len(self._outcomes) >= self.min_calls and self.failure_rate >= self.failure_rate_threshold:
+            self._transition(OPEN)
+
+    @property
+    def failure_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def _transition(self, state: str) -> None:
+        logger.warning(f"Circuit {self.name} changed from {self.state} to {state}")
+        self.state = state
+        self._half_open_calls = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == CLOSED:
+            self._outcomes.clear()
+
+class LatencyTracker:
+    def __init__(self, window_size: int = 200) -> None:
+        self._latencies: Deque[float] = deque(maxlen=window_size)
+
+    def __len__(self) -> int:
+        return len(self._latencies)
+
+    def record(self, latency: float) -> None:
+        self._latencies.append(latency)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+class ResilientCaller:
+    def __init__(
+        self,
+        breaker: CircuitBreaker,
+        hedging: bool = False,
+        hedge_percentile: float = HEDGE_PERCENTILE,
+        hedge_min_samples: int = HEDGE_MIN_SAMPLES,
+        hedge_min_delay: float = HEDGE_MIN_DELAY,
+    ) -> None:
+        self.breaker = breaker
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_min_delay = hedge_min_delay
+        self.latencies = LatencyTracker()
+
+    async def call(self, call: Call, is_error: IsError, fallback: Any) -> Any:
+        if not self.breaker.allow_request():
+            logger.warning(f"Circuit {self.breaker.name} is open, failing fast")
+            return fallback
+        started = time.monotonic()
+        try:
+            hedge_delay = self._hedge_delay()
+            result = await (self._hedged(call, is_error, hedge_delay) if hedge_delay is not None else call())
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except Exception as e:
+            logger.error(f"Call through circuit {self.breaker.name} failed: {e}")
+            self.breaker.record(False, time.monotonic() - started)
+            return fallback
+        latency = time.monotonic() - started
+        failed = is_error(result)
+        self.breaker.record(not failed, latency)
+        if not failed:
+            self.latencies.record(latency)
+        return result
+
+    def _hedge_delay(self) -> Optional[float]:
+        if not self.hedging or self.breaker.state != CLOSED or len(self.latencies) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, self.latencies.percentile(self.hedge_percentile))
+
+    async def _hedged(self, call: Call, is_error: IsError, hedge_delay: float) -> Any:
+        primary = asyncio.ensure_future(call())
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        hedge = asyncio.ensure_future(call())
+        pending = {primary, hedge}
+        result, error = None, None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    result = task.result()
+                    if not is_error(result):
+                        return result
+            if result is None and error is not None:
+                raise error
+            return result
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,70 @@
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 30.0 # seconds
+HTTP_CONNECT_TIMEOUT = 3.0 # seconds
+HTTP_READ_TIMEOUT = 10.0 # seconds
+HTTP_WRITE_TIMEOUT = 5.0 # seconds
+HTTP_POOL_TIMEOUT = 5.0 # seconds
+
+OPENWEATHER_RATE_LIMIT_PER_SECOND = 1.0 # 60 calls/minute API plan
+OPENWEATHER_RATE_LIMIT_BURST = 30
+UPSTREAM_MAX_CONCURRENCY_PER_HOST = 10
+UPSTREAM_MAX_RETRIES = 2
+UPSTREAM_BACKOFF_BASE = 0.5 # seconds
+UPSTREAM_BACKOFF_MAX = 8.0 # seconds
+UPSTREAM_RETRY_STATUS_CODES = (429, 503)
+MIN_REQUEST_TIMEOUT = 0.05 # seconds, below this the deadline is treated as already expired
+
+CIRCUIT_FAILURE_RATE_THRESHOLD = 0.5
+CIRCUIT_SLOW_CALL_THRESHOLD = 5.0 # seconds, slower calls count as failures
+CIRCUIT_WINDOW_SIZE = 20 # most recent calls considered
+CIRCUIT_MIN_CALLS = 10 # calls in the window before the breaker can open
+CIRCUIT_OPEN_DURATION = 30.0 # seconds before half-open probing
+CIRCUIT_HALF_OPEN_MAX_CALLS = 1
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.2 # seconds
+
+RESERVAMOS_PLACE_FIELDS = ("display", "state", "result_type", "country", "lat", "long", "popularity") # kept from each place, the rest is dropped after decoding
+
+OPEN_METEO_DAILY_FIELDS = "weather_code,temperature_2m_max,temperature_2m_min"
+OPEN_METEO_FORECAST_DAYS = 8 # same horizon as the OpenWeather daily forecast
+OPEN_METEO_WEATHER_DESCRIPTIONS = { # WMO weather codes, worded like OpenWeather descriptions
+    0: "clear sky",
+    1: "mainly clear",
+    2: "partly cloudy",
+    3: "overcast clouds",
+    45: "fog",
+    48: "depositing rime fog",
+    51: "light intensity drizzle",
+    53: "drizzle",
+    55: "heavy intensity drizzle",
+    56: "light freezing drizzle",
+    57: "freezing drizzle",
+    61: "light rain",
+    63: "moderate rain",
+    65: "heavy intensity rain",
+    66: "light freezing rain",
+    67: "freezing rain",
+    71: "light snow",
+    73: "snow",
+    75: "heavy snow",
+    77: "snow grains",
+    80: "light intensity shower rain",
+    81: "shower rain",
+    82: "heavy intensity shower rain",
+    85: "light shower snow",
+    86: "heavy shower snow",
+    95: "thunderstorm",
+    96: "thunderstorm with light hail",
+    99: "thunderstorm with heavy hail",
+}
+OPEN_METEO_UNKNOWN_DESCRIPTION = "unknown"
+
+FORECAST_PROVIDER_NAMES = ("openweather", "open_meteo")
+FORECAST_PROVIDERS = "openweather,open_meteo" # in preference order until latency has been observed
+PROVIDER_WINDOW_SIZE = 20 # most recent calls per provider used for routing
+PROVIDER_MAX_ERROR_RATE = 0.5 # providers failing more often are tried last
+PROVIDER_LATENCY_PERCENTILE = 50
+PROVIDER_RACE_WIDTH = 2 # providers queried at once when racing
+PROVIDER_PROBE_RATE = 0.05 # share of calls sent to another provider first, keeping its latency and error rate current
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Deque, List, Sequence, Tuple
+from weather.clients.circuit_breaker import LatencyTracker
+from weather.clients.clients_constants import (
+    PROVIDER_LATENCY_PERCENTILE,
+    PROVIDER_MAX_ERROR_RATE,
+    PROVIDER_PROBE_RATE,
+    PROVIDER_RACE_WIDTH,
+    PROVIDER_WINDOW_SIZE,
+)
+from weather.clients.openweather import IOpenWeatherClient, WeatherResponse
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class ForecastProvider:
+    def __init__(self, name: str, client: IOpenWeatherClient, window_size: int = PROVIDER_WINDOW_SIZE) -> None:
+        self.name = name
+        self.client = client
+        self.latencies = LatencyTracker(window_size)
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+
+    @property
+    def error_rate(self) -> float:
+        return sum(self._outcomes) / len(self._outcomes) if self._outcomes else 0.0
+
+    def latency(self, percent: float = PROVIDER_LATENCY_PERCENTILE) -> float:
+        # Unmeasured providers rank as fastest, so each one is tried until it has a sample.
+        latency = self.latencies.percentile(percent)
+        return 0.0 if latency is None else latency
+
+    def record(self, success: bool, latency: float) -> None:
+        self._outcomes.append(not success)
+        if success:
+            self.latencies.record(latency)
+
+    async def get_weather(self, latitude: float, longitude: float) -> WeatherResponse:
+        started = time.monotonic()
+        try:
+            weather_data = await self.client.get_weather(latitude, longitude)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Forecast provider {self.name} failed: {e}")
+            weather_data = {}
+        self.record(is_good_answer(weather_data), time.monotonic() - started)
+        return weather_data
+
+class CompositeForecastClient(IOpenWeatherClient):
+    def __init__(
+        self,
+        providers: Sequence[Tuple[str, IOpenWeatherClient]],
+        racing: bool = False,
+        race_width: int = PROVIDER_RACE_WIDTH,
+        max_error_rate: float = PROVIDER_MAX_ERROR_RATE,
+        probe_rate: float = PROVIDER_PROBE_RATE,
+    ) -> None:
+        if not providers:
+            raise ValueError("CompositeForecastClient needs at least one provider.")
+        self.providers = [ForecastProvider(name, client) for name, client in providers]
+        self.racing = racing
+        self.race_width = race_width
+        self.max_error_rate = max_error_rate
+        self.probe_rate = probe_rate
+
+    def ranked_providers(self) -> List[ForecastProvider]:
+        # Healthy providers first, fastest first; ties (no samples yet) keep the configured order.
+        providers = sorted(self.providers, key=lambda provider: (provider.error_rate > self.max_error_rate, provider.latency()))
+        if len(providers) > 1 and random.random() < self.probe_rate:
+            # Samples only come from calls, so a few go to another provider first to notice when it recovers or speeds up.
+            probe = random.choice(providers[1:])
+            providers.remove(probe)
+            providers.insert(0, probe)
+        return providers
+
+    async def get_weather(self, latitude: float, longitude: float) -> WeatherResponse:
+        providers = self.ranked_providers()
+        if self.racing and len(providers) > 1:
+            weather_data = await self._race(providers[:self.race_width], latitude, longitude)
+            if is_good_answer(weather_data):
+                return weather_data
+            providers = providers[self.race_width:]
+        for provider in providers:
+            weather_data = await provider.get_weather(latitude, longitude)
+            if is_good_answer(weather_data):
+                return weather_data
+            logger.warning(f"Forecast provider {provider.name} returned no data for (lat: {latitude}, lon: {longitude})")
+        return {}
+
+    async def _race(self, providers: List[ForecastProvider], latitude: float, longitude: float) -> WeatherResponse:
+        pending = {asyncio.ensure_future(provider.get_weather(latitude, longitude)) for provider in providers}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if is_good_answer(task.result()):
+                        return task.result()
+            return {}
+        finally:
+            for task in pending:
+                task.cancel()
+
+def is_good_answer(weather_data: WeatherResponse) -> bool:
+    return bool(weather_data and weather_data.get("daily"))
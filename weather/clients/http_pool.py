@@ -0,0 +1,125 @@
+import asyncio
+import importlib.util
+import logging
+import ssl
+from typing import AsyncIterator, Dict, Optional
+import httpx
+from weather import deadline
+from weather.clients.clients_constants import (
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_POOL_TIMEOUT,
+    HTTP_READ_TIMEOUT,
+    HTTP_WRITE_TIMEOUT,
+    MIN_REQUEST_TIMEOUT,
+)
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+class HttpClientPool:
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        write_timeout: float = HTTP_WRITE_TIMEOUT,
+        pool_timeout: float = HTTP_POOL_TIMEOUT,
+        http2: Optional[bool] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=write_timeout,
+            pool=pool_timeout,
+        )
+        self.http2 = HTTP2_AVAILABLE if http2 is None else http2 and HTTP2_AVAILABLE
+        self.transport = transport
+        self._clients: Dict[asyncio.AbstractEventLoop, httpx.AsyncClient] = {}
+        self._closers: Dict[asyncio.AbstractEventLoop, AsyncIterator[None]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+
+    def ssl_context(self) -> ssl.SSLContext:
+        # Loading the CA bundle takes tens of milliseconds, so the clients of every event loop share one context.
+        if self._ssl_context is None:
+            self._ssl_context = httpx.create_ssl_context()
+        return self._ssl_context
+
+    def get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            self._discard_closed_loops()
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                timeout=self.timeout,
+                http2=self.http2,
+                transport=self.transport,
+                verify=self.ssl_context() if self.transport is None else True,
+            )
+            self._clients[loop] = client
+            self._close_with_loop(loop, client)
+        return client
+
+    def request_timeout(self) -> httpx.Timeout:
+        time_left = deadline.remaining()
+        if time_left is None:
+            return self.timeout
+        if time_left < MIN_REQUEST_TIMEOUT:
+            raise httpx.TimeoutException("Request deadline exceeded before sending")
+        return httpx.Timeout(
+            connect=min(self.timeout.connect, time_left),
+            read=min(self.timeout.read, time_left),
+            write=min(self.timeout.write, time_left),
+            pool=min(self.timeout.pool, time_left),
+        )
+
+    async def aclose(self) -> None:
+        loop = asyncio.get_running_loop()
+        closer = self._closers.pop(loop, None)
+        if closer is not None:
+            await closer.aclose()
+        client = self._clients.pop(loop, None)
+        if client is not None and not client.is_closed:
+            await client.aclose()
+        self._discard_closed_loops()
+        if self._clients:
+            logger.warning(f"{len(self._clients)} pooled HTTP clients belong to other event loops and were not closed")
+
+    def _close_with_loop(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+        # asyncio.run (and async_to_sync, which WSGI mode runs per request) finalizes async generators before
+        # closing the loop, so a started generator closes the client on its own loop instead of leaking its sockets.
+        closer = self._close_on_loop_shutdown(loop, client)
+        try:
+            closer.asend(None).send(None)
+        except StopIteration:
+            pass
+        self._closers[loop] = closer
+
+    async def _close_on_loop_shutdown(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            if self._clients.get(loop) is client:
+                del self._clients[loop]
+            self._closers.pop(loop, None)
+            await client.aclose()
+
+    def _discard_closed_loops(self) -> None:
+        for loop in [loop for loop in self._clients if loop.is_closed()]:
+            logger.warning("Dropping a pooled HTTP client whose event loop closed without finalizing it")
+            del self._clients[loop]
+            self._closers.pop(loop, None)
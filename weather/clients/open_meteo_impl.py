@@ -0,0 +1,84 @@
+import logging
+from typing import Any, Dict, Optional
+import httpx
+from weather import metrics
+from weather.clients.clients_constants import (
+    OPEN_METEO_DAILY_FIELDS,
+    OPEN_METEO_FORECAST_DAYS,
+    OPEN_METEO_UNKNOWN_DESCRIPTION,
+    OPEN_METEO_WEATHER_DESCRIPTIONS,
+)
+from weather.clients.http_pool import HttpClientPool
+from weather.clients.scheduler import UpstreamScheduler
+from weather.clients.openweather import IOpenWeatherClient, WeatherData, WeatherResponse
+from weather.json_codec import JsonCodec, get_codec
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class OpenMeteoClient(IOpenWeatherClient):
+    BASE_URL = "https://api.open-meteo.com/v1/forecast"
+    HOST = "api.open-meteo.com"
+
+    def __init__(
+        self,
+        http_pool: Optional[HttpClientPool] = None,
+        scheduler: Optional[UpstreamScheduler] = None,
+        codec: Optional[JsonCodec] = None,
+        forecast_days: int = OPEN_METEO_FORECAST_DAYS,
+    ) -> None:
+        self.http_pool = http_pool or HttpClientPool()
+        self.scheduler = scheduler
+        self.codec = codec or get_codec()
+        self.forecast_days = forecast_days
+
+    async def get_weather(self, latitude: float, longitude: float) -> WeatherResponse:
+        url = (
+            f"{self.BASE_URL}?latitude={latitude}&longitude={longitude}&daily={OPEN_METEO_DAILY_FIELDS}"
+            f"&forecast_days={self.forecast_days}&timezone=auto&timeformat=unixtime"
+        )
+        try:
+            response = await self._send(url)
+
+            if response.status_code == 200:
+                return normalize_daily_forecast(self.codec.loads(response.content))
+            else:
+                logger.warning(f"Request to Open-Meteo API failed for coordinates (lat: {latitude}, lon: {longitude}): Status Code {response.status_code}")
+                response.raise_for_status()
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error when requesting {url}: {e}")
+            return {}
+        except Exception as e:
+            logger.error(f"Unknown error when requesting {url} for coordinates (lat: {latitude}, lon: {longitude}): {e}")
+            return {}
+
+    async def _send(self, url: str) -> httpx.Response:
+        client = self.http_pool.get_client()
+        with metrics.observe_upstream(self.HOST) as record_status:
+            if self.scheduler is None:
+                response = await client.get(url, timeout=self.http_pool.request_timeout())
+            else:
+                response = await self.scheduler.send(self.HOST, lambda: client.get(url, timeout=self.http_pool.request_timeout()))
+            record_status(response.status_code)
+        return response
+
+def normalize_daily_forecast(payload: Dict[str, Any]) -> WeatherData:
+    # Open-Meteo returns one array per field; rebuild the OpenWeather daily rows WeatherService reads.
+    daily = payload.get("daily") or {}
+    return {
+        "daily": [
+            {
+                "dt": dt,
+                "temp": {"min": temperature_min, "max": temperature_max},
+                "weather": [{"description": OPEN_METEO_WEATHER_DESCRIPTIONS.get(weather_code, OPEN_METEO_UNKNOWN_DESCRIPTION)}],
+            }
+            for dt, temperature_max, temperature_min, weather_code in zip(
+                daily.get("time") or [],
+                daily.get("temperature_2m_max") or [],
+                daily.get("temperature_2m_min") or [],
+                daily.get("weather_code") or [],
+            )
+            if temperature_max is not None and temperature_min is not None
+        ]
+    }
@@ -1,6 +1,11 @@
 import logging
+from typing import Optional
 import httpx
-from weather.clients.openweather import IOpenWeatherClient, WeatherResponse
+from weather import metrics
+from weather.clients.http_pool import HttpClientPool
+from weather.clients.scheduler import UpstreamScheduler
+from weather.clients.openweather import IOpenWeatherClient, WeatherData, WeatherResponse
+from weather.json_codec import JsonCodec, get_codec
 
 
 logger = logging.getLogger(__name__)
@@ -8,21 +13,30 @@ logger.setLevel(logging.INFO)
 
 class OpenWeatherClient(IOpenWeatherClient):
     BASE_URL = "https://api.openweathermap.org/data/2.5/onecall"
+    HOST = "api.openweathermap.org"
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        http_pool: Optional[HttpClientPool] = None,
+        scheduler: Optional[UpstreamScheduler] = None,
+        codec: Optional[JsonCodec] = None,
+    ) -> None:
         self.api_key = api_key
+        self.http_pool = http_pool or HttpClientPool()
+        self.scheduler = scheduler
+        self.codec = codec or get_codec()
 
     async def get_weather(self, latitude: float, longitude: float) -> WeatherResponse:
         url = (
-            f"{self.BASE_URL}?lat={latitude}&lon={longitude}&exclude=hourly,minutely"
+            f"{self.BASE_URL}?lat={latitude}&lon={longitude}&exclude=current,minutely,hourly,alerts"
             f"&units=metric&appid={self.api_key}"
         )
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
+            response = await self._send(url)
 
             if response.status_code == 200:
-                return response.json()
+                return extract_daily_forecast(self.codec.loads(response.content))
             else:
                 logger.warning(f"Request to OpenWeather API failed for coordinates (lat: {latitude}, lon: {longitude}): Status Code {response.status_code}")
                 response.raise_for_status()
@@ -32,3 +46,26 @@ class OpenWeatherClient(IOpenWeatherClient):
         except Exception as e:
             logger.error(f"Unknown error when requesting {url} for coordinates (lat: {latitude}, lon: {longitude}): {e}")
             return {}
+
+    async def _send(self, url: str) -> httpx.Response:
+        client = self.http_pool.get_client()
+        with metrics.observe_upstream(self.HOST) as record_status:
+            if self.scheduler is None:
+                response = await client.get(url, timeout=self.http_pool.request_timeout())
+            else:
+                response = await self.scheduler.send(self.HOST, lambda: client.get(url, timeout=self.http_pool.request_timeout()))
+            record_status(response.status_code)
+        return response
+
+def extract_daily_forecast(payload: WeatherData) -> WeatherData:
+    # Only the fields read by WeatherService are kept, so cached and in-flight payloads stay small.
+    return {
+        "daily": [
+            {
+                "dt": day["dt"],
+                "temp": {"min": day["temp"]["min"], "max": day["temp"]["max"]},
+                "weather": [{"description": weather["description"]} for weather in day["weather"][:1]],
+            }
+            for day in payload.get("daily") or []
+        ]
+    }
@@ -1,6 +1,12 @@
 import logging
+from typing import Optional
 import httpx
-from weather.clients.reservamos import IReservamosClient, CityListResponse
+from weather.clients.clients_constants import RESERVAMOS_PLACE_FIELDS
+from weather import metrics
+from weather.clients.http_pool import HttpClientPool
+from weather.clients.scheduler import UpstreamScheduler
+from weather.clients.reservamos import IReservamosClient, CityData, CityListResponse
+from weather.json_codec import JsonCodec, get_codec
 
 
 logger = logging.getLogger(__name__)
@@ -8,15 +14,25 @@ logger.setLevel(logging.INFO)
 
 class ReservamosClient(IReservamosClient):
     BASE_URL = "https://search.reservamos.mx/api/v2/places"
+    HOST = "search.reservamos.mx"
+
+    def __init__(
+        self,
+        http_pool: Optional[HttpClientPool] = None,
+        scheduler: Optional[UpstreamScheduler] = None,
+        codec: Optional[JsonCodec] = None,
+    ) -> None:
+        self.http_pool = http_pool or HttpClientPool()
+        self.scheduler = scheduler
+        self.codec = codec or get_codec()
 
     async def get_cities(self, city_name: str) -> CityListResponse:
         url: str = f"{self.BASE_URL}?q={city_name}"
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
+            response = await self._send(url)
 
             if response.status_code == 201:
-                return response.json()
+                return [extract_place(place) for place in self.codec.loads(response.content)]
             else:
                 logger.warning(f"Request to Reservamos API failed for {city_name}: Status Code {response.status_code}")
                 response.raise_for_status()
@@ -26,3 +42,16 @@ class ReservamosClient(IReservamosClient):
         except Exception as e:
             logger.error(f"Unknown error when requesting {url} with city '{city_name}': {e}")
             return None
+
+    async def _send(self, url: str) -> httpx.Response:
+        client = self.http_pool.get_client()
+        with metrics.observe_upstream(self.HOST) as record_status:
+            if self.scheduler is None:
+                response = await client.get(url, timeout=self.http_pool.request_timeout())
+            else:
+                response = await self.scheduler.send(self.HOST, lambda: client.get(url, timeout=self.http_pool.request_timeout()))
+            record_status(response.status_code)
+        return response
+
+def extract_place(place: CityData) -> CityData:
+    return {field: place[field] for field in RESERVAMOS_PLACE_FIELDS if field in place}
@@ -0,0 +1,28 @@
+from weather.clients.circuit_breaker import ResilientCaller
+from weather.clients.openweather import IOpenWeatherClient, WeatherResponse
+from weather.clients.reservamos import IReservamosClient, CityListResponse
+
+
+class ResilientOpenWeatherClient(IOpenWeatherClient):
+    def __init__(self, client: IOpenWeatherClient, caller: ResilientCaller) -> None:
+        self.client = client
+        self.caller = caller
+
+    async def get_weather(self, latitude: float, longitude: float) -> WeatherResponse:
+        return await self.caller.call(
+            lambda: self.client.get_weather(latitude, longitude),
+            is_error=lambda weather_data: not weather_data,
+            fallback={},
+        )
+
+class ResilientReservamosClient(IReservamosClient):
+    def __init__(self, client: IReservamosClient, caller: ResilientCaller) -> None:
+        self.client = client
+        self.caller = caller
+
+    async def get_cities(self, city_name: str) -> CityListResponse:
+        return await self.caller.call(
+            lambda: self.client.get_cities(city_name),
+            is_error=lambda places: places is None,
+            fallback=None,
+        )
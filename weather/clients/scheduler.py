@@ -0,0 +1,166 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+import httpx
+from weather import deadline
+from weather.clients.clients_constants import (
+    UPSTREAM_BACKOFF_BASE,
+    UPSTREAM_BACKOFF_MAX,
+    UPSTREAM_MAX_CONCURRENCY_PER_HOST,
+    UPSTREAM_MAX_RETRIES,
+    UPSTREAM_RETRY_STATUS_CODES,
+)
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+PRIORITY_HIGH = 0 # a user request is waiting on a cache miss
+PRIORITY_LOW = 10 # background refreshes and cache warming
+
+request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_HIGH)
+
+@contextmanager
+def priority(value: int) -> Iterator[None]:
+    token = request_priority.set(value)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def try_acquire(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+Waiter = Tuple[int, int, str, asyncio.Future]
+
+class UpstreamScheduler:
+    def __init__(
+        self,
+        max_concurrency_per_host: int = UPSTREAM_MAX_CONCURRENCY_PER_HOST,
+        max_retries: int = UPSTREAM_MAX_RETRIES,
+        backoff_base: float = UPSTREAM_BACKOFF_BASE,
+        backoff_max: float = UPSTREAM_BACKOFF_MAX,
+    ) -> None:
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._waiters: List[Waiter] = []
+        self._sequence = itertools.count()
+        self._wakeups: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.TimerHandle]" = weakref.WeakKeyDictionary()
+
+    def set_rate_limit(self, host: str, rate: float, burst: float) -> None:
+        self._buckets[host] = TokenBucket(rate, burst)
+
+    async def send(self, host: str, request: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        attempt = 0
+        while True:
+            await asyncio.wait_for(self._acquire(host), timeout=deadline.remaining())
+            try:
+                response = await request()
+            finally:
+                self._release(host)
+            if response.status_code not in UPSTREAM_RETRY_STATUS_CODES or attempt >= self.max_retries:
+                return response
+            delay = self._retry_delay(response, attempt)
+            time_left = deadline.remaining()
+            if time_left is not None and delay >= time_left:
+                return response
+            logger.warning(f"{host} answered {response.status_code}, retrying in {delay:.2f}s (attempt {attempt + 1}/{self.max_retries})")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _acquire(self, host: str) -> None:
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (request_priority.get(), next(self._sequence), host, future))
+        self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(host)
+            raise
+
+    def _release(self, host: str) -> None:
+        self._in_flight[host] -= 1
+        self._pump()
+
+    def _pump(self) -> None:
+        waiting: List[Waiter] = []
+        next_token_in: Optional[float] = None
+        while self._waiters:
+            waiter = heapq.heappop(self._waiters)
+            _, _, host, future = waiter
+            if future.done() or future.get_loop().is_closed():
+                continue
+            if self._in_flight.get(host, 0) >= self.max_concurrency_per_host:
+                waiting.append(waiter)
+                continue
+            bucket = self._buckets.get(host)
+            wait = bucket.try_acquire() if bucket else 0.0
+            if wait:
+                next_token_in = wait if next_token_in is None else min(next_token_in, wait)
+                waiting.append(waiter)
+                continue
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+            future.set_result(None)
+        self._waiters = waiting
+        heapq.heapify(self._waiters)
+        if next_token_in is not None:
+            self._schedule_wakeup(next_token_in)
+
+    def _schedule_wakeup(self, delay: float) -> None:
+        # One wakeup per loop: WSGI mode runs each request on its own loop, and a handle left on a closed loop never fires.
+        loop = asyncio.get_running_loop()
+        wakeup = self._wakeups.get(loop)
+        if wakeup is not None and not wakeup.cancelled() and wakeup.when() <= loop.time() + delay:
+            return
+        if wakeup is not None:
+            wakeup.cancel()
+        self._wakeups[loop] = loop.call_later(delay, self._on_wakeup, loop)
+
+    def _on_wakeup(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._wakeups.pop(loop, None)
+        self._pump()
+
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> float:
+        retry_after = self._parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return min(self.backoff_max, retry_after) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,35 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+request_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+@contextmanager
+def deadline_scope(budget: Optional[float] = None, at: Optional[float] = None) -> Iterator[float]:
+    deadline = at if budget is None else time.monotonic() + budget
+    current = request_deadline.get()
+    if current is not None and (deadline is None or current < deadline):
+        deadline = current
+    token = request_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        request_deadline.reset(token)
+
+def remaining() -> Optional[float]:
+    deadline = request_deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+def expired() -> bool:
+    time_left = remaining()
+    return time_left is not None and time_left <= 0
+
+async def wait_with_deadline(awaitable: Awaitable[T]) -> T:
+    return await asyncio.wait_for(awaitable, timeout=remaining())
@@ -1,24 +1,147 @@
+import asyncio
 import os
+import threading
+from typing import Optional
 from dotenv import load_dotenv
+from weather import metrics
+from weather.clients.clients_constants import (
+    FORECAST_PROVIDER_NAMES,
+    FORECAST_PROVIDERS,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_READ_TIMEOUT,
+    OPENWEATHER_RATE_LIMIT_BURST,
+    OPENWEATHER_RATE_LIMIT_PER_SECOND,
+    PROVIDER_RACE_WIDTH,
+    UPSTREAM_MAX_CONCURRENCY_PER_HOST,
+    UPSTREAM_MAX_RETRIES,
+)
+from weather.clients.circuit_breaker import CircuitBreaker, ResilientCaller
+from weather.clients.composite_impl import CompositeForecastClient
+from weather.clients.http_pool import HttpClientPool
+from weather.clients.resilient_impl import ResilientOpenWeatherClient, ResilientReservamosClient
+from weather.clients.scheduler import UpstreamScheduler
 from weather.clients.reservamos_impl import ReservamosClient
 from weather.clients.openweather_impl import OpenWeatherClient
+from weather.clients.open_meteo_impl import OpenMeteoClient
+from weather.json_codec import get_codec
+from weather.response_cache import ResponseCache
 from weather.services.city_service_impl import CityService
 from weather.services.weather_service_impl import WeatherService
+from weather.services.coordinates import CoordinateQuantizer
+from weather.services.gazetteer_impl import CityGazetteer, get_gazetteer_path
+from weather.services.services_constants import (
+    FORECAST_COORDINATE_MODE,
+    FORECAST_COORDINATE_PRECISION,
+    CACHE_WARMER_TOP_N,
+    L1_CACHE_MAX_ENTRIES,
+    L1_CACHE_TIME_OUT,
+    WARM_UP_CACHE_KEY,
+)
+from weather.services.cache_warmer import CacheWarmer
+from weather.services.popularity import PopularityTracker
+from weather.services.single_flight import SingleFlight
+from weather.services.tiered_cache import LocalLRUCache, TieredCache
+from weather.services.cache_serializers import CompactSerializer
 
 
-load_dotenv()
-
 class InjectContainer:
     def __init__(self):
+        forecast_providers = [name.strip() for name in os.getenv("FORECAST_PROVIDERS", FORECAST_PROVIDERS).split(",") if name.strip()]
+        unknown_providers = set(forecast_providers) - set(FORECAST_PROVIDER_NAMES)
+        if not forecast_providers or unknown_providers:
+            raise ValueError(f"FORECAST_PROVIDERS must list providers from {', '.join(FORECAST_PROVIDER_NAMES)}.")
         openweather_api_key = os.getenv("OPENWEATHER_API_KEY")
-        if not openweather_api_key:
+        if "openweather" in forecast_providers and not openweather_api_key:
             raise ValueError("OPENWEATHER_API_KEY environment variable is missing.")
-        
-        self.reservamos_client = ReservamosClient()
-        self.openweather_client = OpenWeatherClient(api_key=openweather_api_key)
 
-        self.city_service = CityService(self.reservamos_client)
-        self.weather_service = WeatherService(self.openweather_client)
+        self.http_pool = HttpClientPool(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", HTTP_MAX_CONNECTIONS)),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", HTTP_MAX_KEEPALIVE_CONNECTIONS)),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", HTTP_CONNECT_TIMEOUT)),
+            read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", HTTP_READ_TIMEOUT)),
+            http2=os.getenv("HTTP2_ENABLED", "true").lower() == "true",
+        )
+
+        self.scheduler = UpstreamScheduler(
+            max_concurrency_per_host=int(os.getenv("UPSTREAM_MAX_CONCURRENCY_PER_HOST", UPSTREAM_MAX_CONCURRENCY_PER_HOST)),
+            max_retries=int(os.getenv("UPSTREAM_MAX_RETRIES", UPSTREAM_MAX_RETRIES)),
+        )
+        self.scheduler.set_rate_limit(
+            OpenWeatherClient.HOST,
+            rate=float(os.getenv("OPENWEATHER_RATE_LIMIT_PER_SECOND", OPENWEATHER_RATE_LIMIT_PER_SECOND)),
+            burst=float(os.getenv("OPENWEATHER_RATE_LIMIT_BURST", OPENWEATHER_RATE_LIMIT_BURST)),
+        )
+
+        self.codec = get_codec(prefer_fast=os.getenv("JSON_FAST_CODEC_ENABLED", "true").lower() == "true")
+        self.reservamos_client = ReservamosClient(http_pool=self.http_pool, scheduler=self.scheduler, codec=self.codec)
+        forecast_clients = {
+            "openweather": lambda: OpenWeatherClient(
+                api_key=openweather_api_key,
+                http_pool=self.http_pool,
+                scheduler=self.scheduler,
+                codec=self.codec,
+            ),
+            "open_meteo": lambda: OpenMeteoClient(http_pool=self.http_pool, scheduler=self.scheduler, codec=self.codec),
+        }
+        providers = [(name, forecast_clients[name]()) for name in forecast_providers]
+        if os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true":
+            hedging = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+            self.reservamos_client = ResilientReservamosClient(
+                self.reservamos_client,
+                ResilientCaller(CircuitBreaker("reservamos"), hedging=hedging),
+            )
+            providers = [
+                (name, ResilientOpenWeatherClient(client, ResilientCaller(CircuitBreaker(name), hedging=hedging)))
+                for name, client in providers
+            ]
+        if len(providers) == 1:
+            self.forecast_client = providers[0][1]
+        else:
+            self.forecast_client = CompositeForecastClient(
+                providers,
+                racing=os.getenv("FORECAST_PROVIDER_RACING", "false").lower() == "true",
+                race_width=int(os.getenv("FORECAST_PROVIDER_RACE_WIDTH", PROVIDER_RACE_WIDTH)),
+            )
+
+        self.single_flight = SingleFlight()
+        self.cache = TieredCache(
+            local=LocalLRUCache(
+                max_entries=int(os.getenv("L1_CACHE_MAX_ENTRIES", L1_CACHE_MAX_ENTRIES)),
+                max_timeout=int(os.getenv("L1_CACHE_TIME_OUT", L1_CACHE_TIME_OUT)),
+            ),
+            serializer=CompactSerializer(use_msgpack=os.getenv("CACHE_MSGPACK_ENABLED", "true").lower() == "true"),
+        )
+        self.gazetteer = CityGazetteer(get_gazetteer_path()) if os.getenv("GAZETTEER_ENABLED", "true").lower() == "true" else None
+        self.city_service = CityService(
+            self.reservamos_client,
+            single_flight=self.single_flight,
+            gazetteer=self.gazetteer,
+            cache_backend=self.cache,
+        )
+        self.quantizer = CoordinateQuantizer(
+            mode=os.getenv("FORECAST_COORDINATE_MODE", FORECAST_COORDINATE_MODE),
+            precision=int(os.getenv("FORECAST_COORDINATE_PRECISION", FORECAST_COORDINATE_PRECISION)),
+        )
+        self.weather_service = WeatherService(
+            self.forecast_client,
+            single_flight=self.single_flight,
+            quantizer=self.quantizer,
+            cache_backend=self.cache,
+        )
+        self.response_cache = ResponseCache(backend=self.cache) if os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true" else None
+        self.popularity = PopularityTracker()
+        self.cache_warmer = CacheWarmer(
+            self.city_service,
+            self.weather_service,
+            self.popularity,
+            top_n=int(os.getenv("CACHE_WARMER_TOP_N", CACHE_WARMER_TOP_N)),
+        )
+        self.cache_warmer_enabled = os.getenv("CACHE_WARMER_ENABLED", "false").lower() == "true"
+        self.loop_lag_monitor = metrics.EventLoopLagMonitor()
+        self.stats_collector = metrics.cache_stats_collector(self.get_cache_stats)
+        metrics.registry.add_collector(self.stats_collector)
 
     def get_city_service(self):
         return self.city_service
@@ -26,4 +149,82 @@ class InjectContainer:
     def get_weather_service(self):
         return self.weather_service
 
-container = InjectContainer()
+    def get_response_cache(self):
+        return self.response_cache
+
+    def get_popularity_tracker(self):
+        return self.popularity
+
+    def get_cache_warmer(self):
+        return self.cache_warmer
+
+    def get_codec(self):
+        return self.codec
+
+    def get_cache_stats(self):
+        stats = {
+            "city": self.city_service.city_cache.stats.snapshot(),
+            "forecast": self.weather_service.forecast_cache.stats.snapshot(),
+        }
+        if self.response_cache is not None:
+            stats["response"] = self.response_cache.stats.snapshot()
+        return stats
+
+    def warm_up_pools(self) -> None:
+        self.http_pool.ssl_context()
+
+    def warm_up_caches(self) -> None:
+        self.cache.shared.get(WARM_UP_CACHE_KEY)
+
+    def warm_up_gazetteer(self) -> None:
+        if self.gazetteer is not None:
+            self.gazetteer.load()
+
+    async def warm_up(self) -> None:
+        # The hooks are blocking I/O, so they run side by side off the event loop.
+        await asyncio.gather(*(asyncio.to_thread(hook) for hook in (self.warm_up_pools, self.warm_up_caches, self.warm_up_gazetteer)))
+        self.http_pool.get_client()
+        self.loop_lag_monitor.start()
+        if self.cache_warmer_enabled:
+            self.cache_warmer.start()
+
+    async def aclose(self) -> None:
+        await self.cache_warmer.stop()
+        await self.loop_lag_monitor.stop()
+        await self.http_pool.aclose()
+        await asyncio.to_thread(self.popularity.flush)
+        if self.gazetteer is not None:
+            await asyncio.to_thread(self.gazetteer.save)
+
+_container: Optional[InjectContainer] = None
+_container_pid: Optional[int] = None
+_container_lock = threading.Lock()
+
+def get_container() -> InjectContainer:
+    global _container, _container_pid
+    # Built on first use and again after a fork, so imports stay cheap and workers never share pools.
+    if _container is None or _container_pid != os.getpid():
+        with _container_lock:
+            if _container is None or _container_pid != os.getpid():
+                _discard_container()
+                load_dotenv()
+                _container = InjectContainer()
+                _container_pid = os.getpid()
+    return _container
+
+def preload() -> None:
+    # Imports only, no pools or connections: safe in a gunicorn master whose workers are forked afterwards.
+    import httpcore  # noqa: F401  httpx defers this import to the first client
+    from django.urls import get_resolver
+
+    get_resolver().url_patterns
+
+def reset_container() -> None:
+    with _container_lock:
+        _discard_container()
+
+def _discard_container() -> None:
+    global _container, _container_pid
+    if _container is not None:
+        metrics.registry.remove_collector(_container.stats_collector)
+    _container, _container_pid = None, None
@@ -0,0 +1,48 @@
+import dataclasses
+import json
+from typing import Any, Optional, Union
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+ORJSON_AVAILABLE = orjson is not None
+
+class ModelJSONEncoder(DjangoJSONEncoder):
+    def default(self, o: Any) -> Any:
+        if dataclasses.is_dataclass(o):
+            return {field.name: getattr(o, field.name) for field in dataclasses.fields(o)}
+        return super().default(o)
+
+class JsonCodec:
+    name = "json"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, cls=ModelJSONEncoder, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        self._fallback_encoder = DjangoJSONEncoder()
+
+    def dumps(self, value: Any) -> bytes:
+        return orjson.dumps(value, default=self._fallback_encoder.default)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return orjson.loads(data)
+
+def get_codec(prefer_fast: bool = True) -> JsonCodec:
+    return OrjsonCodec() if prefer_fast and ORJSON_AVAILABLE else JsonCodec()
+
+class FastJsonResponse(HttpResponse):
+    def __init__(self, data: Any, codec: Optional[JsonCodec] = None, **kwargs: Any) -> None:
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=(codec or get_codec()).dumps(data), **kwargs)
@@ -0,0 +1,39 @@
+import logging
+from typing import Any, Awaitable, Callable, Iterable
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+LifespanHook = Callable[[], Awaitable[None]]
+
+class LifespanMiddleware:
+    def __init__(self, app: Any, on_startup: Iterable[LifespanHook] = (), on_shutdown: Iterable[LifespanHook] = ()) -> None:
+        self.app = app
+        self.on_startup = list(on_startup)
+        self.on_shutdown = list(on_shutdown)
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "lifespan":
+            await self.app(scope, receive, send)
+            return
+
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    for hook in self.on_startup:
+                        await hook()
+                except Exception as e:
+                    logger.error(f"Error during ASGI startup: {e}")
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for hook in self.on_shutdown:
+                    try:
+                        await hook()
+                    except Exception as e:
+                        logger.error(f"Error during ASGI shutdown: {e}")
+                await send({"type": "lifespan.shutdown.complete"})
+                return
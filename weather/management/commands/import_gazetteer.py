@@ -0,0 +1,41 @@
+import csv
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from weather.services.city_service_impl import build_cities
+from weather.services.gazetteer_impl import CityGazetteer, get_gazetteer_path
+from weather.services.models import City
+
+
+class Command(BaseCommand):
+    help = "Bulk import cities into the local gazetteer from a CSV (name,state,latitude,longitude) or a JSON list of Reservamos places."
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", type=Path)
+        parser.add_argument("--gazetteer", type=Path, default=None, help="Gazetteer file to update (defaults to GAZETTEER_PATH).")
+
+    def handle(self, *args, **options):
+        source: Path = options["source"]
+        if not source.exists():
+            raise CommandError(f"File not found: {source}")
+
+        cities = self._read_json(source) if source.suffix == ".json" else self._read_csv(source)
+        gazetteer = CityGazetteer(options["gazetteer"] or get_gazetteer_path())
+        added = gazetteer.add_cities("", cities)
+        gazetteer.save()
+        self.stdout.write(self.style.SUCCESS(f"Imported {added} new cities ({len(gazetteer)} total) into {gazetteer.path}"))
+
+    def _read_csv(self, source: Path):
+        with open(source, encoding="utf-8", newline="") as source_file:
+            return [
+                City.from_dict(row)
+                for row in csv.DictReader(source_file)
+                if row.get("latitude") and row.get("longitude")
+            ]
+
+    def _read_json(self, source: Path):
+        with open(source, encoding="utf-8") as source_file:
+            places = json.load(source_file)
+        if places and "display" in places[0]:
+            return build_cities(places)
+        return [City.from_dict(city) for city in places]
@@ -0,0 +1,26 @@
+import asyncio
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Pre-fetch city coordinates and forecasts for the most searched queries before their cache entries expire."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=None, help="Number of popular queries to warm (defaults to CACHE_WARMER_TOP_N).")
+        parser.add_argument("--queries", default="", help="Comma separated queries to warm instead of the popular ones.")
+        parser.add_argument("--spread", type=float, default=0.0, help="Seconds over which to spread the upstream requests.")
+
+    def handle(self, *args, **options):
+        from weather.inject_container import get_container
+
+        container = get_container()
+        warmer = container.get_cache_warmer()
+        queries = [query for query in options["queries"].split(",") if query.strip()] or warmer.queries(options["top"])
+        refreshed = asyncio.run(self._warm(container, warmer, queries, options["spread"]))
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} forecasts for {len(queries)} queries"))
+
+    async def _warm(self, container, warmer, queries, spread):
+        try:
+            return await warmer.warm(queries, spread=spread)
+        finally:
+            await container.aclose()
@@ -0,0 +1,241 @@
+import asyncio
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeAlias
+from weather.metrics_constants import EVENT_LOOP_LAG_INTERVAL, FANOUT_BUCKETS, LATENCY_BUCKETS
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+LabelValues: TypeAlias = Tuple[Tuple[str, str], ...]
+Collector: TypeAlias = Callable[[], List[str]]
+
+def _label_values(labels: Dict[str, Any]) -> LabelValues:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _format_labels(labels: LabelValues) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str) -> None:
+        super().__init__(name, description)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = _label_values(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self.values.get(_label_values(labels), 0)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {_format_value(value)}" for labels, value in self.values.items()]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        self.values[_label_values(labels)] = value
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets))
+        self.counts: Dict[LabelValues, List[int]] = {}
+        self.sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _label_values(labels)
+        counts = self.counts.setdefault(key, [0] * (len(self.buckets) + 1))
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+        self.sums[key] = self.sums.get(key, 0.0) + value
+
+    def count(self, **labels: Any) -> int:
+        return sum(self.counts.get(_label_values(labels), ()))
+
+    def samples(self) -> List[str]:
+        lines = []
+        for labels, counts in self.counts.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                bucket_labels = _format_labels((*labels, ("le", _format_value(bound) if bound != "+Inf" else bound)))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(self.sums[labels])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+        self.collectors: List[Collector] = []
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def gauge(self, name: str, description: str) -> Gauge:
+        return self._register(Gauge(name, description))
+
+    def histogram(self, name: str, description: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, buckets))
+
+    def add_collector(self, collector: Collector) -> None:
+        self.collectors.append(collector)
+
+    def remove_collector(self, collector: Collector) -> None:
+        if collector in self.collectors:
+            self.collectors.remove(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        for collector in self.collectors:
+            try:
+                lines.extend(collector())
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {e}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Metric) -> Any:
+        return self.metrics.setdefault(metric.name, metric)
+
+registry = MetricsRegistry()
+
+VIEW_LATENCY = registry.histogram("weather_view_duration_seconds", "Time until a view returns its response.")
+UPSTREAM_LATENCY = registry.histogram("weather_upstream_duration_seconds", "Latency of upstream API calls by host and status.")
+FORECAST_FANOUT = registry.histogram("weather_forecast_fanout_cells", "Coordinate cells requested per forecast lookup.", FANOUT_BUCKETS)
+FORECAST_IN_FLIGHT = registry.gauge("weather_forecast_in_flight", "Forecast cell lookups currently in flight.")
+EVENT_LOOP_LAG = registry.gauge("weather_event_loop_lag_seconds", "Delay of the last event-loop lag probe.")
+EVENT_LOOP_LAG_MAX = registry.gauge("weather_event_loop_lag_max_seconds", "Largest event-loop lag seen since start.")
+
+def cache_stats_collector(get_cache_stats: Callable[[], Dict[str, Dict[str, float]]]) -> Collector:
+    def collect() -> List[str]:
+        lookups = Counter("weather_cache_lookups_total", "Cache lookups by cache and result.")
+        coalesced = Counter("weather_cache_coalesced_total", "Lookups served by another in-flight request.")
+        hit_rate = Gauge("weather_cache_hit_ratio", "Fresh and stale hits over all lookups.")
+        for cache_name, stats in get_cache_stats().items():
+            lookups.inc(stats["hits"], cache=cache_name, result="hit")
+            lookups.inc(stats["stale_hits"], cache=cache_name, result="stale")
+            lookups.inc(stats["misses"], cache=cache_name, result="miss")
+            coalesced.inc(stats["coalesced"], cache=cache_name)
+            hit_rate.set(stats["hit_rate"], cache=cache_name)
+        return [*lookups.render(), *coalesced.render(), *hit_rate.render()]
+    return collect
+
+@contextmanager
+def observe_upstream(host: str) -> Iterator[Callable[[int], None]]:
+    status = {"code": "error"}
+    started_at = time.perf_counter()
+    try:
+        yield lambda code: status.update(code=code)
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started_at, host=host, status=status["code"])
+
+class ServerTiming:
+    def __init__(self) -> None:
+        self.entries: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.entries[name] = self.entries.get(name, 0.0) + seconds
+
+    def header(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.entries.items())
+
+server_timing: ContextVar[Optional[ServerTiming]] = ContextVar("server_timing", default=None)
+
+@contextmanager
+def measure(name: str) -> Iterator[None]:
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = server_timing.get()
+        if timing is not None:
+            timing.add(name, time.perf_counter() - started_at)
+
+def instrument_view(name: str, add_server_timing: bool = False) -> Callable:
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            timing = ServerTiming()
+            token = server_timing.set(timing)
+            started_at = time.perf_counter()
+            status = 500
+            try:
+                response = await view(request, *args, **kwargs)
+                status = response.status_code
+            finally:
+                elapsed = time.perf_counter() - started_at
+                server_timing.reset(token)
+                VIEW_LATENCY.observe(elapsed, view=name, status=status)
+            if add_server_timing:
+                timing.add("total", elapsed)
+                response["Server-Timing"] = timing.header()
+            return response
+        return wrapper
+    return decorator
+
+class EventLoopLagMonitor:
+    def __init__(self, interval: float = EVENT_LOOP_LAG_INTERVAL) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started_at = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started_at - self.interval)
+            EVENT_LOOP_LAG.set(lag)
+            if lag > EVENT_LOOP_LAG_MAX.value():
+                EVENT_LOOP_LAG_MAX.set(lag)
@@ -0,0 +1,4 @@
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0) # seconds
+FANOUT_BUCKETS = (1, 2, 5, 10, 20, 50, 100) # forecast cells per request
+EVENT_LOOP_LAG_INTERVAL=0.5 # seconds between event-loop lag probes
+METRICS_CONTENT_TYPE="text/plain; version=0.0.4; charset=utf-8"
@@ -0,0 +1,19 @@
+import base64
+import binascii
+from typing import Optional
+
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        offset = int(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor.")
+    if offset < 0:
+        raise ValueError("Invalid cursor.")
+    return offset
+
+def next_cursor(offset: int, limit: int, total: int) -> Optional[str]:
+    return encode_cursor(offset + limit) if offset + limit < total else None
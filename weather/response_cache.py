@@ -0,0 +1,54 @@
+import hashlib
+import time
+from typing import Any, Dict, Optional, Tuple
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from weather.services.cache_stats import CacheStats
+from weather.views_constants import RESPONSE_CACHE_TIME_OUT
+
+
+CachedResponse = Tuple[float, str, str] # created_at, etag, encoded body
+
+class ResponseCache:
+    def __init__(self, backend: Any = cache, max_age: int = RESPONSE_CACHE_TIME_OUT, name: str = "response") -> None:
+        self.backend = backend
+        self.max_age = max_age
+        self.stats = CacheStats(name)
+
+    def cache_key(self, view_name: str, params: Dict[str, Any]) -> str:
+        # Params may hold spaces or accents, so they are hashed to keep keys valid for every backend.
+        canonical = "&".join(f"{name}={params[name]}" for name in sorted(params))
+        return f"response_{view_name}_{hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.backend.get(key)
+        if not isinstance(entry, tuple) or len(entry) != 3 or entry[0] + self.max_age <= time.time():
+            self.stats.record_miss()
+            return None
+        self.stats.record_hit(True)
+        return entry
+
+    def set(self, key: str, body: bytes) -> CachedResponse:
+        entry = (time.time(), f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"', body.decode())
+        self.backend.set(key, entry, timeout=self.max_age)
+        return entry
+
+    def build_response(self, request: HttpRequest, cached_response: CachedResponse) -> HttpResponse:
+        created_at, etag, body = cached_response
+        if self._is_not_modified(request, etag, created_at):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body.encode(), content_type="application/json")
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(created_at)
+        response["Cache-Control"] = f"public, max-age={max(0, int(created_at + self.max_age - time.time()))}"
+        return response
+
+    def _is_not_modified(self, request: HttpRequest, etag: str, created_at: float) -> bool:
+        if_none_match = request.headers.get("If-None-Match")
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return "*" in etags or etag in etags or f"W/{etag}" in etags
+        modified_since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+        return modified_since is not None and int(created_at) <= modified_since
@@ -0,0 +1,69 @@
+import json
+from typing import Any
+from weather.services.models import MODELS, model_values
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+
+MSGPACK_FORMAT = b"m"
+JSON_FORMAT = b"j"
+TUPLE_MARKER = "__t"
+KEYS_MARKER = "__k"
+ROWS_MARKER = "__r"
+MODEL_MARKER = "__m"
+
+class CompactSerializer:
+    def __init__(self, use_msgpack: bool = True) -> None:
+        self.use_msgpack = use_msgpack and msgpack is not None
+
+    def dumps(self, value: Any) -> bytes:
+        packed = self._pack(value)
+        if self.use_msgpack:
+            return MSGPACK_FORMAT + msgpack.packb(packed, use_bin_type=True)
+        return JSON_FORMAT + json.dumps(packed, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def loads(self, data: bytes) -> Any:
+        data_format, payload = data[:1], data[1:]
+        if data_format == MSGPACK_FORMAT:
+            if msgpack is None:
+                raise ValueError("msgpack is required to decode this cache entry")
+            packed = msgpack.unpackb(payload, raw=False)
+        elif data_format == JSON_FORMAT:
+            packed = json.loads(payload)
+        else:
+            raise ValueError(f"Unknown cache entry format: {data_format!r}")
+        return self._unpack(packed)
+
+    def _pack(self, value: Any) -> Any:
+        if isinstance(value, tuple):
+            return {TUPLE_MARKER: [self._pack(item) for item in value]}
+        if isinstance(value, list):
+            model_name = type(value[0]).__name__ if value else None
+            if model_name in MODELS and all(type(item).__name__ == model_name for item in value):
+                # Model lists only store their field values; the field names come from the model.
+                return {MODEL_MARKER: model_name, ROWS_MARKER: [model_values(item) for item in value]}
+            if value and all(isinstance(item, dict) for item in value):
+                keys = list(value[0])
+                if all(list(item) == keys for item in value):
+                    # Homogeneous records (cities, forecast days) are stored as a header plus rows.
+                    return {KEYS_MARKER: keys, ROWS_MARKER: [[self._pack(item[key]) for key in keys] for item in value]}
+            return [self._pack(item) for item in value]
+        return value
+
+    def _unpack(self, value: Any) -> Any:
+        if isinstance(value, dict):
+            if TUPLE_MARKER in value:
+                return tuple(self._unpack(item) for item in value[TUPLE_MARKER])
+            if MODEL_MARKER in value:
+                model = MODELS[value[MODEL_MARKER]]
+                return [model(*row) for row in value[ROWS_MARKER]]
+            if KEYS_MARKER in value:
+                keys = value[KEYS_MARKER]
+                return [dict(zip(keys, (self._unpack(item) for item in row))) for row in value[ROWS_MARKER]]
+            return value
+        if isinstance(value, list):
+            return [self._unpack(item) for item in value]
+        return value
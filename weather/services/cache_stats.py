@@ -0,0 +1,36 @@
+from typing import Dict
+
+
+class CacheStats:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def record_hit(self, is_fresh: bool) -> None:
+        if is_fresh:
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+
+    def record_miss(self) -> None:
+        self.misses += 1
+
+    def record_coalesced(self, count: int) -> None:
+        self.coalesced += count
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.stale_hits + self.misses
+        return (self.hits + self.stale_hits) / lookups if lookups else 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round(self.hit_rate, 4),
+        }
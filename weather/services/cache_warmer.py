@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from typing import Iterable, List, Optional
+from weather.clients.scheduler import PRIORITY_LOW, priority
+from weather.services.city_service import ICityService
+from weather.services.popularity import PopularityTracker
+from weather.services.services_constants import (
+    CACHE_TIME_OUT_FORECAST,
+    CACHE_WARMER_DEFAULT_QUERIES,
+    CACHE_WARMER_REFRESH_RATIO,
+    CACHE_WARMER_TOP_N,
+)
+from weather.services.text_normalization import normalize_query
+from weather.services.weather_service import IWeatherService
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class CacheWarmer:
+    def __init__(
+        self,
+        city_service: ICityService,
+        weather_service: IWeatherService,
+        popularity: PopularityTracker,
+        top_n: int = CACHE_WARMER_TOP_N,
+        default_queries: Iterable[str] = CACHE_WARMER_DEFAULT_QUERIES,
+        refresh_window: float = CACHE_TIME_OUT_FORECAST * CACHE_WARMER_REFRESH_RATIO,
+    ) -> None:
+        self.city_service = city_service
+        self.weather_service = weather_service
+        self.popularity = popularity
+        self.top_n = top_n
+        self.default_queries = [normalize_query(query) for query in default_queries]
+        self.refresh_window = refresh_window
+        self._task: Optional[asyncio.Task] = None
+
+    def queries(self, top_n: Optional[int] = None) -> List[str]:
+        top_n = self.top_n if top_n is None else top_n
+        queries = list(dict.fromkeys([*self.popularity.top(top_n), *self.default_queries]))
+        return queries[:top_n]
+
+    async def warm(self, queries: List[str], spread: float = 0.0) -> int:
+        # Refreshes are spaced evenly across the spread window so the upstream request rate stays flat.
+        interval = spread / len(queries) if queries else 0.0
+        refreshed = 0
+        with priority(PRIORITY_LOW):
+            for index, query in enumerate(queries):
+                if index and interval:
+                    await asyncio.sleep(interval)
+                try:
+                    cities = await self.city_service.refresh_city_coordinates(query, ahead=self.refresh_window)
+                    if cities:
+                        refreshed += await self.weather_service.refresh_weather_forecast(cities, ahead=self.refresh_window)
+                except Exception as e:
+                    logger.error(f"Error warming cache for {query}: {e}")
+        logger.info(f"Cache warmer refreshed {refreshed} forecasts for {len(queries)} queries")
+        return refreshed
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # Both read or write the shared cache, which would otherwise block requests on this loop.
+                await asyncio.to_thread(self.popularity.flush)
+                queries = await asyncio.to_thread(self.queries)
+            except Exception as e:
+                logger.error(f"Error loading popular queries: {e}")
+                queries = self.default_queries
+            await self.warm(queries, spread=self.refresh_window)
+            if not queries:
+                await asyncio.sleep(self.refresh_window)
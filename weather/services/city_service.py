@@ -1,11 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any, TypeAlias
+from typing import List, Optional, TypeAlias
+from weather.services.models import City
 
 
-CityType: TypeAlias = Dict[str, Any]
-CityList: TypeAlias = Optional[List[CityType]]
+CityList: TypeAlias = Optional[List[City]]
 
 class ICityService(ABC):
     @abstractmethod
     async def get_city_coordinates(self, city_name: str) -> CityList:
-        pass 
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def refresh_city_coordinates(self, city_name: str, ahead: float) -> CityList:
+        pass
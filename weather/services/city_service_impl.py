@@ -1,39 +1,151 @@
-from typing import List
+import asyncio
+import logging
+from typing import Any, List, Optional
 from django.core.cache import cache
-from weather.clients.reservamos import IReservamosClient
-from weather.services.city_service import ICityService, CityList, CityType
-from weather.services.services_constants import CACHE_TIME_OUT_CITY, CITY_TYPE, MEXICO_COUNTRY
+from weather import deadline
+from weather.clients.reservamos import CityListResponse, IReservamosClient
+from weather.services.city_service import ICityService, CityList
+from weather.services.models import City
+from weather.services.gazetteer import ICityGazetteer
+from weather.services.ranking import rank_cities
+from weather.services.services_constants import (
+    CACHE_STALE_TIME_OUT_CITY,
+    CACHE_TIME_OUT_CITY,
+    CITY_TYPE,
+    MEXICO_COUNTRY,
+    PREFIX_CACHE_MAX_PLACES,
+    PREFIX_CACHE_MIN_LENGTH,
+)
+from weather.services.single_flight import SingleFlight
+from weather.services.stale_cache import StaleWhileRevalidateCache
+from weather.services.text_normalization import matches_prefix, normalize_query
 
 
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
 class CityService(ICityService):
-    def __init__(self, reservamos_client: IReservamosClient ) -> None:
+    def __init__(
+        self,
+        reservamos_client: IReservamosClient,
+        single_flight: Optional[SingleFlight] = None,
+        gazetteer: Optional[ICityGazetteer] = None,
+        cache_backend: Any = cache,
+    ) -> None:
         self.reservamos_client = reservamos_client
+        self.single_flight = single_flight or SingleFlight()
+        self.gazetteer = gazetteer
+        self.city_cache = StaleWhileRevalidateCache(CACHE_TIME_OUT_CITY, CACHE_STALE_TIME_OUT_CITY, backend=cache_backend, name="city")
         
     async def get_city_coordinates(self, city_name: str) -> CityList:
-        city_list = self._get_cached_city_list(city_name)
+        city_name = normalize_query(city_name)
+        if not city_name:
+            return None
+
+        if self.gazetteer is not None:
+            city_list = self.gazetteer.lookup(city_name)
+            if city_list:
+                return rank_cities(city_name, city_list)
+
+        city_list = await self._get_city_list(city_name)
+        if not city_list:
+            return self._search_gazetteer(city_name) or city_list
+        return city_list
+
+    async def _get_city_list(self, city_name: str) -> CityList:
+        cache_key = self._cache_key(city_name)
+        city_list, is_fresh = self.city_cache.get(cache_key)
         if city_list is None:
-            places = await self.reservamos_client.get_cities(city_name)
-            city_list = self._build_cities(places)
-            self._set_cache_city_list(city_name, city_list)
+            city_list = self._get_prefix_cached_city_list(city_name)
+            if city_list:
+                return rank_cities(city_name, city_list)
+            return await deadline.wait_with_deadline(self.single_flight.do(
+                cache_key,
+                lambda: self._fetch_city_list(city_name),
+                lambda: self.city_cache.get_value(cache_key),
+            ))
+        if not is_fresh:
+            self.single_flight.do_in_background(cache_key, lambda: self._fetch_city_list(city_name, stale=city_list))
+        return city_list
+
+    async def refresh_city_coordinates(self, city_name: str, ahead: float) -> CityList:
+        city_name = normalize_query(city_name)
+        if not city_name:
+            return None
+
+        if self.gazetteer is not None:
+            city_list = self.gazetteer.lookup(city_name)
+            if city_list:
+                return city_list
+
+        cache_key = self._cache_key(city_name)
+        # Refreshes run beside user requests, so the shared cache read is kept off the event loop.
+        city_list, fresh_for = await asyncio.to_thread(self.city_cache.peek, cache_key)
+        if fresh_for is not None and fresh_for > ahead:
+            return city_list
+        return await self.single_flight.do(cache_key, lambda: self._fetch_city_list(city_name, stale=city_list))
+
+    async def _fetch_city_list(self, city_name: str, stale: CityList = None) -> CityList:
+        places = await self.reservamos_client.get_cities(city_name)
+        if places is None:
+            logger.warning(f"Reservamos lookup failed for {city_name}, serving {'stale' if stale is not None else 'no'} data")
+            return stale
+        city_list = rank_cities(city_name, self._build_cities(places))
+        self.city_cache.set(self._cache_key(city_name), city_list)
+        if city_list and len(places) < PREFIX_CACHE_MAX_PLACES:
+            # Only a complete answer can be filtered to answer a longer query without losing cities.
+            self.city_cache.set(self._prefix_cache_key(city_name), city_list)
+        self._index_cities(city_name, city_list)
         return city_list
 
-    def _get_cached_city_list(self, city_name: str) -> CityList:
-        cache_key = f"city_coordinates_{city_name}"
-        return cache.get(cache_key)
+    def _search_gazetteer(self, city_name: str) -> CityList:
+        # Prefix and fuzzy matches only stand in when Reservamos failed or found nothing.
+        if self.gazetteer is None:
+            return None
+        city_list = self.gazetteer.search(city_name)
+        return rank_cities(city_name, city_list) if city_list else None
+
+    def _index_cities(self, city_name: str, city_list: CityList) -> None:
+        if self.gazetteer is not None and self.gazetteer.add_cities(city_name, city_list):
+            self.gazetteer.schedule_save()
+
+    def _get_prefix_cached_city_list(self, city_name: str) -> CityList:
+        prefix_keys = [
+            self._prefix_cache_key(city_name[:length])
+            for length in range(len(city_name) - 1, PREFIX_CACHE_MIN_LENGTH - 1, -1)
+        ]
+        if not prefix_keys:
+            return None
+        cached_lists = self.city_cache.get_many_values(prefix_keys)
+        for prefix_key in prefix_keys:
+            city_list = [city for city in cached_lists.get(prefix_key) or [] if matches_prefix(city.name, city_name)]
+            if city_list:
+                return city_list
+        return None
 
-    def _set_cache_city_list(self, city_name: str, city_list: CityList) -> None:
-        cache_key = f"city_coordinates_{city_name}"
-        cache.set(cache_key, city_list, timeout=CACHE_TIME_OUT_CITY)
+    def _cache_key(self, city_name: str) -> str:
+        return f"city_coordinates_{city_name.replace(' ', '_')}"
+
+    def _prefix_cache_key(self, city_name: str) -> str:
+        return f"city_prefix_{city_name.replace(' ', '_')}"
         
-    def _build_cities(self, places: CityList) -> List[CityType]:
-        unique_cities = {
-            (place["lat"], place["long"]): {
-                "name": place["display"],
-                "state": place["state"],
-                "latitude": place["lat"],
-                "longitude": place["long"]
-            }
-            for place in places
-            if place["result_type"] == CITY_TYPE and place["country"] == MEXICO_COUNTRY and place["lat"] is not None and place["long"] is not None
-        }
-        return list(unique_cities.values())
\ No newline at end of file
+    def _build_cities(self, places: CityListResponse) -> List[City]:
+        return build_cities(places)
+
+
+def build_cities(places: CityListResponse) -> List[City]:
+    unique_places = {
+        (place["lat"], place["long"]): place
+        for place in places
+        if place["result_type"] == CITY_TYPE and place["country"] == MEXICO_COUNTRY and place["lat"] is not None and place["long"] is not None
+    }
+    return [
+        City(place["display"], place["state"], float(place["lat"]), float(place["long"]), parse_popularity(place.get("popularity")))
+        for place in unique_places.values()
+    ]
+
+def parse_popularity(popularity: Any) -> float:
+    try:
+        return float(popularity or 0.0)
+    except (TypeError, ValueError):
+        return 0.0
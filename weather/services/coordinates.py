@@ -0,0 +1,73 @@
+from dataclasses import dataclass
+from typing import Tuple, Union
+
+
+GRID_MODE = "grid"
+GEOHASH_MODE = "geohash"
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+Coordinate = Union[float, str]
+
+@dataclass(frozen=True)
+class CoordinateCell:
+    key: str
+    latitude: float
+    longitude: float
+
+class CoordinateQuantizer:
+    def __init__(self, mode: str = GRID_MODE, precision: int = 2) -> None:
+        if mode not in (GRID_MODE, GEOHASH_MODE):
+            raise ValueError(f"Unknown coordinate quantization mode: {mode}")
+        self.mode = mode
+        self.precision = precision
+
+    def quantize(self, latitude: Coordinate, longitude: Coordinate) -> CoordinateCell:
+        latitude, longitude = float(latitude), float(longitude)
+        if self.mode == GEOHASH_MODE:
+            geohash = encode_geohash(latitude, longitude, self.precision)
+            center_latitude, center_longitude = decode_geohash(geohash)
+            return CoordinateCell(f"gh_{geohash}", center_latitude, center_longitude)
+        center_latitude = round(latitude, self.precision) + 0.0
+        center_longitude = round(longitude, self.precision) + 0.0
+        return CoordinateCell(
+            f"{center_latitude:.{self.precision}f}_{center_longitude:.{self.precision}f}",
+            center_latitude,
+            center_longitude,
+        )
+
+def encode_geohash(latitude: float, longitude: float, precision: int) -> str:
+    latitude_range, longitude_range = [-90.0, 90.0], [-180.0, 180.0]
+    geohash, bits, bit_count, even = [], 0, 0, True
+    while len(geohash) < precision:
+        value, value_range = (longitude, longitude_range) if even else (latitude, latitude_range)
+        middle = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            value_range[0] = middle
+        else:
+            value_range[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits, bit_count = 0, 0
+    return "".join(geohash)
+
+def decode_geohash(geohash: str) -> Tuple[float, float]:
+    latitude_range, longitude_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        bits = GEOHASH_ALPHABET.index(char)
+        for shift in range(4, -1, -1):
+            value_range = longitude_range if even else latitude_range
+            middle = (value_range[0] + value_range[1]) / 2
+            if bits >> shift & 1:
+                value_range[0] = middle
+            else:
+                value_range[1] = middle
+            even = not even
+    return (
+        round((latitude_range[0] + latitude_range[1]) / 2, 6),
+        round((longitude_range[0] + longitude_range[1]) / 2, 6),
+    )
@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from weather.services.city_service import CityList
+
+
+class ICityGazetteer(ABC):
+    @abstractmethod
+    def lookup(self, query: str) -> CityList:
+        pass
+
+    @abstractmethod
+    def search(self, query: str) -> CityList:
+        pass
+
+    @abstractmethod
+    def add_cities(self, query: str, cities: CityList) -> int:
+        pass
+
+    @abstractmethod
+    def save(self) -> None:
+        pass
+
+    @abstractmethod
+    def schedule_save(self) -> None:
+        pass
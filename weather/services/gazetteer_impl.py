@@ -0,0 +1,207 @@
+import bisect
+import difflib
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from django.conf import settings
+from weather.services.city_service import CityList
+from weather.services.gazetteer import ICityGazetteer
+from weather.services.models import City
+from weather.services.services_constants import (
+    GAZETTEER_DEFAULT_FILE,
+    GAZETTEER_FUZZY_CUTOFF,
+    GAZETTEER_MAX_RESULTS,
+    GAZETTEER_MIN_PREFIX_LENGTH,
+    GAZETTEER_SAVE_DELAY,
+)
+from weather.services.text_normalization import normalize_query
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+CityKey = Tuple[float, float]
+
+def get_gazetteer_path() -> Path:
+    return Path(os.getenv("GAZETTEER_PATH", settings.BASE_DIR / GAZETTEER_DEFAULT_FILE))
+
+class CityGazetteer(ICityGazetteer):
+    def __init__(self, path: Optional[Path] = None, save_delay: float = GAZETTEER_SAVE_DELAY) -> None:
+        self.path = path
+        self.save_delay = save_delay
+        self._cities: Dict[CityKey, City] = {}
+        self._aliases: Dict[str, List[CityKey]] = {}
+        self._terms: List[Tuple[str, CityKey]] = []
+        self._names: Dict[str, Set[CityKey]] = {}
+        self._loaded = path is None
+        self._dirty = False
+        self._save_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        self.load()
+        return len(self._cities)
+
+    def lookup(self, query: str) -> CityList:
+        self.load()
+        alias_keys = self._aliases.get(normalize_query(query))
+        return self._to_cities(alias_keys) if alias_keys else None
+
+    def search(self, query: str) -> CityList:
+        self.load()
+        folded_query = normalize_query(query)
+        if not folded_query:
+            return None
+
+        alias_keys = self._aliases.get(folded_query)
+        if alias_keys:
+            return self._to_cities(alias_keys)
+
+        if len(folded_query) >= GAZETTEER_MIN_PREFIX_LENGTH:
+            prefix_keys = self._search_prefix(folded_query)
+            if prefix_keys:
+                return self._to_cities(prefix_keys)
+
+        fuzzy_names = difflib.get_close_matches(folded_query, self._names, n=GAZETTEER_MAX_RESULTS, cutoff=GAZETTEER_FUZZY_CUTOFF)
+        if fuzzy_names:
+            return self._to_cities([key for name in fuzzy_names for key in self._names[name]])
+        return None
+
+    def add_cities(self, query: str, cities: CityList) -> int:
+        self.load()
+        folded_query = normalize_query(query) if query else ""
+        added = 0
+        with self._lock:
+            for city in cities or []:
+                key = self._city_key(city)
+                if key not in self._cities:
+                    self._index_city(key, city)
+                    added += 1
+            if folded_query and cities:
+                keys = [self._city_key(city) for city in cities]
+                if self._aliases.get(folded_query) != keys:
+                    self._aliases[folded_query] = keys
+                    added += 1
+            self._dirty = self._dirty or added > 0
+        return added
+
+    def load(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            data = self._read()
+            if data is not None:
+                self._merge(data)
+        logger.info(f"Loaded {len(self._cities)} cities into the gazetteer from {self.path}")
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        with self._timer_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+        with self._write_lock, self._file_lock():
+            # Other workers write the same file, so their entries are merged in before it is replaced.
+            data = self._read()
+            with self._lock:
+                if data is not None:
+                    self._merge(data)
+                if not self._dirty:
+                    return
+                data = {
+                    "cities": [city.to_dict() for city in self._cities.values()],
+                    "aliases": {query: [list(key) for key in keys] for query, keys in self._aliases.items()},
+                }
+                self._dirty = False
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(file_descriptor, "w", encoding="utf-8") as temp_file:
+                    json.dump(data, temp_file, ensure_ascii=False)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logger.error(f"Could not save gazetteer to {self.path}: {e}")
+                self._dirty = True
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    def schedule_save(self) -> None:
+        if self.path is None:
+            return
+        with self._timer_lock:
+            if self._save_timer is None:
+                self._save_timer = threading.Timer(self.save_delay, self.save)
+                self._save_timer.daemon = True
+                self._save_timer.start()
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            return None
+        try:
+            with open(self.path, encoding="utf-8") as gazetteer_file:
+                return json.load(gazetteer_file)
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load gazetteer from {self.path}: {e}")
+            return None
+
+    def _merge(self, data: Dict[str, Any]) -> None:
+        # Entries already in memory win, they are at least as recent as the file.
+        for city_data in data.get("cities", []):
+            city = City.from_dict(city_data)
+            key = self._city_key(city)
+            if key not in self._cities:
+                self._index_city(key, city)
+        for query, keys in data.get("aliases", {}).items():
+            if query not in self._aliases:
+                self._aliases[query] = [tuple(key) for key in keys]
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self.path.with_name(self.path.name + ".lock"), "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _index_city(self, key: CityKey, city: City) -> None:
+        self._cities[key] = city
+        folded_name = normalize_query(city.name)
+        self._names.setdefault(folded_name, set()).add(key)
+        words = folded_name.split()
+        for index in range(len(words)):
+            bisect.insort(self._terms, (" ".join(words[index:]), key))
+
+    def _search_prefix(self, prefix: str) -> List[CityKey]:
+        keys: Dict[CityKey, None] = {}
+        index = bisect.bisect_left(self._terms, (prefix,))
+        while index < len(self._terms) and self._terms[index][0].startswith(prefix) and len(keys) < GAZETTEER_MAX_RESULTS:
+            keys[self._terms[index][1]] = None
+            index += 1
+        return list(keys)
+
+    def _to_cities(self, keys: List[CityKey]) -> List[City]:
+        # Cities are immutable, so the indexed instances are shared instead of copied.
+        return [self._cities[key] for key in dict.fromkeys(keys) if key in self._cities]
+
+    def _city_key(self, city: City) -> CityKey:
+        return (city.latitude, city.longitude)
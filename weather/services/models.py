@@ -0,0 +1,46 @@
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from weather.services.services_constants import FORECAST_DATE_CACHE_SIZE
+
+
+@dataclass(frozen=True, slots=True)
+class City:
+    name: str
+    state: Optional[str]
+    latitude: float
+    longitude: float
+    popularity: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "City":
+        return cls(data["name"], data.get("state"), float(data["latitude"]), float(data["longitude"]), float(data.get("popularity") or 0.0))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "state": self.state, "latitude": self.latitude, "longitude": self.longitude, "popularity": self.popularity}
+
+@dataclass(frozen=True, slots=True)
+class DailyForecast:
+    date: str
+    temperature_max: float
+    temperature_min: float
+    weather: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "date": self.date,
+            "temperature_max": self.temperature_max,
+            "temperature_min": self.temperature_min,
+            "weather": self.weather,
+        }
+
+MODELS = {model.__name__: model for model in (City, DailyForecast)}
+
+def model_values(model: Any) -> list:
+    return [getattr(model, field.name) for field in fields(model)]
+
+@lru_cache(maxsize=FORECAST_DATE_CACHE_SIZE)
+def format_forecast_date(unix_timestamp: int) -> str:
+    # Forecasts for every city share the same few days, so each date string is built once.
+    return datetime.fromtimestamp(unix_timestamp, tz=timezone.utc).strftime('%Y-%m-%d')
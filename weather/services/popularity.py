@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+from django.core.cache import cache
+from weather.services.services_constants import (
+    POPULARITY_CACHE_KEY,
+    POPULARITY_FLUSH_INTERVAL,
+    POPULARITY_FLUSH_THRESHOLD,
+    POPULARITY_HALF_LIFE,
+    POPULARITY_MAX_KEYS,
+    POPULARITY_WINDOWS,
+)
+from weather.services.text_normalization import normalize_query
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class PopularityTracker:
+    def __init__(
+        self,
+        backend: Any = cache,
+        max_keys: int = POPULARITY_MAX_KEYS,
+        half_life: float = POPULARITY_HALF_LIFE,
+        cache_key: str = POPULARITY_CACHE_KEY,
+        flush_interval: float = POPULARITY_FLUSH_INTERVAL,
+        flush_threshold: int = POPULARITY_FLUSH_THRESHOLD,
+    ) -> None:
+        self.backend = backend
+        self.max_keys = max_keys
+        self.half_life = half_life
+        self.cache_key = cache_key
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.pending: Counter = Counter()
+        self._pending_total = 0
+        self._flushed_at = time.monotonic()
+        self._flushing = False
+        self._lock = threading.Lock()
+
+    def record(self, query: str) -> None:
+        query = normalize_query(query)
+        if not query:
+            return
+        with self._lock:
+            self.pending[query] += 1
+            self._pending_total += 1
+            if len(self.pending) > self.max_keys * 2:
+                self.pending = Counter(dict(self.pending.most_common(self.max_keys)))
+            due = not self._flushing and (
+                self._pending_total >= self.flush_threshold or time.monotonic() - self._flushed_at >= self.flush_interval
+            )
+            self._flushing = self._flushing or due
+        if due:
+            # Publishing costs a cache round trip per query, so it runs beside the request instead of inside it.
+            threading.Thread(target=self._flush_in_background, daemon=True).start()
+
+    def flush(self) -> int:
+        with self._lock:
+            pending, self.pending = self.pending, Counter()
+            self._pending_total = 0
+            self._flushed_at = time.monotonic()
+        if not pending:
+            return 0
+        window = self._window()
+        timeout = int(self.half_life * (POPULARITY_WINDOWS + 1))
+        for query, count in pending.items():
+            self._incr(self._count_key(window, query), count, timeout)
+        self._add_to_index(pending)
+        return len(pending)
+
+    def top(self, count: int) -> List[str]:
+        scores = Counter(self._load_scores(self._load_index()))
+        with self._lock:
+            scores.update(self.pending)
+        return [query for query, score in scores.most_common(count) if score > 0]
+
+    def _flush_in_background(self) -> None:
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error publishing query popularity: {e}")
+        finally:
+            with self._lock:
+                self._flushing = False
+
+    def _incr(self, key: str, delta: int, timeout: int) -> None:
+        # incr is atomic on shared backends, so concurrent workers never drop each other's counts.
+        try:
+            self.backend.incr(key, delta)
+        except ValueError:
+            if not self.backend.add(key, delta, timeout=timeout):
+                self.backend.incr(key, delta)
+
+    def _add_to_index(self, queries: Iterable[str]) -> None:
+        # Only the list of names is read-modify-write; a name lost to a race is re-added on its next flush.
+        index = self._load_index()
+        new_queries = [query for query in queries if query not in set(index)]
+        if not new_queries:
+            return
+        index = [*index, *new_queries]
+        if len(index) > self.max_keys:
+            index = [query for query, _ in Counter(self._load_scores(index)).most_common(self.max_keys)]
+        self.backend.set(self._index_key(), index, timeout=None)
+
+    def _load_index(self) -> List[str]:
+        index = self.backend.get(self._index_key())
+        return index if isinstance(index, list) else []
+
+    def _load_scores(self, queries: List[str]) -> Dict[str, float]:
+        # Counts live in half-life windows, each window weighing half as much as the next one.
+        window = self._window()
+        weights = {
+            self._count_key(window - age, query): (query, 0.5 ** age)
+            for query in queries
+            for age in range(POPULARITY_WINDOWS)
+        }
+        scores = dict.fromkeys(queries, 0.0)
+        for key, count in self.backend.get_many(list(weights)).items():
+            query, weight = weights[key]
+            scores[query] += count * weight
+        return scores
+
+    def _window(self) -> int:
+        return int(time.time() // self.half_life)
+
+    def _index_key(self) -> str:
+        return f"{self.cache_key}_queries"
+
+    def _count_key(self, window: int, query: str) -> str:
+        return f"{self.cache_key}_{window}_{query.replace(' ', '_')}"
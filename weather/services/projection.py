@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from weather.services.models import DailyForecast
+from weather.services.services_constants import (
+    FORECAST_DEFAULT_UNITS,
+    FORECAST_FIELDS,
+    FORECAST_MAX_DAYS,
+    FORECAST_TEMPERATURE_FIELDS,
+    FORECAST_UNITS,
+)
+
+
+TEMPERATURE_CONVERTERS: Dict[str, Callable[[float], float]] = {
+    "metric": lambda celsius: celsius,
+    "imperial": lambda celsius: round(celsius * 9 / 5 + 32, 2),
+    "standard": lambda celsius: round(celsius + 273.15, 2),
+}
+
+@dataclass(frozen=True)
+class ForecastProjection:
+    days: int = FORECAST_MAX_DAYS
+    fields: Tuple[str, ...] = FORECAST_FIELDS
+    units: str = FORECAST_DEFAULT_UNITS
+
+    @classmethod
+    def from_params(cls, days: str = "", fields: str = "", units: str = "") -> Optional["ForecastProjection"]:
+        if not (days or fields or units):
+            return None
+        try:
+            day_count = int(days) if days else FORECAST_MAX_DAYS
+        except ValueError:
+            raise ValueError("days must be an integer.")
+        if not 1 <= day_count <= FORECAST_MAX_DAYS:
+            raise ValueError(f"days must be between 1 and {FORECAST_MAX_DAYS}.")
+        selected = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip())) if fields else FORECAST_FIELDS
+        unknown = [field for field in selected if field not in FORECAST_FIELDS]
+        if not selected or unknown:
+            raise ValueError(f"fields must be a comma separated list of {', '.join(FORECAST_FIELDS)}.")
+        units = units or FORECAST_DEFAULT_UNITS
+        if units not in FORECAST_UNITS:
+            raise ValueError(f"units must be one of {', '.join(FORECAST_UNITS)}.")
+        return cls(day_count, tuple(field for field in FORECAST_FIELDS if field in selected), units)
+
+    def cache_params(self) -> Dict[str, Any]:
+        return {"days": self.days, "fields": ",".join(self.fields), "units": self.units}
+
+    def apply(self, forecast: Optional[List[DailyForecast]]) -> Optional[List[Dict[str, Any]]]:
+        # Cached forecasts are always full and metric; projections are cut from them per request.
+        if forecast is None:
+            return None
+        convert = TEMPERATURE_CONVERTERS[self.units]
+        projected = []
+        for day in forecast[:self.days]:
+            row: Dict[str, Any] = {"date": day.date}
+            for field in self.fields:
+                value = getattr(day, field)
+                row[field] = convert(value) if field in FORECAST_TEMPERATURE_FIELDS else value
+            projected.append(row)
+        return projected
@@ -0,0 +1,24 @@
+from typing import List
+from weather.services.models import City
+from weather.services.text_normalization import matches_prefix, normalize_query
+
+
+MATCH_EXACT = 3
+MATCH_NAME_PREFIX = 2
+MATCH_WORD_PREFIX = 1
+MATCH_NONE = 0
+
+def match_quality(query: str, city_name: str) -> int:
+    name = normalize_query(city_name)
+    if name == query:
+        return MATCH_EXACT
+    if name.startswith(query):
+        return MATCH_NAME_PREFIX
+    if matches_prefix(name, query):
+        return MATCH_WORD_PREFIX
+    return MATCH_NONE
+
+def rank_cities(query: str, cities: List[City]) -> List[City]:
+    # Best name match first, then the most popular place; the sort is stable so upstream order breaks ties.
+    query = normalize_query(query)
+    return sorted(cities, key=lambda city: (-match_quality(query, city.name), -city.popularity))
@@ -1,4 +1,49 @@
 CACHE_TIME_OUT_CITY=3600 # 1 hour
 CACHE_TIME_OUT_FORECAST=300 # 5 min
+CACHE_STALE_TIME_OUT_CITY=86400 # 1 day served stale after CACHE_TIME_OUT_CITY
+CACHE_STALE_TIME_OUT_FORECAST=1800 # 30 min served stale after CACHE_TIME_OUT_FORECAST
 CITY_TYPE = "city"
-MEXICO_COUNTRY = "México"
\ No newline at end of file
+MEXICO_COUNTRY = "México"
+SINGLE_FLIGHT_LOCK_TIMEOUT=10 # seconds, cross-worker lock expiry
+SINGLE_FLIGHT_WAIT_TIMEOUT=5 # seconds, max wait for another worker's fetch
+SINGLE_FLIGHT_POLL_INTERVAL=0.05 # seconds
+LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+FORECAST_COORDINATE_MODE="grid" # "grid" rounds to decimal places, "geohash" buckets by geohash cell
+FORECAST_COORDINATE_PRECISION=2 # grid: 2 decimals ~1.1 km; geohash: characters (5 ~4.9 km)
+
+GAZETTEER_MIN_PREFIX_LENGTH=3
+GAZETTEER_FUZZY_CUTOFF=0.85
+GAZETTEER_MAX_RESULTS=20
+GAZETTEER_DEFAULT_FILE="gazetteer.json"
+GAZETTEER_SAVE_DELAY=5 # seconds new entries are batched before one write, off the request path
+
+PREFIX_CACHE_MIN_LENGTH=3 # shortest cached query reused to answer longer type-ahead queries
+PREFIX_CACHE_MAX_PLACES=10 # Reservamos answers this long may be truncated, so they are not reused for longer queries
+
+L1_CACHE_MAX_ENTRIES=2048
+L1_CACHE_TIME_OUT=30 # seconds, bounds cross-worker staleness of the in-process tier
+
+FORECAST_MAX_CONCURRENCY=10 # upstream forecast lookups in flight per get_weather_forecast call
+FORECAST_DATE_CACHE_SIZE=1024 # formatted forecast dates kept in memory
+
+POPULARITY_CACHE_KEY="weather_query_popularity"
+POPULARITY_MAX_KEYS=500 # most searched queries kept in the shared counts
+POPULARITY_HALF_LIFE=3600 # seconds for a query's count to halve, so rankings follow recent traffic
+POPULARITY_WINDOWS=4 # half-life windows of counts kept and summed into a query's score
+POPULARITY_FLUSH_INTERVAL=30 # seconds between publishing a worker's counts to the shared cache
+POPULARITY_FLUSH_THRESHOLD=100 # recorded queries that trigger an earlier publish
+
+CACHE_WARMER_TOP_N=20
+CACHE_WARMER_DEFAULT_QUERIES=("cdmx", "guadalajara", "monterrey", "cancun") # warmed even before any traffic is seen
+CACHE_WARMER_REFRESH_RATIO=0.8 # one warm cycle is spread over this share of CACHE_TIME_OUT_FORECAST
+WARM_UP_CACHE_KEY="weather_warm_up" # read once at worker start to open the shared cache connection
+
+FORECAST_MAX_DAYS=8 # daily entries kept from the upstream forecast
+FORECAST_FIELDS=("temperature_max", "temperature_min", "weather") # selectable with fields=, the date is always returned
+FORECAST_TEMPERATURE_FIELDS=("temperature_max", "temperature_min")
+FORECAST_UNITS=("metric", "imperial", "standard") # Celsius, Fahrenheit, Kelvin as in the OpenWeather API
+FORECAST_DEFAULT_UNITS="metric"
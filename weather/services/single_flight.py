@@ -0,0 +1,107 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+from django.conf import settings
+from django.core.cache import cache
+from weather.clients.scheduler import PRIORITY_LOW, request_priority
+from weather.services.services_constants import (
+    LOCAL_CACHE_BACKENDS,
+    SINGLE_FLIGHT_LOCK_TIMEOUT,
+    SINGLE_FLIGHT_POLL_INTERVAL,
+    SINGLE_FLIGHT_WAIT_TIMEOUT,
+)
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+Fetch = Callable[[], Awaitable[Any]]
+Lookup = Callable[[], Optional[Any]]
+
+def is_shared_cache_backend() -> bool:
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    return backend not in LOCAL_CACHE_BACKENDS
+
+class SingleFlight:
+    def __init__(
+        self,
+        distributed: Optional[bool] = None,
+        lock_timeout: float = SINGLE_FLIGHT_LOCK_TIMEOUT,
+        wait_timeout: float = SINGLE_FLIGHT_WAIT_TIMEOUT,
+        poll_interval: float = SINGLE_FLIGHT_POLL_INTERVAL,
+    ) -> None:
+        self._distributed = distributed
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._in_flight: Dict[Tuple[asyncio.AbstractEventLoop, str], asyncio.Task] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def distributed(self) -> bool:
+        if self._distributed is None:
+            self._distributed = is_shared_cache_backend()
+        return self._distributed
+
+    async def do(self, key: str, fetch: Fetch, lookup: Optional[Lookup] = None) -> Any:
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        task = self._in_flight.get(flight_key)
+        if task is None:
+            task = loop.create_task(self._run(key, fetch, lookup))
+            self._in_flight[flight_key] = task
+            task.add_done_callback(lambda done: self._finish(flight_key, done))
+        # Shield the shared task so a cancelled caller does not cancel the fetch for everyone else.
+        return await asyncio.shield(task)
+
+    def do_in_background(self, key: str, fetch: Fetch) -> None:
+        if self.in_flight(key):
+            return
+        task = asyncio.get_running_loop().create_task(self._do_low_priority(key, fetch))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._finish_background)
+
+    async def _do_low_priority(self, key: str, fetch: Fetch) -> Any:
+        # The task runs in a copy of the caller's context, so this only lowers the priority of the refresh.
+        request_priority.set(PRIORITY_LOW)
+        return await self.do(key, fetch)
+
+    def in_flight(self, key: str) -> bool:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return (loop, key) in self._in_flight
+
+    def _finish(self, flight_key: Tuple[asyncio.AbstractEventLoop, str], task: asyncio.Task) -> None:
+        if self._in_flight.get(flight_key) is task:
+            del self._in_flight[flight_key]
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Single-flight fetch for {flight_key[1]} failed: {task.exception()}")
+
+    def _finish_background(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        # Errors are already logged by _finish; retrieve them so the task is not reported as unhandled.
+        if not task.cancelled():
+            task.exception()
+
+    async def _run(self, key: str, fetch: Fetch, lookup: Optional[Lookup]) -> Any:
+        if lookup is None or not self.distributed:
+            return await fetch()
+
+        lock_key = f"lock_{key}"
+        if await cache.aadd(lock_key, 1, timeout=self.lock_timeout):
+            try:
+                return await fetch()
+            finally:
+                await cache.adelete(lock_key)
+
+        deadline = time.monotonic() + self.wait_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            value = lookup()
+            if value is not None:
+                return value
+        logger.warning(f"Timed out waiting for another worker to fetch {key}, fetching it directly")
+        return await fetch()
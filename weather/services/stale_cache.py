@@ -0,0 +1,87 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from django.core.cache import cache
+from weather.services.cache_stats import CacheStats
+
+
+CacheEntry = Tuple[float, Any]
+
+class StaleWhileRevalidateCache:
+    def __init__(self, soft_timeout: int, stale_timeout: int, backend: Any = cache, name: str = "cache") -> None:
+        self.soft_timeout = soft_timeout
+        self.stale_timeout = stale_timeout
+        self.backend = backend
+        self.stats = CacheStats(name)
+
+    @property
+    def hard_timeout(self) -> int:
+        return self.soft_timeout + self.stale_timeout
+
+    def get(self, key: str) -> Tuple[Optional[Any], bool]:
+        entry = self.backend.get(key)
+        if not self._is_entry(entry):
+            self.stats.record_miss()
+            return None, False
+        soft_expires_at, value = entry
+        is_fresh = time.time() < soft_expires_at
+        self.stats.record_hit(is_fresh)
+        return value, is_fresh
+
+    def peek(self, key: str) -> Tuple[Optional[Any], Optional[float]]:
+        entry = self.backend.get(key)
+        return (entry[1], entry[0] - time.time()) if self._is_entry(entry) else (None, None)
+
+    def get_value(self, key: str) -> Optional[Any]:
+        entry = self.backend.get(key)
+        return entry[1] if self._is_entry(entry) else None
+
+    async def aget_many(self, keys: List[str]) -> Dict[str, Tuple[Any, bool]]:
+        entries = await self.backend.aget_many(keys)
+        now = time.time()
+        values: Dict[str, Tuple[Any, bool]] = {}
+        for key in keys:
+            entry = entries.get(key)
+            if not self._is_entry(entry):
+                self.stats.record_miss()
+                continue
+            soft_expires_at, value = entry
+            is_fresh = now < soft_expires_at
+            self.stats.record_hit(is_fresh)
+            values[key] = (value, is_fresh)
+        return values
+
+    def get_many_values(self, keys: List[str]) -> Dict[str, Any]:
+        entries = self.backend.get_many(keys)
+        return {key: entry[1] for key, entry in entries.items() if self._is_entry(entry)}
+
+    def set(self, key: str, value: Any) -> None:
+        entry: CacheEntry = (time.time() + self.soft_timeout, value)
+        self.backend.set(key, entry, timeout=self.hard_timeout)
+
+    async def aset_many(self, values: Dict[str, Any]) -> None:
+        soft_expires_at = time.time() + self.soft_timeout
+        await self.backend.aset_many({key: (soft_expires_at, value) for key, value in values.items()}, timeout=self.hard_timeout)
+
+    def batch(self) -> "CacheWriteBatch":
+        return CacheWriteBatch(self)
+
+    def _is_entry(self, entry: Any) -> bool:
+        return isinstance(entry, tuple) and len(entry) == 2
+
+class CacheWriteBatch:
+    def __init__(self, cache: StaleWhileRevalidateCache) -> None:
+        self.cache = cache
+        self.values: Dict[str, Any] = {}
+        self.flushed = False
+
+    async def add(self, key: str, value: Any) -> None:
+        # Fetches that outlive the request deadline finish after the flush and are written on their own.
+        if self.flushed:
+            await self.cache.aset_many({key: value})
+        else:
+            self.values[key] = value
+
+    async def flush(self) -> None:
+        self.flushed = True
+        if self.values:
+            await self.cache.aset_many(self.values)
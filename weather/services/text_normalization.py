@@ -0,0 +1,31 @@
+import unicodedata
+from typing import Callable, Iterable
+
+
+QueryNormalizer = Callable[[str], str]
+
+def strip_accents(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def strip_punctuation(text: str) -> str:
+    return "".join(" " if unicodedata.category(char).startswith("P") else char for char in text)
+
+def collapse_whitespace(text: str) -> str:
+    return " ".join(text.split())
+
+NORMALIZATION_PIPELINE: Iterable[QueryNormalizer] = (
+    strip_accents,
+    str.casefold,
+    strip_punctuation,
+    collapse_whitespace,
+)
+
+def normalize_query(query: str, pipeline: Iterable[QueryNormalizer] = NORMALIZATION_PIPELINE) -> str:
+    for normalizer in pipeline:
+        query = normalizer(query)
+    return query
+
+def matches_prefix(text: str, prefix: str) -> bool:
+    words = normalize_query(text).split()
+    return any(" ".join(words[index:]).startswith(prefix) for index in range(len(words)))
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from django.core.cache import cache
+from weather.services.cache_serializers import CompactSerializer
+from weather.services.services_constants import L1_CACHE_MAX_ENTRIES, L1_CACHE_TIME_OUT
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+class LocalLRUCache:
+    def __init__(self, max_entries: int = L1_CACHE_MAX_ENTRIES, max_timeout: int = L1_CACHE_TIME_OUT) -> None:
+        self.max_entries = max_entries
+        self.max_timeout = max_timeout
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        ttl = self.max_timeout if timeout is None else min(timeout, self.max_timeout)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class TieredCache:
+    def __init__(self, local: Optional[LocalLRUCache] = None, shared: Any = cache, serializer: Optional[CompactSerializer] = None) -> None:
+        self.local = local or LocalLRUCache()
+        self.shared = shared
+        self.serializer = serializer or CompactSerializer()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        data = self.shared.get(key)
+        if data is None:
+            return None
+        value = self._decode(key, data)
+        if value is not None:
+            self.local.set(key, value)
+        return value
+
+    def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        missing: List[str] = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                values[key] = value
+        if missing:
+            for key, data in self.shared.get_many(missing).items():
+                value = self._decode(key, data)
+                if value is not None:
+                    self.local.set(key, value)
+                    values[key] = value
+        return values
+
+    async def aget_many(self, keys: List[str]) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        missing: List[str] = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                values[key] = value
+        if missing:
+            # Django's aget_many awaits one aget per key, so run the backend's own multi-get off the loop instead.
+            for key, data in (await asyncio.to_thread(self.shared.get_many, missing)).items():
+                value = self._decode(key, data)
+                if value is not None:
+                    self.local.set(key, value)
+                    values[key] = value
+        return values
+
+    def set(self, key: str, value: Any, timeout: Optional[int] = None) -> None:
+        self.local.set(key, value, timeout)
+        self.shared.set(key, self.serializer.dumps(value), timeout=timeout)
+
+    async def aset_many(self, values: Dict[str, Any], timeout: Optional[int] = None) -> None:
+        for key, value in values.items():
+            self.local.set(key, value, timeout)
+        data = {key: self.serializer.dumps(value) for key, value in values.items()}
+        await asyncio.to_thread(self.shared.set_many, data, timeout=timeout)
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        self.shared.delete(key)
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.shared.clear()
+
+    def _decode(self, key: str, data: Any) -> Optional[Any]:
+        if not isinstance(data, bytes):
+            return None
+        try:
+            return self.serializer.loads(data)
+        except ValueError as e:
+            logger.warning(f"Discarding undecodable cache entry {key}: {e}")
+            return None
@@ -1,11 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any, TypeAlias
+from typing import AsyncIterator, List, Dict, Optional, Any, Tuple, TypeAlias
 from weather.services.city_service import CityList
+from weather.services.models import DailyForecast
+from weather.services.projection import ForecastProjection
 
 WeatherData: TypeAlias = Dict[str, Any]
-ForecastList: TypeAlias = Optional[List[WeatherData]]
+ForecastList: TypeAlias = Optional[List[DailyForecast]]
+IndexedForecast: TypeAlias = Tuple[int, ForecastList]
 
 class IWeatherService(ABC):
     @abstractmethod
-    async def get_weather_forecast(self, cities: CityList) -> ForecastList:
-        pass 
+    async def get_weather_forecast(self, cities: CityList, projection: Optional[ForecastProjection] = None) -> ForecastList:
+        pass
+
+    @abstractmethod
+    def iter_weather_forecast(self, cities: CityList, projection: Optional[ForecastProjection] = None) -> AsyncIterator[IndexedForecast]:
+        pass
+
+    @abstractmethod
+    async def refresh_weather_forecast(self, cities: CityList, ahead: float) -> int:
+        pass
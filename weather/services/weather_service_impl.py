@@ -1,50 +1,182 @@
-from datetime import datetime, timezone
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional
 import asyncio
+import logging
 from django.core.cache import cache
+from weather import deadline, metrics
 from weather.clients.openweather import IOpenWeatherClient
-from weather.services.weather_service import IWeatherService, ForecastList, WeatherData
+from weather.services.weather_service import IWeatherService, ForecastList, IndexedForecast, WeatherData
 from weather.services.city_service import CityList
-from weather.services.services_constants import CACHE_TIME_OUT_FORECAST
+from weather.services.coordinates import CoordinateCell, CoordinateQuantizer
+from weather.services.models import DailyForecast, format_forecast_date
+from weather.services.projection import ForecastProjection
+from weather.services.services_constants import (
+    CACHE_STALE_TIME_OUT_FORECAST,
+    CACHE_TIME_OUT_FORECAST,
+    FORECAST_COORDINATE_MODE,
+    FORECAST_COORDINATE_PRECISION,
+    FORECAST_MAX_CONCURRENCY,
+)
+from weather.services.single_flight import SingleFlight
+from weather.services.stale_cache import CacheWriteBatch, StaleWhileRevalidateCache
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
 
 class WeatherService(IWeatherService):
-    def __init__(self, openweather_client: IOpenWeatherClient) -> None:
+    def __init__(
+        self,
+        openweather_client: IOpenWeatherClient,
+        single_flight: Optional[SingleFlight] = None,
+        quantizer: Optional[CoordinateQuantizer] = None,
+        cache_backend: Any = cache,
+        max_concurrency: int = FORECAST_MAX_CONCURRENCY,
+    ) -> None:
         self.openweather_client = openweather_client
+        self.max_concurrency = max_concurrency
+        self.single_flight = single_flight or SingleFlight()
+        self.quantizer = quantizer or CoordinateQuantizer(FORECAST_COORDINATE_MODE, FORECAST_COORDINATE_PRECISION)
+        self.forecast_cache = StaleWhileRevalidateCache(
+            CACHE_TIME_OUT_FORECAST,
+            CACHE_STALE_TIME_OUT_FORECAST,
+            backend=cache_backend,
+            name="forecast",
+        )
     
-    async def get_weather_forecast(self, cities: CityList) -> ForecastList:
-        tasks = [
-            self._get_daily_forecast(city["latitude"], city["longitude"])
-            for city in cities
-        ]
-        return await asyncio.gather(*tasks)
+    async def get_weather_forecast(self, cities: CityList, projection: Optional[ForecastProjection] = None) -> ForecastList:
+        cells = [self.quantizer.quantize(city.latitude, city.longitude) for city in cities]
+        unique_cells = {cell.key: cell for cell in cells}
+        self.forecast_cache.stats.record_coalesced(len(cells) - len(unique_cells))
+        metrics.FORECAST_FANOUT.observe(len(unique_cells))
+        if not unique_cells:
+            return []
+        forecast_by_cell = await self._get_cached_daily_forecasts(unique_cells)
+        missing_cells = [cell for key, cell in unique_cells.items() if key not in forecast_by_cell]
+        if missing_cells:
+            forecast_by_cell.update(await self._load_daily_forecasts(missing_cells))
+        if projection is not None:
+            forecast_by_cell = {key: projection.apply(daily_forecast) for key, daily_forecast in forecast_by_cell.items()}
+        return [forecast_by_cell[cell.key] for cell in cells]
         
-    async def _get_daily_forecast(self, latitude: float, longitude: float) -> ForecastList:
-        daily_forecast = self._get_cached_forecast(latitude, longitude)
-        if daily_forecast is None:
-                weather_data = await self.openweather_client.get_weather(latitude, longitude)
-                daily_forecast = self._build_daily_forecast(weather_data)
-                self._set_cache_forecast(latitude, longitude, daily_forecast)
+    async def iter_weather_forecast(self, cities: CityList, projection: Optional[ForecastProjection] = None) -> AsyncIterator[IndexedForecast]:
+        positions: Dict[str, List[int]] = {}
+        unique_cells: Dict[str, CoordinateCell] = {}
+        for index, city in enumerate(cities):
+            cell = self.quantizer.quantize(city.latitude, city.longitude)
+            unique_cells.setdefault(cell.key, cell)
+            positions.setdefault(cell.key, []).append(index)
+        self.forecast_cache.stats.record_coalesced(len(cities) - len(unique_cells))
+        metrics.FORECAST_FANOUT.observe(len(unique_cells))
+
+        cached_forecasts = await self._get_cached_daily_forecasts(unique_cells)
+        for key, daily_forecast in cached_forecasts.items():
+            if projection is not None:
+                daily_forecast = projection.apply(daily_forecast)
+            for index in positions[key]:
+                yield index, daily_forecast
+
+        missing_cells = [cell for key, cell in unique_cells.items() if key not in cached_forecasts]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        writes = self.forecast_cache.batch()
+        tasks = [asyncio.ensure_future(self._load_bounded_daily_forecast(cell, semaphore, writes)) for cell in missing_cells]
+        completed_keys = set()
+        try:
+            for next_completed in asyncio.as_completed(tasks, timeout=deadline.remaining()):
+                key, daily_forecast = await next_completed
+                completed_keys.add(key)
+                if projection is not None:
+                    daily_forecast = projection.apply(daily_forecast)
+                for index in positions[key]:
+                    yield index, daily_forecast
+        except asyncio.TimeoutError:
+            logger.warning(f"Request deadline reached with {len(tasks) - len(completed_keys)} of {len(tasks)} forecasts pending")
+            for cell in missing_cells:
+                if cell.key not in completed_keys:
+                    for index in positions[cell.key]:
+                        yield index, None
+        finally:
+            for task in tasks:
+                task.cancel()
+            await writes.flush()
+
+    async def refresh_weather_forecast(self, cities: CityList, ahead: float) -> int:
+        unique_cells = {cell.key: cell for cell in (self.quantizer.quantize(city.latitude, city.longitude) for city in cities)}
+        refreshed = 0
+        for cell in unique_cells.values():
+            cache_key = self._cache_key(cell)
+            stale, fresh_for = await asyncio.to_thread(self.forecast_cache.peek, cache_key)
+            if fresh_for is not None and fresh_for > ahead:
+                continue
+            await self.single_flight.do(cache_key, lambda: self._fetch_daily_forecast(cell, stale=stale))
+            refreshed += 1
+        return refreshed
+
+    async def _get_cached_daily_forecasts(self, unique_cells: Dict[str, CoordinateCell]) -> Dict[str, ForecastList]:
+        cells_by_cache_key = {self._cache_key(cell): cell for cell in unique_cells.values()}
+        entries = await self.forecast_cache.aget_many(list(cells_by_cache_key))
+        forecast_by_cell = {}
+        for cache_key, (daily_forecast, is_fresh) in entries.items():
+            cell = cells_by_cache_key[cache_key]
+            if not is_fresh:
+                self.single_flight.do_in_background(cache_key, lambda cell=cell, stale=daily_forecast: self._fetch_daily_forecast(cell, stale=stale))
+            forecast_by_cell[cell.key] = daily_forecast
+        return forecast_by_cell
+
+    async def _load_daily_forecasts(self, cells: List[CoordinateCell]) -> Dict[str, ForecastList]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        writes = self.forecast_cache.batch()
+        tasks = {cell.key: asyncio.ensure_future(self._load_bounded_daily_forecast(cell, semaphore, writes)) for cell in cells}
+        _, pending = await asyncio.wait(tasks.values(), timeout=deadline.remaining())
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning(f"Request deadline reached with {len(pending)} of {len(tasks)} forecasts pending")
+        await writes.flush()
+        # Forecasts still pending at the deadline are reported as None so callers can flag them.
+        return {key: None if task in pending else task.result()[1] for key, task in tasks.items()}
+
+    async def _load_bounded_daily_forecast(self, cell: CoordinateCell, semaphore: asyncio.Semaphore, writes: CacheWriteBatch):
+        async with semaphore:
+            metrics.FORECAST_IN_FLIGHT.inc()
+            try:
+                return cell.key, await self._load_daily_forecast(cell, writes)
+            except Exception as e:
+                # One bad cell is reported as unavailable instead of failing every city on the page.
+                logger.error(f"Error loading forecast for (lat: {cell.latitude}, lon: {cell.longitude}): {e}")
+                return cell.key, []
+            finally:
+                metrics.FORECAST_IN_FLIGHT.dec()
+
+    async def _load_daily_forecast(self, cell: CoordinateCell, writes: CacheWriteBatch) -> ForecastList:
+        cache_key = self._cache_key(cell)
+        return await self.single_flight.do(
+            cache_key,
+            lambda: self._fetch_daily_forecast(cell, writes=writes),
+            lambda: self.forecast_cache.get_value(cache_key),
+        )
+
+    async def _fetch_daily_forecast(self, cell: CoordinateCell, stale: ForecastList = None, writes: Optional[CacheWriteBatch] = None) -> ForecastList:
+        weather_data = await self.openweather_client.get_weather(cell.latitude, cell.longitude)
+        if not weather_data or not weather_data.get("daily"):
+            logger.warning(f"OpenWeather lookup failed for (lat: {cell.latitude}, lon: {cell.longitude}), serving {'stale' if stale is not None else 'no'} data")
+            return stale if stale is not None else []
+        daily_forecast = self._build_daily_forecast(weather_data)
+        if writes is None:
+            await self.forecast_cache.aset_many({self._cache_key(cell): daily_forecast})
+        else:
+            await writes.add(self._cache_key(cell), daily_forecast)
         return daily_forecast
-    
-    def _get_cached_forecast(self, latitude: float, longitude: float) -> ForecastList:
-        cache_key = f"weather_forecast_{latitude}_{longitude}"
-        return cache.get(cache_key)
 
-    def _set_cache_forecast(self, latitude: float, longitude: float, daily_forecast) -> None:
-        cache_key = f"weather_forecast_{latitude}_{longitude}"
-        cache.set(cache_key, daily_forecast, timeout=CACHE_TIME_OUT_FORECAST)
+    def _cache_key(self, cell: CoordinateCell) -> str:
+        return f"weather_forecast_{cell.key}"
         
-    def _convert_unix_to_date(self, unix_timestamp: int) -> str:
-        date_obj = datetime.fromtimestamp(unix_timestamp, tz=timezone.utc)
-        return date_obj.strftime('%Y-%m-%d')
-
-    def _build_daily_forecast(self, weather_data: WeatherData) -> List[WeatherData]:
+    def _build_daily_forecast(self, weather_data: WeatherData) -> List[DailyForecast]:
         return [
-            {
-                "date": self._convert_unix_to_date(day["dt"]),
-                "temperature_max": day["temp"]["max"],
-                "temperature_min": day["temp"]["min"],
-                "weather": day["weather"][0]["description"],
-            }
+            DailyForecast(
+                format_forecast_date(day["dt"]),
+                day["temp"]["max"],
+                day["temp"]["min"],
+                day["weather"][0]["description"],
+            )
             for day in weather_data.get("daily", [])
-        ]
\ No newline at end of file
+        ]
@@ -0,0 +1,99 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+from django.core.cache import cache
+from weather.services.cache_warmer import CacheWarmer
+from weather.services.popularity import PopularityTracker
+from weather.services.weather_service_impl import WeatherService
+from weather.services.models import City
+
+@pytest.fixture
+def popularity():
+    cache.clear()
+    return PopularityTracker(cache_key="test_popularity")
+
+def test_popularity_ranks_normalized_queries(popularity):
+    for query in ["Cancún", "cancun", "CDMX", "monterrey", "cancun "]:
+        popularity.record(query)
+    popularity.record("cdmx")
+    assert popularity.top(2) == ["cancun", "cdmx"]
+
+def test_popularity_flush_adds_to_shared_counts(popularity):
+    other_worker = PopularityTracker(cache_key="test_popularity")
+    for _ in range(3):
+        other_worker.record("monterrey")
+    popularity.record("cdmx")
+    popularity.record("cdmx")
+    assert other_worker.flush() == 1
+    assert popularity.flush() == 1
+    assert not popularity.pending
+    popularity.record("monterrey")
+    assert popularity.flush() == 1
+    assert popularity.top(2) == ["monterrey", "cdmx"]
+    assert PopularityTracker(cache_key="test_popularity").top(2) == ["monterrey", "cdmx"]
+
+def test_popularity_decays_by_window(popularity, monkeypatch):
+    popularity.record("monterrey")
+    popularity.record("monterrey")
+    popularity.flush()
+    now = time.time()
+    monkeypatch.setattr("weather.services.popularity.time.time", lambda: now + popularity.half_life)
+    popularity.record("cdmx")
+    popularity.record("cdmx")
+    popularity.record("cdmx")
+    popularity.flush()
+    assert popularity._load_scores(["monterrey", "cdmx"]) == {"monterrey": 1.0, "cdmx": 3.0}
+
+def test_popularity_record_publishes_without_the_warmer(mocker):
+    thread = mocker.patch("weather.services.popularity.threading.Thread")
+    popularity = PopularityTracker(cache_key="test_popularity", flush_threshold=3)
+    popularity.record("cdmx")
+    popularity.record("cdmx")
+    thread.assert_not_called()
+    popularity.record("cdmx")
+    popularity.record("cdmx")
+    thread.assert_called_once_with(target=popularity._flush_in_background, daemon=True)
+    popularity._flush_in_background()
+    assert PopularityTracker(cache_key="test_popularity").top(1) == ["cdmx"]
+
+def test_warmer_fills_popular_queries_with_defaults(popularity):
+    popularity.record("puebla")
+    warmer = CacheWarmer(AsyncMock(), AsyncMock(), popularity, top_n=3, default_queries=["CDMX", "Puebla", "Cancún"])
+    assert warmer.queries() == ["puebla", "cdmx", "cancun"]
+
+@pytest.mark.asyncio
+async def test_warm_refreshes_cities_and_forecasts(popularity):
+    cities = [City("Monterrey", "NL", 25.6866, -100.3161)]
+    city_service = AsyncMock()
+    city_service.refresh_city_coordinates.side_effect = [cities, None, RuntimeError("boom")]
+    weather_service = AsyncMock()
+    weather_service.refresh_weather_forecast.return_value = 1
+    warmer = CacheWarmer(city_service, weather_service, popularity, refresh_window=60)
+    assert await warmer.warm(["monterrey", "atlantis", "cdmx"]) == 1
+    weather_service.refresh_weather_forecast.assert_awaited_once_with(cities, ahead=60)
+
+@pytest.mark.asyncio
+async def test_refresh_weather_forecast_only_fetches_expiring_cells():
+    cache.clear()
+    openweather_client = AsyncMock()
+    openweather_client.get_weather.return_value = {"daily": [{"dt": 1727827200, "temp": {"max": 25, "min": 15}, "weather": [{"description": "clear sky"}]}]}
+    weather_service = WeatherService(openweather_client)
+    cities = [
+        City("Ciudad de México", "DF", 19.4326, -99.1332),
+        City("Zócalo", "DF", 19.4301, -99.1298),
+        City("Monterrey", "NL", 25.6866, -100.3161),
+    ]
+    assert await weather_service.refresh_weather_forecast(cities, ahead=60) == 2
+    assert await weather_service.refresh_weather_forecast(cities, ahead=60) == 0
+    assert await weather_service.refresh_weather_forecast(cities, ahead=weather_service.forecast_cache.soft_timeout + 1) == 2
+    assert openweather_client.get_weather.await_count == 4
+
+@pytest.mark.asyncio
+async def test_run_reads_shared_cache_off_the_event_loop(popularity, mocker):
+    warmer = CacheWarmer(AsyncMock(), AsyncMock(), popularity, refresh_window=60)
+    warmer.warm = AsyncMock(side_effect=asyncio.CancelledError)
+    to_thread = mocker.spy(asyncio, "to_thread")
+    with pytest.raises(asyncio.CancelledError):
+        await warmer._run()
+    assert [call.args[0] for call in to_thread.call_args_list] == [popularity.flush, warmer.queries]
@@ -0,0 +1,97 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+import pytest
+from weather.clients.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, ResilientCaller
+from weather.clients.resilient_impl import ResilientOpenWeatherClient, ResilientReservamosClient
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker("test", failure_rate_threshold=0.5, window_size=4, min_calls=4, open_duration=10, slow_call_threshold=1)
+
+def test_breaker_opens_on_failure_rate(breaker):
+    for success in (True, False, True, False):
+        breaker.record(success, 0.1)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+def test_breaker_counts_slow_calls_as_failures(breaker):
+    for _ in range(4):
+        breaker.record(True, 2)
+    assert breaker.state == OPEN
+
+def test_breaker_half_open_probe(breaker):
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    with patch("time.monotonic", return_value=breaker._opened_at + 11):
+        assert breaker.allow_request()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow_request()
+        breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+
+def test_breaker_half_open_failure_reopens(breaker):
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    with patch("time.monotonic", return_value=breaker._opened_at + 11):
+        breaker.allow_request()
+    breaker.record(False, 0.1)
+    assert breaker.state == OPEN
+
+@pytest.mark.asyncio
+async def test_cancelled_half_open_call_releases_its_slot(breaker):
+    for _ in range(4):
+        breaker.record(False, 0.1)
+    breaker._opened_at -= 11
+    caller = ResilientCaller(breaker)
+    task = asyncio.ensure_future(caller.call(lambda: asyncio.sleep(1), lambda result: False, None))
+    await asyncio.sleep(0)
+    assert breaker.state == HALF_OPEN
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast_to_fallback(breaker):
+    inner = AsyncMock()
+    inner.get_weather.return_value = {}
+    client = ResilientOpenWeatherClient(inner, ResilientCaller(breaker))
+    for _ in range(4):
+        assert await client.get_weather(19.43, -99.13) == {}
+    assert await client.get_weather(19.43, -99.13) == {}
+    assert inner.get_weather.await_count == 4
+
+@pytest.mark.asyncio
+async def test_reservamos_empty_list_is_not_an_error(breaker):
+    inner = AsyncMock()
+    inner.get_cities.return_value = []
+    client = ResilientReservamosClient(inner, ResilientCaller(breaker))
+    for _ in range(5):
+        assert await client.get_cities("atlantis") == []
+    assert breaker.state == CLOSED
+
+@pytest.mark.asyncio
+async def test_exception_is_recorded_and_falls_back(breaker):
+    caller = ResilientCaller(breaker)
+    result = await caller.call(AsyncMock(side_effect=RuntimeError("boom")), is_error=lambda result: result is None, fallback=None)
+    assert result is None
+    assert breaker.failure_rate == 1.0
+
+@pytest.mark.asyncio
+async def test_hedged_request_returns_first_good_answer(breaker):
+    caller = ResilientCaller(breaker, hedging=True, hedge_min_samples=1, hedge_min_delay=0.01)
+    caller.latencies.record(0.01)
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            await asyncio.sleep(1)
+            return {"daily": "slow"}
+        return {"daily": "hedged"}
+
+    result = await caller.call(call, is_error=lambda result: not result, fallback={})
+    assert result == {"daily": "hedged"}
+    assert calls == 2
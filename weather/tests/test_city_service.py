@@ -1,8 +1,10 @@
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, Mock
+import time
 import pytest
 from weather.services.city_service_impl import CityService
 from weather.clients.reservamos_impl import ReservamosClient
-from weather.services.services_constants import CACHE_TIME_OUT_CITY
+from weather.services.services_constants import CACHE_STALE_TIME_OUT_CITY, CACHE_TIME_OUT_CITY, PREFIX_CACHE_MAX_PLACES
+from weather.services.models import City
 
 @pytest.fixture
 def mock_reservamos_client():
@@ -15,9 +17,9 @@ def city_service(mock_reservamos_client):
 @pytest.mark.asyncio
 async def test_get_city_coordinates_with_cache(city_service):
     cached_data = [
-        {"name": "Ciudad de México", "latitude": 19.4326, "longitude": -99.1332}
+        City("Ciudad de México", None, 19.4326, -99.1332)
     ]
-    with patch("django.core.cache.cache.get", return_value=cached_data) as mock_cache_get:
+    with patch("django.core.cache.cache.get", return_value=(time.time() + 60, cached_data)) as mock_cache_get:
         result = await city_service.get_city_coordinates("cdmx")
         assert result == cached_data
         city_service.reservamos_client.get_cities.assert_not_called()
@@ -27,12 +29,32 @@ async def test_get_city_coordinates_with_cache(city_service):
 async def test_get_city_coordinates_empty_response(city_service, mock_reservamos_client):
     mock_reservamos_client.get_cities.return_value = []
     with patch("django.core.cache.cache.get", return_value=None) as mock_cache_get, \
+         patch("django.core.cache.cache.get_many", return_value={}), \
          patch("django.core.cache.cache.set") as mock_cache_set:
         result = await city_service.get_city_coordinates("unknown_city")
         assert result == []
-        mock_cache_set.assert_called_once_with("city_coordinates_unknown_city", [], timeout=CACHE_TIME_OUT_CITY)
+        mock_cache_set.assert_called_once()
+        assert mock_cache_set.call_args.args[0] == "city_coordinates_unknown_city"
+        assert mock_cache_set.call_args.args[1][1] == []
+        assert mock_cache_set.call_args.kwargs == {"timeout": CACHE_TIME_OUT_CITY + CACHE_STALE_TIME_OUT_CITY}
         mock_cache_get.assert_called_once_with("city_coordinates_unknown_city")
 
+@pytest.mark.asyncio
+async def test_get_city_coordinates_upstream_error_is_not_cached(city_service, mock_reservamos_client):
+    mock_reservamos_client.get_cities.return_value = None
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.set") as mock_cache_set:
+        result = await city_service.get_city_coordinates("cdmx")
+        assert result is None
+        mock_cache_set.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_city_coordinates_upstream_error_serves_stale(city_service, mock_reservamos_client):
+    stale_data = [City("Ciudad de México", None, 19.4326, -99.1332)]
+    mock_reservamos_client.get_cities.return_value = None
+    result = await city_service._fetch_city_list("cdmx", stale=stale_data)
+    assert result == stale_data
+
 def test_build_cities(city_service):
     places = [
         {"display": "Ciudad de México", "lat": 19.4326, "long": -99.1332, "result_type": "city", "state": "Distrito Federal", "country": "México"},
@@ -43,9 +65,111 @@ def test_build_cities(city_service):
         {"display": "No Mexico Place", "lat": 19.4326, "long": -99.1332, "result_type": "city", "state": "New York", "country": "USA"},
     ]
     expected_result = [
-        {"name": "Ciudad de México", "latitude": 19.4326, "longitude": -99.1332, "state": "Distrito Federal"},
-        {"name": "Monterrey", "latitude": 25.6866, "longitude": -100.3161, "state": "Nuevo Leon"}
+        City("Ciudad de México", "Distrito Federal", 19.4326, -99.1332),
+        City("Monterrey", "Nuevo Leon", 25.6866, -100.3161)
     ]
     
     result = city_service._build_cities(places)
     assert result == expected_result
+
+@pytest.mark.asyncio
+async def test_get_city_coordinates_from_gazetteer_alias(mock_reservamos_client):
+    gazetteer = Mock()
+    gazetteer.lookup.return_value = [City("Monterrey", None, 25.6866, -100.3161)]
+    city_service = CityService(reservamos_client=mock_reservamos_client, gazetteer=gazetteer)
+    with patch("django.core.cache.cache.get") as mock_cache_get:
+        result = await city_service.get_city_coordinates("monterrey")
+    assert result == gazetteer.lookup.return_value
+    mock_cache_get.assert_not_called()
+    mock_reservamos_client.get_cities.assert_not_called()
+    gazetteer.search.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_city_coordinates_prefers_reservamos_over_gazetteer_matches(mock_reservamos_client):
+    gazetteer = Mock()
+    gazetteer.lookup.return_value = None
+    gazetteer.add_cities.return_value = 0
+    mock_reservamos_client.get_cities.return_value = [
+        {"display": "Monclova", "lat": 26.9103, "long": -101.4222, "result_type": "city", "state": "Coahuila", "country": "México"},
+        {"display": "Monterrey", "lat": 25.6866, "long": -100.3161, "result_type": "city", "state": "Nuevo Leon", "country": "México"},
+    ]
+    city_service = CityService(reservamos_client=mock_reservamos_client, gazetteer=gazetteer)
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.get_many", return_value={}), \
+         patch("django.core.cache.cache.set"):
+        result = await city_service.get_city_coordinates("mon")
+    assert {city.name for city in result} == {"Monclova", "Monterrey"}
+    mock_reservamos_client.get_cities.assert_awaited_once_with("mon")
+    gazetteer.search.assert_not_called()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("places", [None, []])
+async def test_get_city_coordinates_falls_back_to_gazetteer_matches(mock_reservamos_client, places):
+    gazetteer = Mock()
+    gazetteer.lookup.return_value = None
+    gazetteer.search.return_value = [City("Monterrey", None, 25.6866, -100.3161)]
+    gazetteer.add_cities.return_value = 0
+    mock_reservamos_client.get_cities.return_value = places
+    city_service = CityService(reservamos_client=mock_reservamos_client, gazetteer=gazetteer)
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.get_many", return_value={}), \
+         patch("django.core.cache.cache.set"):
+        result = await city_service.get_city_coordinates("monterey")
+    assert result == gazetteer.search.return_value
+    mock_reservamos_client.get_cities.assert_awaited_once_with("monterey")
+
+@pytest.mark.asyncio
+async def test_get_city_coordinates_indexes_reservamos_results(mock_reservamos_client):
+    gazetteer = Mock()
+    gazetteer.lookup.return_value = None
+    gazetteer.add_cities.return_value = 1
+    mock_reservamos_client.get_cities.return_value = [
+        {"display": "Monterrey", "lat": 25.6866, "long": -100.3161, "result_type": "city", "state": "Nuevo Leon", "country": "México"},
+    ]
+    city_service = CityService(reservamos_client=mock_reservamos_client, gazetteer=gazetteer)
+    with patch("django.core.cache.cache.get", return_value=None), patch("django.core.cache.cache.set"):
+        result = await city_service.get_city_coordinates("mty")
+    gazetteer.add_cities.assert_called_once_with("mty", result)
+    gazetteer.schedule_save.assert_called_once()
+    gazetteer.save.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_city_coordinates_normalizes_query(city_service, mock_reservamos_client):
+    mock_reservamos_client.get_cities.return_value = []
+    with patch("django.core.cache.cache.get", return_value=None) as mock_cache_get, \
+         patch("django.core.cache.cache.get_many", return_value={}), \
+         patch("django.core.cache.cache.set"):
+        await city_service.get_city_coordinates("  Nuevo LEÓN ")
+    mock_cache_get.assert_called_once_with("city_coordinates_nuevo_leon")
+    mock_reservamos_client.get_cities.assert_awaited_once_with("nuevo leon")
+
+@pytest.mark.asyncio
+async def test_get_city_coordinates_served_from_shorter_prefix(city_service, mock_reservamos_client):
+    cached_prefix = [
+        City("Monterrey", "Nuevo Leon", 25.6866, -100.3161),
+        City("Montemorelos", "Nuevo Leon", 25.1872, -99.8267),
+        City("Morelia", "Michoacán", 19.706, -101.195),
+    ]
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.get_many", return_value={"city_prefix_mon": (time.time() + 60, cached_prefix)}) as mock_get_many:
+        result = await city_service.get_city_coordinates("Monter")
+    assert result == cached_prefix[:1]
+    mock_get_many.assert_called_once_with(["city_prefix_monte", "city_prefix_mont", "city_prefix_mon"])
+    mock_reservamos_client.get_cities.assert_not_called()
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("place_count, reusable", [(3, True), (PREFIX_CACHE_MAX_PLACES, False)])
+async def test_only_complete_answers_are_reused_for_prefixes(city_service, mock_reservamos_client, place_count, reusable):
+    mock_reservamos_client.get_cities.return_value = [
+        {"display": f"Monte {index}", "lat": 25.0 + index, "long": -100.0, "result_type": "city", "state": "Nuevo Leon", "country": "México"}
+        for index in range(place_count)
+    ]
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.set") as mock_cache_set:
+        await city_service.get_city_coordinates("mon")
+    assert [call.args[0] for call in mock_cache_set.call_args_list] == ["city_coordinates_mon"] + (["city_prefix_mon"] if reusable else [])
+
+@pytest.mark.asyncio
+async def test_get_city_coordinates_blank_query(city_service, mock_reservamos_client):
+    assert await city_service.get_city_coordinates("   ") is None
+    mock_reservamos_client.get_cities.assert_not_called()
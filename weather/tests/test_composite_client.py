@@ -0,0 +1,61 @@
+import asyncio
+from unittest.mock import AsyncMock
+import pytest
+from weather.clients.composite_impl import CompositeForecastClient
+
+FORECAST = {"daily": [{"dt": 1727827200, "temp": {"max": 25.0, "min": 15.0}, "weather": [{"description": "clear sky"}]}]}
+
+def provider(result=FORECAST, delay=0.0):
+    async def get_weather(latitude, longitude):
+        await asyncio.sleep(delay)
+        return result
+    client = AsyncMock()
+    client.get_weather.side_effect = get_weather
+    return client
+
+@pytest.mark.asyncio
+async def test_falls_back_to_next_provider_on_empty_answer():
+    primary, secondary = provider(result={}), provider()
+    client = CompositeForecastClient([("primary", primary), ("secondary", secondary)], probe_rate=0)
+    assert await client.get_weather(19.43, -99.13) == FORECAST
+    primary.get_weather.assert_awaited_once()
+    assert client.providers[0].error_rate == 1.0
+
+@pytest.mark.asyncio
+async def test_routes_to_fastest_healthy_provider():
+    primary, secondary = provider(), provider()
+    client = CompositeForecastClient([("primary", primary), ("secondary", secondary)], probe_rate=0)
+    client.providers[0].record(True, 0.5)
+    client.providers[1].record(True, 0.1)
+    assert [provider.name for provider in client.ranked_providers()] == ["secondary", "primary"]
+    client.providers[1].record(False, 0.1)
+    client.providers[1].record(False, 0.1)
+    assert [provider.name for provider in client.ranked_providers()] == ["primary", "secondary"]
+
+def test_unmeasured_provider_is_tried_before_measured_ones():
+    client = CompositeForecastClient([("primary", provider()), ("secondary", provider())], probe_rate=0)
+    client.providers[0].record(True, 0.1)
+    assert [provider.name for provider in client.ranked_providers()] == ["secondary", "primary"]
+
+def test_probes_another_provider_first(monkeypatch):
+    client = CompositeForecastClient([("primary", provider()), ("secondary", provider()), ("tertiary", provider())], probe_rate=0.05)
+    for index, latency in enumerate((0.1, 0.2, 0.3)):
+        client.providers[index].record(True, latency)
+    monkeypatch.setattr("weather.clients.composite_impl.random.random", lambda: 0.5)
+    assert [provider.name for provider in client.ranked_providers()] == ["primary", "secondary", "tertiary"]
+    monkeypatch.setattr("weather.clients.composite_impl.random.random", lambda: 0.01)
+    monkeypatch.setattr("weather.clients.composite_impl.random.choice", lambda providers: providers[-1])
+    assert [provider.name for provider in client.ranked_providers()] == ["tertiary", "primary", "secondary"]
+
+@pytest.mark.asyncio
+async def test_racing_returns_first_good_answer():
+    slow, fast = provider(delay=1), provider(result={"daily": [FORECAST["daily"][0] | {"dt": 1}]}, delay=0.01)
+    client = CompositeForecastClient([("slow", slow), ("fast", fast)], racing=True)
+    result = await asyncio.wait_for(client.get_weather(19.43, -99.13), timeout=0.5)
+    assert result["daily"][0]["dt"] == 1
+    assert client.providers[1].latency() < 0.5
+
+@pytest.mark.asyncio
+async def test_returns_empty_when_every_provider_fails():
+    client = CompositeForecastClient([("a", provider(result={})), ("b", provider(result={"daily": []}))], racing=True)
+    assert await client.get_weather(19.43, -99.13) == {}
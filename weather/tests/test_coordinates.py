@@ -0,0 +1,28 @@
+import pytest
+from weather.services.coordinates import CoordinateQuantizer, decode_geohash, encode_geohash
+
+def test_grid_quantize_normalizes_formatting():
+    quantizer = CoordinateQuantizer(mode="grid", precision=2)
+    cell = quantizer.quantize("19.4326", "-99.1332")
+    assert cell.key == "19.43_-99.13"
+    assert (cell.latitude, cell.longitude) == (19.43, -99.13)
+    assert quantizer.quantize(19.43, -99.13).key == cell.key
+
+def test_grid_quantize_negative_zero():
+    cell = CoordinateQuantizer(mode="grid", precision=1).quantize(-0.01, 0.01)
+    assert cell.key == "0.0_0.0"
+
+def test_geohash_quantize():
+    cell = CoordinateQuantizer(mode="geohash", precision=5).quantize(19.4326, -99.1332)
+    assert cell.key == "gh_9g3w8"
+    assert cell.latitude == pytest.approx(19.4326, abs=0.03)
+    assert cell.longitude == pytest.approx(-99.1332, abs=0.03)
+
+def test_geohash_round_trip():
+    latitude, longitude = decode_geohash(encode_geohash(25.6866, -100.3161, 9))
+    assert latitude == pytest.approx(25.6866, abs=1e-4)
+    assert longitude == pytest.approx(-100.3161, abs=1e-4)
+
+def test_unknown_mode():
+    with pytest.raises(ValueError):
+        CoordinateQuantizer(mode="hexagon")
@@ -0,0 +1,24 @@
+import asyncio
+import pytest
+from weather.deadline import deadline_scope, expired, remaining, wait_with_deadline
+
+def test_remaining_without_deadline():
+    assert remaining() is None
+    assert not expired()
+
+def test_nested_scope_keeps_earliest_deadline():
+    with deadline_scope(0.5) as outer:
+        with deadline_scope(10) as inner:
+            assert inner == outer
+            assert remaining() <= 0.5
+    assert remaining() is None
+
+def test_scope_at_absolute_deadline():
+    with deadline_scope(at=0.0):
+        assert expired()
+
+@pytest.mark.asyncio
+async def test_wait_with_deadline_times_out():
+    with deadline_scope(0.01):
+        with pytest.raises(asyncio.TimeoutError):
+            await wait_with_deadline(asyncio.sleep(1))
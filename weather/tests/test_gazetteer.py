@@ -0,0 +1,73 @@
+import pytest
+from weather.services.gazetteer_impl import CityGazetteer
+from weather.services.models import City
+
+CITIES = [
+    City("Ciudad de México", "Distrito Federal", 19.4326, -99.1332),
+    City("Monterrey", "Nuevo León", 25.6866, -100.3161),
+    City("Ciudad Juárez", "Chihuahua", 31.6904, -106.4245),
+]
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    gazetteer = CityGazetteer(tmp_path / "gazetteer.json")
+    gazetteer.add_cities("", CITIES)
+    return gazetteer
+
+def test_search_prefix_is_accent_and_case_insensitive(gazetteer):
+    assert [city.name for city in gazetteer.search("MONTE")] == ["Monterrey"]
+    assert [city.name for city in gazetteer.search("juarez")] == ["Ciudad Juárez"]
+    assert [city.name for city in gazetteer.search("ciudad")] == ["Ciudad de México", "Ciudad Juárez"]
+
+def test_search_fuzzy(gazetteer):
+    assert [city.name for city in gazetteer.search("monterey")] == ["Monterrey"]
+
+def test_search_alias(gazetteer):
+    gazetteer.add_cities("CDMX", CITIES[:1])
+    assert gazetteer.search("cdmx") == CITIES[:1]
+
+def test_lookup_only_matches_aliases(gazetteer):
+    gazetteer.add_cities("mty", CITIES[1:2])
+    assert gazetteer.lookup("MTY") == CITIES[1:2]
+    assert gazetteer.lookup("monte") is None
+    assert gazetteer.lookup("monterey") is None
+
+def test_search_miss(gazetteer):
+    assert gazetteer.search("oaxaca") is None
+    assert gazetteer.search("mo") is None
+    assert gazetteer.search("  ") is None
+
+def test_add_cities_counts_only_new_entries(gazetteer):
+    assert gazetteer.add_cities("", CITIES) == 0
+    assert gazetteer.add_cities("mty", CITIES[1:2]) == 1
+    assert gazetteer.add_cities("mty", CITIES[1:2]) == 0
+
+def test_save_and_load(gazetteer, tmp_path):
+    gazetteer.add_cities("cdmx", CITIES[:1])
+    gazetteer.save()
+    loaded = CityGazetteer(tmp_path / "gazetteer.json")
+    assert len(loaded) == 3
+    assert loaded.search("cdmx") == CITIES[:1]
+
+def test_save_merges_entries_written_by_other_workers(tmp_path):
+    path = tmp_path / "gazetteer.json"
+    first, second = CityGazetteer(path), CityGazetteer(path)
+    first.add_cities("cdmx", CITIES[:1])
+    second.add_cities("mty", CITIES[1:2])
+    first.save()
+    second.save()
+    assert second.lookup("cdmx") == CITIES[:1]
+    loaded = CityGazetteer(path)
+    assert loaded.lookup("cdmx") == CITIES[:1]
+    assert loaded.lookup("mty") == CITIES[1:2]
+
+def test_schedule_save_batches_writes(tmp_path, mocker):
+    gazetteer = CityGazetteer(tmp_path / "gazetteer.json", save_delay=60)
+    timer = mocker.patch("weather.services.gazetteer_impl.threading.Timer")
+    gazetteer.add_cities("cdmx", CITIES[:1])
+    gazetteer.schedule_save()
+    gazetteer.schedule_save()
+    timer.assert_called_once_with(60, gazetteer.save)
+    gazetteer.save()
+    timer.return_value.cancel.assert_called_once()
+    assert CityGazetteer(tmp_path / "gazetteer.json").lookup("cdmx") == CITIES[:1]
@@ -0,0 +1,63 @@
+import asyncio
+import httpx
+import pytest
+from weather.clients.http_pool import HttpClientPool
+
+@pytest.fixture
+def http_pool():
+    return HttpClientPool(max_connections=10, max_keepalive_connections=5, http2=False)
+
+@pytest.mark.asyncio
+async def test_get_client_reuses_client_in_same_loop(http_pool):
+    client = http_pool.get_client()
+    assert http_pool.get_client() is client
+    assert client.timeout.connect == http_pool.timeout.connect
+    await http_pool.aclose()
+
+@pytest.mark.asyncio
+async def test_aclose_closes_client(http_pool):
+    client = http_pool.get_client()
+    await http_pool.aclose()
+    assert client.is_closed
+    assert http_pool.get_client() is not client
+    await http_pool.aclose()
+
+def test_get_client_is_per_event_loop(http_pool):
+    async def get_client():
+        return http_pool.get_client()
+
+    first = asyncio.run(get_client())
+    second = asyncio.run(get_client())
+    assert first is not second
+    assert first.is_closed and second.is_closed
+    assert not http_pool._clients
+
+def test_client_transport_is_released_when_its_loop_closes():
+    class RecordingTransport(httpx.AsyncBaseTransport):
+        closed = 0
+
+        async def handle_async_request(self, request):
+            return httpx.Response(200)
+
+        async def aclose(self):
+            RecordingTransport.closed += 1
+
+    http_pool = HttpClientPool(http2=False, transport=RecordingTransport())
+
+    async def request():
+        return (await http_pool.get_client().get("https://api.example.com/")).status_code
+
+    # Each asyncio.run is a fresh loop, as async_to_sync gives every WSGI request.
+    assert asyncio.run(request()) == 200
+    assert asyncio.run(request()) == 200
+    assert RecordingTransport.closed == 2
+    assert not http_pool._clients and not http_pool._closers
+
+@pytest.mark.asyncio
+async def test_get_client_uses_custom_transport():
+    transport = httpx.MockTransport(lambda request: httpx.Response(201, json={"host": request.url.host}))
+    http_pool = HttpClientPool(http2=False, transport=transport)
+    response = await http_pool.get_client().get("https://search.reservamos.mx/api/v2/places")
+    assert response.status_code == 201
+    assert response.json() == {"host": "search.reservamos.mx"}
+    await http_pool.aclose()
@@ -0,0 +1,52 @@
+import importlib
+import pytest
+from weather import inject_container
+from weather.inject_container import get_container, reset_container
+
+@pytest.fixture
+def container_env(monkeypatch):
+    monkeypatch.setenv("OPENWEATHER_API_KEY", "test_api_key")
+    monkeypatch.setenv("GAZETTEER_ENABLED", "false")
+    reset_container()
+    yield
+    reset_container()
+
+def test_importing_views_does_not_build_container(monkeypatch):
+    monkeypatch.delenv("OPENWEATHER_API_KEY", raising=False)
+    reset_container()
+    import weather.views
+
+    importlib.reload(weather.views)
+    assert inject_container._container is None
+
+def test_get_container_is_built_once_per_process(container_env, monkeypatch):
+    container = get_container()
+    assert get_container() is container
+    monkeypatch.setattr(inject_container.os, "getpid", lambda: -1)
+    assert get_container() is not container
+
+def test_preload_does_not_build_container(monkeypatch):
+    monkeypatch.delenv("OPENWEATHER_API_KEY", raising=False)
+    reset_container()
+    inject_container.preload()
+    assert inject_container._container is None
+
+def test_get_container_reports_missing_configuration_on_first_use(monkeypatch):
+    monkeypatch.delenv("OPENWEATHER_API_KEY", raising=False)
+    monkeypatch.setattr(inject_container, "load_dotenv", lambda: None)
+    reset_container()
+    with pytest.raises(ValueError):
+        get_container()
+
+@pytest.mark.asyncio
+async def test_warm_up_runs_hooks(container_env, mocker):
+    container = get_container()
+    warm_up_caches = mocker.spy(container, "warm_up_caches")
+    warm_up_gazetteer = mocker.spy(container, "warm_up_gazetteer")
+    await container.warm_up()
+    try:
+        assert container.http_pool._clients
+        warm_up_caches.assert_called_once()
+        warm_up_gazetteer.assert_called_once()
+    finally:
+        await container.aclose()
@@ -0,0 +1,35 @@
+import pytest
+from unittest.mock import AsyncMock
+from weather.lifespan import LifespanMiddleware
+
+def build_receive(*messages):
+    queue = list(messages)
+
+    async def receive():
+        return {"type": queue.pop(0)}
+    return receive
+
+@pytest.mark.asyncio
+async def test_lifespan_runs_hooks():
+    on_startup, on_shutdown = AsyncMock(), AsyncMock()
+    app = LifespanMiddleware(AsyncMock(), on_startup=[on_startup], on_shutdown=[on_shutdown])
+    send = AsyncMock()
+    await app({"type": "lifespan"}, build_receive("lifespan.startup", "lifespan.shutdown"), send)
+
+    on_startup.assert_awaited_once()
+    on_shutdown.assert_awaited_once()
+    assert [call.args[0]["type"] for call in send.await_args_list] == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+@pytest.mark.asyncio
+async def test_lifespan_startup_failure():
+    app = LifespanMiddleware(AsyncMock(), on_startup=[AsyncMock(side_effect=RuntimeError("boom"))])
+    send = AsyncMock()
+    await app({"type": "lifespan"}, build_receive("lifespan.startup"), send)
+    send.assert_awaited_once_with({"type": "lifespan.startup.failed", "message": "boom"})
+
+@pytest.mark.asyncio
+async def test_http_scope_is_forwarded():
+    inner_app = AsyncMock()
+    app = LifespanMiddleware(inner_app)
+    await app({"type": "http"}, None, None)
+    inner_app.assert_awaited_once_with({"type": "http"}, None, None)
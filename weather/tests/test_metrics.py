@@ -0,0 +1,63 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock
+from django.http import JsonResponse
+from weather import metrics
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram("test_duration_seconds", "Test latency.", buckets=(0.1, 1.0))
+    histogram.observe(0.05, host="a")
+    histogram.observe(0.5, host="a")
+    histogram.observe(5, host="a")
+    output = registry.render()
+    assert '# TYPE test_duration_seconds histogram' in output
+    assert 'test_duration_seconds_bucket{host="a",le="0.1"} 1' in output
+    assert 'test_duration_seconds_bucket{host="a",le="1"} 2' in output
+    assert 'test_duration_seconds_bucket{host="a",le="+Inf"} 3' in output
+    assert 'test_duration_seconds_count{host="a"} 3' in output
+
+def test_cache_stats_collector():
+    registry = metrics.MetricsRegistry()
+    registry.add_collector(metrics.cache_stats_collector(lambda: {
+        "city": {"hits": 3, "stale_hits": 1, "misses": 4, "coalesced": 2, "hit_rate": 0.5},
+    }))
+    output = registry.render()
+    assert 'weather_cache_lookups_total{cache="city",result="hit"} 3' in output
+    assert 'weather_cache_lookups_total{cache="city",result="miss"} 4' in output
+    assert 'weather_cache_hit_ratio{cache="city"} 0.5' in output
+
+def test_observe_upstream_records_status():
+    before = metrics.UPSTREAM_LATENCY.count(host="test.host", status=200)
+    with metrics.observe_upstream("test.host") as record_status:
+        record_status(200)
+    with pytest.raises(RuntimeError):
+        with metrics.observe_upstream("test.host"):
+            raise RuntimeError("boom")
+    assert metrics.UPSTREAM_LATENCY.count(host="test.host", status=200) == before + 1
+    assert metrics.UPSTREAM_LATENCY.count(host="test.host", status="error") >= 1
+
+@pytest.mark.asyncio
+async def test_instrument_view_adds_server_timing():
+    @metrics.instrument_view("test", add_server_timing=True)
+    async def view(request):
+        with metrics.measure("city"):
+            pass
+        return JsonResponse({})
+
+    before = metrics.VIEW_LATENCY.count(view="test", status=200)
+    response = await view(Mock())
+    assert response["Server-Timing"].startswith("city;dur=")
+    assert "total;dur=" in response["Server-Timing"]
+    assert metrics.VIEW_LATENCY.count(view="test", status=200) == before + 1
+
+@pytest.mark.asyncio
+async def test_event_loop_lag_monitor_records_blocking():
+    monitor = metrics.EventLoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0)
+    time.sleep(0.05)
+    await asyncio.sleep(0.02)
+    await monitor.stop()
+    assert metrics.EVENT_LOOP_LAG_MAX.value() >= 0.03
@@ -0,0 +1,43 @@
+import json
+import pytest
+from httpx import HTTPStatusError, Response
+from weather.clients.open_meteo_impl import OpenMeteoClient
+from weather.services.weather_service_impl import WeatherService
+from weather.services.models import DailyForecast
+
+@pytest.fixture
+def open_meteo_client():
+    return OpenMeteoClient()
+
+@pytest.mark.asyncio
+async def test_get_weather_normalizes_to_openweather_shape(mocker, open_meteo_client):
+    mock_response = mocker.Mock(spec=Response)
+    mock_response.status_code = 200
+    mock_response.content = json.dumps({
+        "latitude": 19.4,
+        "daily": {
+            "time": [1727827200, 1727913600],
+            "weather_code": [0, 1000],
+            "temperature_2m_max": [25.0, 22.0],
+            "temperature_2m_min": [15.0, 14.0],
+        },
+    }).encode()
+    mock_get = mocker.patch("httpx.AsyncClient.get", return_value=mock_response)
+    result = await open_meteo_client.get_weather(latitude=19.4326, longitude=-99.1332)
+    assert result == {
+        "daily": [
+            {"dt": 1727827200, "temp": {"min": 15.0, "max": 25.0}, "weather": [{"description": "clear sky"}]},
+            {"dt": 1727913600, "temp": {"min": 14.0, "max": 22.0}, "weather": [{"description": "unknown"}]},
+        ]
+    }
+    assert "timeformat=unixtime" in mock_get.call_args.args[0]
+    assert WeatherService(open_meteo_client)._build_daily_forecast(result)[0] == DailyForecast("2024-10-02", 25.0, 15.0, "clear sky")
+
+@pytest.mark.asyncio
+async def test_get_weather_http_error(mocker, open_meteo_client):
+    mock_response = mocker.Mock(spec=Response)
+    mock_response.status_code = 429
+    mock_response.raise_for_status.side_effect = HTTPStatusError("HTTP error", request=None, response=mock_response)
+    mocker.patch("httpx.AsyncClient.get", return_value=mock_response)
+    result = await open_meteo_client.get_weather(latitude=19.4326, longitude=-99.1332)
+    assert result == {}
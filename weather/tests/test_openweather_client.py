@@ -1,6 +1,8 @@
+import json
 import pytest
 from httpx import HTTPStatusError, Response
 from weather.clients.openweather_impl import OpenWeatherClient
+from weather.json_codec import JsonCodec, get_codec
 
 @pytest.fixture
 def openweather_client():
@@ -10,10 +12,24 @@ def openweather_client():
 async def test_get_weather_success(mocker, openweather_client):
     mock_response = mocker.Mock(spec=Response)
     mock_response.status_code = 200
-    mock_response.json.return_value = {"daily": [{"temp": {"max": 25, "min": 15}, "weather": [{"description": "clear sky"}]}]}
-    mocker.patch("httpx.AsyncClient.get", return_value=mock_response)
+    mock_response.content = json.dumps({
+        "lat": 19.4326,
+        "daily": [{"dt": 1727827200, "humidity": 40, "temp": {"day": 20, "max": 25, "min": 15}, "weather": [{"id": 800, "description": "clear sky"}]}],
+    }).encode()
+    mock_get = mocker.patch("httpx.AsyncClient.get", return_value=mock_response)
     result = await openweather_client.get_weather(latitude=19.4326, longitude=-99.1332)
-    assert result == {"daily": [{"temp": {"max": 25, "min": 15}, "weather": [{"description": "clear sky"}]}]}
+    assert result == {"daily": [{"dt": 1727827200, "temp": {"max": 25, "min": 15}, "weather": [{"description": "clear sky"}]}]}
+    assert "exclude=current,minutely,hourly,alerts" in mock_get.call_args.args[0]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("codec", [JsonCodec(), get_codec()])
+async def test_get_weather_decodes_with_codec(mocker, codec):
+    mock_response = mocker.Mock(spec=Response)
+    mock_response.status_code = 200
+    mock_response.content = b'{"daily": [{"dt": 1, "temp": {"max": 2, "min": 1}, "weather": []}]}'
+    mocker.patch("httpx.AsyncClient.get", return_value=mock_response)
+    result = await OpenWeatherClient(api_key="test_api_key", codec=codec).get_weather(latitude=19.4326, longitude=-99.1332)
+    assert result == {"daily": [{"dt": 1, "temp": {"max": 2, "min": 1}, "weather": []}]}
 
 @pytest.mark.asyncio
 async def test_get_weather_http_error(mocker, openweather_client):
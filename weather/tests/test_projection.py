@@ -0,0 +1,28 @@
+import pytest
+from weather.services.models import DailyForecast
+from weather.services.projection import ForecastProjection
+from weather.services.services_constants import FORECAST_FIELDS, FORECAST_MAX_DAYS
+
+FORECAST = [
+    DailyForecast("2024-10-02", 25.0, 15.0, "clear sky"),
+    DailyForecast("2024-10-03", 22.0, 14.0, "partly cloudy"),
+]
+
+def test_from_params_without_projection_returns_none():
+    assert ForecastProjection.from_params() is None
+
+def test_from_params_normalizes_fields():
+    projection = ForecastProjection.from_params(fields="weather, temperature_max,weather")
+    assert projection == ForecastProjection(FORECAST_MAX_DAYS, ("temperature_max", "weather"), "metric")
+    assert projection.cache_params() == {"days": FORECAST_MAX_DAYS, "fields": "temperature_max,weather", "units": "metric"}
+
+@pytest.mark.parametrize("units, expected", [("metric", 25.0), ("imperial", 77.0), ("standard", 298.15)])
+def test_apply_converts_temperatures(units, expected):
+    projected = ForecastProjection(days=1, units=units).apply(FORECAST)
+    assert projected == [{"date": "2024-10-02", "temperature_max": expected, "temperature_min": projected[0]["temperature_min"], "weather": "clear sky"}]
+
+def test_apply_keeps_missing_forecasts():
+    projection = ForecastProjection(fields=FORECAST_FIELDS[:1])
+    assert projection.apply(None) is None
+    assert projection.apply([]) == []
+    assert projection.apply(FORECAST)[1] == {"date": "2024-10-03", "temperature_max": 22.0}
@@ -0,0 +1,17 @@
+from weather.services.models import City
+from weather.services.ranking import MATCH_EXACT, MATCH_NAME_PREFIX, MATCH_NONE, MATCH_WORD_PREFIX, match_quality, rank_cities
+
+def test_match_quality():
+    assert match_quality("leon", "León") == MATCH_EXACT
+    assert match_quality("leon", "León de los Aldama") == MATCH_NAME_PREFIX
+    assert match_quality("leon", "Ciudad León") == MATCH_WORD_PREFIX
+    assert match_quality("leon", "Guanajuato") == MATCH_NONE
+
+def test_rank_cities_orders_by_match_then_popularity():
+    cities = [
+        City("Ciudad León", "CHIS", 16.0, -92.0, popularity=0.9),
+        City("León de los Aldama", "GTO", 21.1, -101.6, popularity=0.2),
+        City("León", "GTO", 21.12, -101.68, popularity=0.1),
+        City("León Guzmán", "DGO", 25.2, -103.6, popularity=0.5),
+    ]
+    assert [city.name for city in rank_cities("León", cities)] == ["León", "León Guzmán", "León de los Aldama", "Ciudad León"]
@@ -1,4 +1,5 @@
 
+import json
 import pytest
 from httpx import HTTPStatusError, Response
 from weather.clients.reservamos_impl import ReservamosClient
@@ -11,14 +12,14 @@ def reservamos_client():
 async def test_get_cities_success(mocker, reservamos_client):
     mock_response = mocker.Mock(spec=Response)
     mock_response.status_code = 201
-    mock_response.json.return_value = [
-        {"display": "Ciudad de México", "lat": 19.4326, "long": -99.1332, "country": "México"},
-        {"display": "Monterrey", "lat": 25.6866, "long": -100.3161, "country": "México"}
-    ]
+    mock_response.content = json.dumps([
+        {"display": "Ciudad de México", "lat": 19.4326, "long": -99.1332, "country": "México", "slug": "ciudad-de-mexico", "popularity": "1.0"},
+        {"display": "Monterrey", "lat": 25.6866, "long": -100.3161, "country": "México", "id": 2}
+    ]).encode()
     mocker.patch("httpx.AsyncClient.get", return_value=mock_response)
     result = await reservamos_client.get_cities("mexico")
     expected_result = [
-        {"display": "Ciudad de México", "lat": 19.4326, "long": -99.1332, "country": "México"},
+        {"display": "Ciudad de México", "lat": 19.4326, "long": -99.1332, "country": "México", "popularity": "1.0"},
         {"display": "Monterrey", "lat": 25.6866, "long": -100.3161, "country": "México"}
     ]
     assert result == expected_result
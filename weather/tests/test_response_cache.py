@@ -0,0 +1,72 @@
+import time
+import pytest
+from unittest.mock import AsyncMock
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import RequestFactory
+from django.utils.http import http_date
+from weather.response_cache import ResponseCache
+from weather.services.models import City, DailyForecast
+from weather.views import WeatherForecastView
+
+@pytest.fixture
+def response_cache():
+    backend = LocMemCache("response-test", {})
+    backend.clear()
+    return ResponseCache(backend=backend, max_age=300)
+
+@pytest.fixture
+def view(response_cache):
+    city_service = AsyncMock()
+    city_service.get_city_coordinates.return_value = [City("Monterrey", "NL", 25.6866, -100.3161)]
+    weather_service = AsyncMock()
+    weather_service.get_weather_forecast.return_value = [[DailyForecast("2024-10-02", 25.0, 15.0, "clear sky")]]
+    return WeatherForecastView(city_service, weather_service, response_cache=response_cache)
+
+def test_cache_key_is_stable_and_backend_safe(response_cache):
+    key = response_cache.cache_key("forecast", {"city": "nuevo leon", "days": 3})
+    assert key == response_cache.cache_key("forecast", {"days": 3, "city": "nuevo leon"})
+    assert " " not in key
+    assert key != response_cache.cache_key("forecast", {"city": "nuevo leon"})
+
+@pytest.mark.asyncio
+async def test_repeat_request_is_served_from_response_cache(view):
+    first = await view.get_weather_forecast(RequestFactory().get("/api/forecast/", {"city": "Monterrey"}))
+    second = await view.get_weather_forecast(RequestFactory().get("/api/forecast/", {"city": "  MONTERREY"}))
+    assert first.status_code == second.status_code == 200
+    assert first.content == second.content
+    assert first["ETag"] == second["ETag"]
+    assert second["Cache-Control"].startswith("public, max-age=")
+    view.city_service.get_city_coordinates.assert_awaited_once()
+    assert view.response_cache.stats.hits == 1
+
+@pytest.mark.asyncio
+async def test_if_none_match_returns_not_modified(view):
+    first = await view.get_weather_forecast(RequestFactory().get("/api/forecast/", {"city": "monterrey"}))
+    second = await view.get_weather_forecast(
+        RequestFactory().get("/api/forecast/", {"city": "monterrey"}, HTTP_IF_NONE_MATCH=first["ETag"])
+    )
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second["ETag"] == first["ETag"]
+
+@pytest.mark.asyncio
+async def test_if_modified_since_returns_not_modified(view):
+    await view.get_weather_forecast(RequestFactory().get("/api/forecast/", {"city": "monterrey"}))
+    response = await view.get_weather_forecast(
+        RequestFactory().get("/api/forecast/", {"city": "monterrey"}, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 1))
+    )
+    assert response.status_code == 304
+
+@pytest.mark.asyncio
+async def test_partial_results_are_not_cached(view):
+    view.weather_service.get_weather_forecast.return_value = [None]
+    response = await view.get_weather_forecast(RequestFactory().get("/api/forecast/", {"city": "monterrey"}))
+    assert response["Cache-Control"] == "no-store"
+    assert "ETag" not in response
+    await view.get_weather_forecast(RequestFactory().get("/api/forecast/", {"city": "monterrey"}))
+    assert view.city_service.get_city_coordinates.await_count == 2
+
+def test_expired_entry_is_a_miss(response_cache):
+    key = response_cache.cache_key("forecast", {"city": "cdmx"})
+    response_cache.backend.set(key, (time.time() - 301, '"etag"', "{}"))
+    assert response_cache.get(key) is None
@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+import pytest
+from httpx import Response
+from weather.clients.scheduler import PRIORITY_LOW, TokenBucket, UpstreamScheduler, priority
+
+HOST = "api.example.com"
+
+@pytest.fixture
+def scheduler():
+    return UpstreamScheduler(max_concurrency_per_host=2, max_retries=2, backoff_base=0.01, backoff_max=0.05)
+
+def test_token_bucket_reports_wait_time():
+    bucket = TokenBucket(rate=10, capacity=1)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.1, abs=0.01)
+
+@pytest.mark.asyncio
+async def test_send_limits_concurrency_per_host(scheduler):
+    in_flight, peak = 0, 0
+
+    async def request():
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return Response(200)
+
+    await asyncio.gather(*(scheduler.send(HOST, request) for _ in range(6)))
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_send_serves_high_priority_first(scheduler):
+    scheduler.set_rate_limit(HOST, rate=50, burst=1)
+    order = []
+
+    def request(name):
+        async def send():
+            order.append(name)
+            return Response(200)
+        return send
+
+    async def send_low(name):
+        with priority(PRIORITY_LOW):
+            return await scheduler.send(HOST, request(name))
+
+    await scheduler.send(HOST, request("first"))
+    await asyncio.gather(send_low("refresh"), scheduler.send(HOST, request("user")))
+    assert order == ["first", "user", "refresh"]
+
+@pytest.mark.asyncio
+async def test_send_retries_rate_limited_responses(scheduler):
+    request = AsyncMock(side_effect=[Response(429, headers={"Retry-After": "0"}), Response(200)])
+    with patch("asyncio.sleep", AsyncMock()) as mock_sleep:
+        response = await scheduler.send(HOST, request)
+    assert response.status_code == 200
+    assert request.await_count == 2
+    assert 0 <= mock_sleep.await_args.args[0] <= 0.01
+
+@pytest.mark.asyncio
+async def test_send_gives_up_after_max_retries(scheduler):
+    request = AsyncMock(return_value=Response(429))
+    with patch("asyncio.sleep", AsyncMock()):
+        response = await scheduler.send(HOST, request)
+    assert response.status_code == 429
+    assert request.await_count == 3
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot(scheduler):
+    blocker = asyncio.Event()
+
+    async def slow_request():
+        await blocker.wait()
+        return Response(200)
+
+    running = [asyncio.ensure_future(scheduler.send(HOST, slow_request)) for _ in range(2)]
+    waiting = asyncio.ensure_future(scheduler.send(HOST, slow_request))
+    await asyncio.sleep(0)
+    waiting.cancel()
+    blocker.set()
+    await asyncio.gather(*running)
+    assert scheduler._in_flight[HOST] == 0
+    assert (await scheduler.send(HOST, AsyncMock(return_value=Response(200)))).status_code == 200
+
+def test_rate_limited_waiter_wakes_up_on_a_new_loop():
+    scheduler = UpstreamScheduler()
+    scheduler.set_rate_limit(HOST, rate=10, burst=1)
+
+    async def request():
+        return Response(200)
+
+    async def abandon_waiter():
+        await scheduler.send(HOST, request)
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scheduler.send(HOST, request), timeout=0.01)
+
+    async def send_again():
+        return await asyncio.wait_for(scheduler.send(HOST, request), timeout=1)
+
+    # Each asyncio.run is a fresh loop, as async_to_sync gives every WSGI request.
+    asyncio.run(abandon_waiter())
+    assert asyncio.run(send_again()).status_code == 200
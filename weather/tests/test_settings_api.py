@@ -0,0 +1,22 @@
+import importlib
+from weather_api import settings_api
+
+def load_settings_api(monkeypatch, admin_enabled):
+    monkeypatch.setenv("DJANGO_ADMIN_ENABLED", admin_enabled)
+    return importlib.reload(settings_api)
+
+def test_api_profile_drops_unused_apps_middleware_and_database(monkeypatch):
+    settings = load_settings_api(monkeypatch, "false")
+    assert settings.INSTALLED_APPS == ["weather"]
+    assert settings.MIDDLEWARE == [
+        "django.middleware.security.SecurityMiddleware",
+        "django.middleware.common.CommonMiddleware",
+    ]
+    assert settings.DATABASES == {}
+    assert settings.ROOT_URLCONF == "weather_api.urls"
+
+def test_api_profile_keeps_full_stack_when_admin_enabled(monkeypatch):
+    settings = load_settings_api(monkeypatch, "true")
+    assert "django.contrib.admin" in settings.INSTALLED_APPS
+    assert "django.contrib.sessions.middleware.SessionMiddleware" in settings.MIDDLEWARE
+    assert settings.DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3"
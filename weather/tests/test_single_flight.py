@@ -0,0 +1,63 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+import pytest
+from weather.services.single_flight import SingleFlight
+
+@pytest.fixture
+def single_flight():
+    return SingleFlight(distributed=False)
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_fetch(single_flight):
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return ["forecast"]
+
+    results = await asyncio.gather(*(single_flight.do("key", fetch) for _ in range(10)))
+    assert results == [["forecast"]] * 10
+    assert calls == 1
+    assert not single_flight.in_flight("key")
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_fetch(single_flight):
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return "value"
+
+    first = asyncio.ensure_future(single_flight.do("key", fetch))
+    second = asyncio.ensure_future(single_flight.do("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "value"
+
+@pytest.mark.asyncio
+async def test_fetch_error_is_propagated_to_all_callers(single_flight):
+    fetch = AsyncMock(side_effect=RuntimeError("upstream down"))
+    results = await asyncio.gather(single_flight.do("key", fetch), single_flight.do("key", fetch), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    fetch.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_distributed_waits_for_other_worker():
+    single_flight = SingleFlight(distributed=True, wait_timeout=1, poll_interval=0.001)
+    fetch = AsyncMock(return_value="fetched")
+    lookup_values = iter([None, "cached"])
+    with patch("django.core.cache.cache.aadd", AsyncMock(return_value=False)):
+        result = await single_flight.do("key", fetch, lambda: next(lookup_values))
+    assert result == "cached"
+    fetch.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_distributed_releases_lock_after_fetch():
+    single_flight = SingleFlight(distributed=True)
+    fetch = AsyncMock(return_value="fetched")
+    with patch("django.core.cache.cache.aadd", AsyncMock(return_value=True)) as mock_add, \
+         patch("django.core.cache.cache.adelete", AsyncMock()) as mock_delete:
+        result = await single_flight.do("key", fetch, lambda: None)
+    assert result == "fetched"
+    mock_add.assert_awaited_once()
+    mock_delete.assert_awaited_once_with("lock_key")
@@ -0,0 +1,14 @@
+import pytest
+from weather.services.text_normalization import matches_prefix, normalize_query
+
+@pytest.mark.parametrize("query", ["Monterrey", "monterrey ", "MONTERREY", "  Monterréy"])
+def test_normalize_query_folds_variants(query):
+    assert normalize_query(query) == "monterrey"
+
+def test_normalize_query_punctuation_and_whitespace():
+    assert normalize_query("Cd.  Juárez,\tChih") == "cd juarez chih"
+
+def test_matches_prefix():
+    assert matches_prefix("Ciudad Juárez", "juar")
+    assert matches_prefix("Ciudad de México", "de mex")
+    assert not matches_prefix("Ciudad de México", "exico")
@@ -0,0 +1,85 @@
+import pickle
+from unittest.mock import patch
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from weather.services.cache_serializers import CompactSerializer
+from weather.services.models import City, DailyForecast
+from weather.services.tiered_cache import LocalLRUCache, TieredCache
+
+FORECAST = [
+    {"date": "2024-10-02", "temperature_max": 25.0, "temperature_min": 15.0, "weather": "clear sky"},
+    {"date": "2024-10-03", "temperature_max": 22.0, "temperature_min": 14.0, "weather": "partly cloudy"},
+]
+
+@pytest.fixture
+def shared_cache():
+    return LocMemCache("tiered-test", {})
+
+@pytest.fixture
+def tiered_cache(shared_cache):
+    return TieredCache(local=LocalLRUCache(max_entries=2), shared=shared_cache, serializer=CompactSerializer(use_msgpack=False))
+
+@pytest.mark.parametrize("use_msgpack", [True, False])
+def test_serializer_round_trip(use_msgpack):
+    serializer = CompactSerializer(use_msgpack=use_msgpack)
+    entry = (1727839969.5, FORECAST)
+    assert serializer.loads(serializer.dumps(entry)) == entry
+
+def test_serializer_packs_records_as_rows():
+    data = CompactSerializer(use_msgpack=False).dumps(FORECAST)
+    assert data.count(b"temperature_max") == 1
+
+def test_get_reads_through_to_shared_cache(tiered_cache, shared_cache):
+    tiered_cache.set("key", (1.0, FORECAST), timeout=60)
+    assert isinstance(shared_cache.get("key"), bytes)
+    tiered_cache.local.clear()
+    assert tiered_cache.get("key") == (1.0, FORECAST)
+    with patch.object(shared_cache, "get") as mock_shared_get:
+        assert tiered_cache.get("key") == (1.0, FORECAST)
+        mock_shared_get.assert_not_called()
+
+def test_get_many_combines_tiers(tiered_cache, shared_cache):
+    tiered_cache.set("a", [1], timeout=60)
+    tiered_cache.set("b", [2], timeout=60)
+    tiered_cache.local.delete("b")
+    assert tiered_cache.get_many(["a", "b", "c"]) == {"a": [1], "b": [2]}
+
+@pytest.mark.asyncio
+async def test_aget_many_and_aset_many_use_one_shared_round_trip(tiered_cache, shared_cache):
+    with patch.object(shared_cache, "set_many", wraps=shared_cache.set_many) as mock_set_many:
+        await tiered_cache.aset_many({"a": [1], "b": [2]}, timeout=60)
+    mock_set_many.assert_called_once()
+    tiered_cache.local.delete("b")
+    with patch.object(shared_cache, "get_many", wraps=shared_cache.get_many) as mock_get_many:
+        assert await tiered_cache.aget_many(["a", "b", "c"]) == {"a": [1], "b": [2]}
+    mock_get_many.assert_called_once_with(["b", "c"])
+    assert tiered_cache.local.get("b") == [2]
+
+def test_local_cache_evicts_least_recently_used():
+    local = LocalLRUCache(max_entries=2)
+    local.set("a", 1)
+    local.set("b", 2)
+    local.get("a")
+    local.set("c", 3)
+    assert local.get("b") is None
+    assert local.get("a") == 1
+
+def test_undecodable_shared_entry_is_ignored(tiered_cache, shared_cache):
+    shared_cache.set("legacy", [{"name": "pickled"}])
+    assert tiered_cache.get("legacy") is None
+
+def test_serializer_round_trips_models():
+    serializer = CompactSerializer(use_msgpack=False)
+    cities = [City("Monterrey", "Nuevo León", 25.6866, -100.3161), City("Morelia", None, 19.706, -101.195)]
+    forecast = [DailyForecast("2024-10-02", 25.0, 15.0, "clear sky")]
+    assert serializer.loads(serializer.dumps((1.0, cities))) == (1.0, cities)
+    assert serializer.loads(serializer.dumps(forecast)) == forecast
+    assert b"Monterrey" in serializer.dumps(cities) and b"latitude" not in serializer.dumps(cities)
+
+def test_models_are_slotted_and_pickle():
+    # Plain locmem, file and DB caches pickle entries, so slotted frozen models must survive the round trip.
+    city = City("Monterrey", "Nuevo León", 25.6866, -100.3161, 0.5)
+    forecast = DailyForecast("2024-10-02", 25.0, 15.0, "clear sky")
+    assert not hasattr(city, "__dict__") and not hasattr(forecast, "__dict__")
+    assert pickle.loads(pickle.dumps((1.0, [city]))) == (1.0, [city])
+    assert pickle.loads(pickle.dumps([forecast])) == [forecast]
@@ -1,7 +1,12 @@
+import asyncio
+import json
 import pytest
 from unittest.mock import AsyncMock, Mock
 from django.http import JsonResponse
 from weather.views import WeatherForecastView, weather_forecast
+from weather.views_constants import BATCH_MAX_QUERIES
+from weather.services.models import City
+from weather.services.projection import ForecastProjection
 
 @pytest.fixture
 def mock_city_service():
@@ -18,7 +23,7 @@ def weather_forecast_view_instance(mock_city_service, mock_weather_service):
 @pytest.mark.asyncio
 async def test_get_weather_forecast_success(mocker, weather_forecast_view_instance, mock_city_service, mock_weather_service):
     mock_city_service.get_city_coordinates.return_value = [
-        {"name": "Ciudad de México", "latitude": 19.4326, "longitude": -99.1332, "state": "DF"}
+        City("Ciudad de México", "DF", 19.4326, -99.1332)
     ]
     mock_weather_service.get_weather_forecast.return_value = [
         [
@@ -35,16 +40,18 @@ async def test_get_weather_forecast_success(mocker, weather_forecast_view_instan
             {   
                 "state": "DF",
                 "city": "Ciudad de México",
+                "status": "ok",
                 "forecast": [
                     {"date": "2024-10-02", "temperature_max": 25.0, "temperature_min": 15.0, "weather": "clear sky"},
                     {"date": "2024-10-03", "temperature_max": 22.0, "temperature_min": 14.0, "weather": "partly cloudy"}
                 ]
             }
-        ]
+        ],
+        "next_cursor": None,
     })
 
     assert response.status_code == 200
-    assert response.content == expected_response.content
+    assert json.loads(response.content) == json.loads(expected_response.content)
 
 @pytest.mark.asyncio
 async def test_get_weather_forecast_no_city_provided(weather_forecast_view_instance):
@@ -65,4 +72,228 @@ async def test_get_weather_forecast_city_not_found(weather_forecast_view_instanc
     expected_response = JsonResponse({"error": "No cities found for the given name."}, status=404)
 
     assert response.status_code == 404
-    assert response.content == expected_response.content
\ No newline at end of file
+    assert response.content == expected_response.content
+
+def build_batch_request(payload):
+    mock_request = Mock()
+    mock_request.body = json.dumps(payload).encode()
+    return mock_request
+
+@pytest.mark.asyncio
+async def test_get_batch_weather_forecast_dedupes_lookups(weather_forecast_view_instance, mock_city_service, mock_weather_service):
+    cities = {
+        "cdmx": [City("Ciudad de México", "DF", 19.4326, -99.1332)],
+        "monterrey": [City("Monterrey", "NL", 25.6866, -100.3161)],
+    }
+    mock_city_service.get_city_coordinates.side_effect = lambda city_name: cities.get(city_name)
+    mock_weather_service.get_weather_forecast.side_effect = lambda unique_cities, projection=None: [[{"date": city.name}] for city in unique_cities]
+    request = build_batch_request({"queries": [
+        "cdmx",
+        "monterrey",
+        "cdmx",
+        {"name": "Zócalo", "latitude": 19.4326, "longitude": -99.1332},
+        "atlantis",
+    ]})
+
+    response = await weather_forecast_view_instance.get_batch_weather_forecast(request)
+    results = json.loads(response.content)["results"]
+
+    assert response.status_code == 200
+    assert mock_city_service.get_city_coordinates.await_count == 3
+    mock_weather_service.get_weather_forecast.assert_awaited_once()
+    assert len(mock_weather_service.get_weather_forecast.await_args.args[0]) == 2
+    assert results[0] == results[2]
+    assert results[0]["results"] == [{"state": "DF", "city": "Ciudad de México", "status": "ok", "forecast": [{"date": "Ciudad de México"}]}]
+    assert results[3]["results"][0]["city"] == "Zócalo"
+    assert results[3]["results"][0]["forecast"] == results[0]["results"][0]["forecast"]
+    assert results[4] == {"query": "atlantis", "error": "No cities found for the given name.", "results": []}
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("payload", [{}, {"queries": []}, {"queries": [42]}, {"queries": [{"latitude": "north"}]}, {"queries": ["  "]}, ["cdmx"]])
+async def test_get_batch_weather_forecast_invalid_payload(weather_forecast_view_instance, payload):
+    response = await weather_forecast_view_instance.get_batch_weather_forecast(build_batch_request(payload))
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_batch_weather_forecast_too_many_queries(weather_forecast_view_instance):
+    request = build_batch_request({"queries": ["cdmx"] * (BATCH_MAX_QUERIES + 1)})
+    response = await weather_forecast_view_instance.get_batch_weather_forecast(request)
+    assert response.status_code == 400
+
+async def read_streaming_content(response):
+    return b"".join([chunk async for chunk in response.streaming_content])
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_streams_ndjson(weather_forecast_view_instance, mock_city_service, mock_weather_service):
+    mock_city_service.get_city_coordinates.return_value = [
+        City("Ciudad de México", "DF", 19.4326, -99.1332),
+        City("Monterrey", "NL", 25.6866, -100.3161),
+    ]
+
+    async def iter_weather_forecast(cities, projection=None):
+        yield 1, [{"date": "2024-10-02"}]
+        yield 0, []
+    mock_weather_service.iter_weather_forecast = iter_weather_forecast
+    mock_request = Mock()
+    mock_request.GET = {"city": "mexico", "stream": "ndjson"}
+
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+    lines = (await read_streaming_content(response)).decode().splitlines()
+
+    assert response["Content-Type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in lines] == [
+        {"state": "NL", "city": "Monterrey", "status": "ok", "forecast": [{"date": "2024-10-02"}]},
+        {"state": "DF", "city": "Ciudad de México", "status": "unavailable", "forecast": []},
+        {"next_cursor": None},
+    ]
+    assert not response.has_header("X-Next-Cursor")
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_streams_sse(weather_forecast_view_instance, mock_city_service, mock_weather_service):
+    mock_city_service.get_city_coordinates.return_value = [
+        City("Monterrey", "NL", 25.6866, -100.3161),
+    ]
+
+    async def iter_weather_forecast(cities, projection=None):
+        yield 0, []
+    mock_weather_service.iter_weather_forecast = iter_weather_forecast
+    mock_request = Mock()
+    mock_request.GET = {"city": "monterrey", "stream": "sse"}
+
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+    content = (await read_streaming_content(response)).decode()
+
+    assert response["Content-Type"] == "text/event-stream"
+    assert content.startswith('event: forecast\ndata: {"state":"NL","city":"Monterrey","status":"unavailable","forecast":[]}\n\n')
+    assert content.endswith('event: end\ndata: {"count":1,"next_cursor":null}\n\n')
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream_format", ["ndjson", "sse"])
+async def test_get_weather_forecast_stream_pages_with_cursor(weather_forecast_view_instance, mock_city_service, mock_weather_service, stream_format):
+    cities = [City(f"Santa Cruz {index}", "MX", 19.0 + index, -99.0) for index in range(3)]
+    mock_city_service.get_city_coordinates.return_value = cities
+
+    async def iter_weather_forecast(page, projection=None):
+        for index, city in enumerate(page):
+            yield index, [{"date": city.name}]
+    mock_weather_service.iter_weather_forecast = iter_weather_forecast
+
+    def read_events(content):
+        if stream_format == "ndjson":
+            return [json.loads(line) for line in content.decode().splitlines()]
+        return [json.loads(event.split("\ndata: ")[1]) for event in content.decode().split("\n\n") if event]
+
+    mock_request = Mock()
+    mock_request.GET = {"city": "santa cruz", "stream": stream_format, "limit": "2"}
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+    first_page = read_events(await read_streaming_content(response))
+    assert [result["city"] for result in first_page[:-1]] == ["Santa Cruz 0", "Santa Cruz 1"]
+    assert first_page[-1]["next_cursor"] == response["X-Next-Cursor"]
+
+    mock_request.GET = {"city": "santa cruz", "stream": stream_format, "limit": "2", "cursor": response["X-Next-Cursor"]}
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+    last_page = read_events(await read_streaming_content(response))
+    assert [result["city"] for result in last_page[:-1]] == ["Santa Cruz 2"]
+    assert last_page[-1]["next_cursor"] is None
+    assert not response.has_header("X-Next-Cursor")
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_unknown_stream_format(weather_forecast_view_instance):
+    mock_request = Mock()
+    mock_request.GET = {"city": "monterrey", "stream": "xml"}
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_flags_timed_out_cities(weather_forecast_view_instance, mock_city_service, mock_weather_service):
+    mock_city_service.get_city_coordinates.return_value = [
+        City("Ciudad de México", "DF", 19.4326, -99.1332),
+        City("Monterrey", "NL", 25.6866, -100.3161),
+    ]
+    mock_weather_service.get_weather_forecast.return_value = [[{"date": "2024-10-02"}], None]
+    mock_request = Mock()
+    mock_request.GET = {"city": "mexico"}
+
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+    results = json.loads(response.content)["results"]
+
+    assert response.status_code == 200
+    assert [result["status"] for result in results] == ["ok", "timeout"]
+    assert results[1]["forecast"] == []
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_city_lookup_timeout(mock_city_service, mock_weather_service):
+    async def slow_lookup(city_name):
+        await asyncio.sleep(0.05)
+        raise asyncio.TimeoutError()
+    mock_city_service.get_city_coordinates.side_effect = slow_lookup
+    view = WeatherForecastView(city_service=mock_city_service, weather_service=mock_weather_service, request_deadline=0.01)
+    mock_request = Mock()
+    mock_request.GET = {"city": "mexico"}
+
+    response = await view.get_weather_forecast(mock_request)
+    assert response.status_code == 504
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_fetches_forecasts_for_requested_page_only(weather_forecast_view_instance, mock_city_service, mock_weather_service):
+    cities = [City(f"Santa Cruz {index}", "MX", 19.0 + index, -99.0) for index in range(5)]
+    mock_city_service.get_city_coordinates.return_value = cities
+    mock_weather_service.get_weather_forecast.side_effect = lambda page, projection=None: [[{"date": city.name}] for city in page]
+
+    mock_request = Mock()
+    mock_request.GET = {"city": "santa cruz", "limit": "2"}
+    first_page = json.loads((await weather_forecast_view_instance.get_weather_forecast(mock_request)).content)
+    mock_weather_service.get_weather_forecast.assert_awaited_once_with(cities[:2], projection=None)
+    assert [result["city"] for result in first_page["results"]] == ["Santa Cruz 0", "Santa Cruz 1"]
+
+    mock_request.GET = {"city": "santa cruz", "limit": "2", "cursor": first_page["next_cursor"]}
+    second_page = json.loads((await weather_forecast_view_instance.get_weather_forecast(mock_request)).content)
+    assert [result["city"] for result in second_page["results"]] == ["Santa Cruz 2", "Santa Cruz 3"]
+
+    mock_request.GET = {"city": "santa cruz", "limit": "2", "cursor": second_page["next_cursor"]}
+    last_page = json.loads((await weather_forecast_view_instance.get_weather_forecast(mock_request)).content)
+    assert [result["city"] for result in last_page["results"]] == ["Santa Cruz 4"]
+    assert last_page["next_cursor"] is None
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{"limit": "0"}, {"limit": "many"}, {"limit": "51"}, {"cursor": "not a cursor"}])
+async def test_get_weather_forecast_invalid_page(weather_forecast_view_instance, mock_city_service, params):
+    mock_request = Mock()
+    mock_request.GET = {"city": "santa cruz", **params}
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+    assert response.status_code == 400
+    mock_city_service.get_city_coordinates.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_passes_projection(weather_forecast_view_instance, mock_city_service, mock_weather_service):
+    mock_city_service.get_city_coordinates.return_value = [City("Monterrey", "NL", 25.6866, -100.3161)]
+    mock_weather_service.get_weather_forecast.return_value = [[{"date": "2024-10-02", "temperature_max": 77.0}]]
+    mock_request = Mock()
+    mock_request.GET = {"city": "monterrey", "days": "1", "fields": "temperature_max", "units": "imperial"}
+
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+
+    assert response.status_code == 200
+    assert mock_weather_service.get_weather_forecast.await_args.kwargs["projection"] == ForecastProjection(1, ("temperature_max",), "imperial")
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{"days": "0"}, {"days": "9"}, {"fields": "humidity"}, {"fields": ","}, {"units": "kelvin"}])
+async def test_get_weather_forecast_invalid_projection(weather_forecast_view_instance, params):
+    mock_request = Mock()
+    mock_request.GET = {"city": "monterrey", **params}
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_service_error_keeps_cities_and_cursor(weather_forecast_view_instance, mock_city_service, mock_weather_service):
+    cities = [City(f"Santa Cruz {index}", "MX", 19.0 + index, -99.0) for index in range(3)]
+    mock_city_service.get_city_coordinates.return_value = cities
+    mock_weather_service.get_weather_forecast.side_effect = IndexError("list index out of range")
+    mock_request = Mock()
+    mock_request.GET = {"city": "santa cruz", "limit": "2"}
+
+    response = await weather_forecast_view_instance.get_weather_forecast(mock_request)
+    content = json.loads(response.content)
+    assert [(result["city"], result["status"]) for result in content["results"]] == [("Santa Cruz 0", "unavailable"), ("Santa Cruz 1", "unavailable")]
+    assert content["next_cursor"] is not None
+    assert response["Cache-Control"] == "no-store"
@@ -1,8 +1,13 @@
+import asyncio
+import time
 from unittest.mock import patch, AsyncMock
 import pytest
+from weather.deadline import deadline_scope
 from weather.services.weather_service_impl import WeatherService
 from weather.clients.openweather_impl import OpenWeatherClient
-from weather.services.services_constants import CACHE_TIME_OUT_FORECAST
+from weather.services.services_constants import CACHE_STALE_TIME_OUT_FORECAST, CACHE_TIME_OUT_FORECAST
+from weather.services.models import City, DailyForecast, format_forecast_date
+from weather.services.projection import ForecastProjection
 
 @pytest.fixture
 def mock_openweather_client():
@@ -20,7 +25,7 @@ async def test_get_weather_forecast_no_cache(weather_service, mock_openweather_c
             {"dt": 1634143200, "temp": {"max": 22.0, "min": 14.0}, "weather": [{"description": "partly cloudy"}]}
         ]
     }
-    city_list = [{"name": "Ciudad de México", "latitude": 19.4326, "longitude": -99.1332}]
+    city_list = [City("Ciudad de México", None, 19.4326, -99.1332)]
     
     with patch("django.core.cache.cache.get", return_value=None) as mock_cache_get, \
          patch("django.core.cache.cache.set") as mock_cache_set:
@@ -28,22 +33,27 @@ async def test_get_weather_forecast_no_cache(weather_service, mock_openweather_c
         result = await weather_service.get_weather_forecast(city_list)
         expected_result = [
             [
-                {"date": "2021-10-12", "temperature_max": 25.0, "temperature_min": 15.0, "weather": "clear sky"},
-                {"date": "2021-10-13", "temperature_max": 22.0, "temperature_min": 14.0, "weather": "partly cloudy"}
+                DailyForecast("2021-10-12", 25.0, 15.0, "clear sky"),
+                DailyForecast("2021-10-13", 22.0, 14.0, "partly cloudy")
             ]
         ]
         
         assert result == expected_result
-        mock_cache_set.assert_called_once_with("weather_forecast_19.4326_-99.1332", expected_result[0], timeout=CACHE_TIME_OUT_FORECAST)
+        mock_cache_set.assert_called_once()
+        cache_key, (soft_expires_at, cached_forecast), timeout, _ = mock_cache_set.call_args.args
+        assert cache_key == "weather_forecast_19.43_-99.13"
+        assert cached_forecast == expected_result[0]
+        assert soft_expires_at == pytest.approx(time.time() + CACHE_TIME_OUT_FORECAST, abs=5)
+        assert timeout == CACHE_TIME_OUT_FORECAST + CACHE_STALE_TIME_OUT_FORECAST
 
 @pytest.mark.asyncio
 async def test_get_weather_forecast_with_cache(weather_service):
     cached_data = [
-        {"date": "2021-10-12", "temperature_max": 25.0, "temperature_min": 15.0, "weather": "clear sky"}
+        DailyForecast("2021-10-12", 25.0, 15.0, "clear sky")
     ]
-    city_list = [{"name": "Ciudad de México", "latitude": 19.4326, "longitude": -99.1332}]
+    city_list = [City("Ciudad de México", None, 19.4326, -99.1332)]
     
-    with patch("django.core.cache.cache.get", return_value=cached_data) as mock_cache_get:
+    with patch("django.core.cache.cache.get", return_value=(time.time() + 60, cached_data)) as mock_cache_get:
         result = await weather_service.get_weather_forecast(city_list)
         assert result == [cached_data]
         weather_service.openweather_client.get_weather.assert_not_called()
@@ -51,14 +61,40 @@ async def test_get_weather_forecast_with_cache(weather_service):
 @pytest.mark.asyncio
 async def test_get_weather_forecast_empty_response(weather_service, mock_openweather_client):
     mock_openweather_client.get_weather.return_value = {}
-    city_list = [{"name": "Ciudad de México", "latitude": 19.4326, "longitude": -99.1332}]
+    city_list = [City("Ciudad de México", None, 19.4326, -99.1332)]
     
     with patch("django.core.cache.cache.get", return_value=None) as mock_cache_get, \
          patch("django.core.cache.cache.set") as mock_cache_set:
         
         result = await weather_service.get_weather_forecast(city_list)
         assert result == [[]]
-        mock_cache_set.assert_called_once_with("weather_forecast_19.4326_-99.1332", [], timeout=CACHE_TIME_OUT_FORECAST)
+        mock_cache_set.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_stale_is_served_and_refreshed(weather_service, mock_openweather_client):
+    stale_data = [DailyForecast("2021-10-12", 25.0, 15.0, "clear sky")]
+    mock_openweather_client.get_weather.return_value = {
+        "daily": [{"dt": 1634143200, "temp": {"max": 22.0, "min": 14.0}, "weather": [{"description": "partly cloudy"}]}]
+    }
+    city_list = [City("Ciudad de México", None, 19.4326, -99.1332)]
+
+    with patch("django.core.cache.cache.get", return_value=(time.time() - 1, stale_data)), \
+         patch("django.core.cache.cache.set") as mock_cache_set:
+        result = await weather_service.get_weather_forecast(city_list)
+        assert result == [stale_data]
+        await asyncio.gather(*weather_service.single_flight._background_tasks)
+
+    mock_openweather_client.get_weather.assert_awaited_once_with(19.43, -99.13)
+    assert mock_cache_set.call_args.args[1][1][0].weather == "partly cloudy"
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_upstream_error_keeps_stale(weather_service, mock_openweather_client):
+    stale_data = [DailyForecast("2021-10-12", 25.0, 15.0, "clear sky")]
+    mock_openweather_client.get_weather.return_value = {}
+
+    cell = weather_service.quantizer.quantize(19.4326, -99.1332)
+    result = await weather_service._fetch_daily_forecast(cell, stale=stale_data)
+    assert result == stale_data
 
 def test_build_daily_forecast(weather_service):
     weather_data = {
@@ -68,13 +104,156 @@ def test_build_daily_forecast(weather_service):
         ]
     }
     expected_result = [
-        {"date": "2024-10-02", "temperature_max": 25.0, "temperature_min": 15.0, "weather": "clear sky"},
-        {"date": "2024-10-03", "temperature_max": 22.0, "temperature_min": 14.0, "weather": "partly cloudy"}
+        DailyForecast("2024-10-02", 25.0, 15.0, "clear sky"),
+        DailyForecast("2024-10-03", 22.0, 14.0, "partly cloudy")
     ]
     result = weather_service._build_daily_forecast(weather_data)
     assert result == expected_result
 
-def test_convert_unix_to_date(weather_service):
+def test_format_forecast_date():
     unix_timestamp = 1727839969
-    result = weather_service._convert_unix_to_date(unix_timestamp)
+    result = format_forecast_date(unix_timestamp)
     assert result == "2024-10-02"
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_coalesces_concurrent_misses(weather_service, mock_openweather_client):
+    async def slow_weather(latitude, longitude):
+        await asyncio.sleep(0.01)
+        return {"daily": []}
+    mock_openweather_client.get_weather.side_effect = slow_weather
+    city_list = [City("Ciudad de México", None, 19.4326, -99.1332)]
+
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.set"):
+        await asyncio.gather(*(weather_service.get_weather_forecast(city_list) for _ in range(5)))
+    mock_openweather_client.get_weather.assert_awaited_once_with(19.43, -99.13)
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_nearby_cities_share_one_call(weather_service, mock_openweather_client):
+    mock_openweather_client.get_weather.return_value = {
+        "daily": [{"dt": 1634056800, "temp": {"max": 25.0, "min": 15.0}, "weather": [{"description": "clear sky"}]}]
+    }
+    city_list = [
+        City("Ciudad de México", None, 19.4326, -99.1332),
+        City("Centro", None, 19.4284, -99.1276),
+    ]
+
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.set") as mock_cache_set:
+        result = await weather_service.get_weather_forecast(city_list)
+
+    assert result[0] == result[1]
+    mock_openweather_client.get_weather.assert_awaited_once_with(19.43, -99.13)
+    mock_cache_set.assert_called_once()
+    assert weather_service.forecast_cache.stats.coalesced == 1
+    assert weather_service.forecast_cache.stats.misses == 1
+
+@pytest.mark.asyncio
+async def test_iter_weather_forecast_yields_cached_cities_first(weather_service, mock_openweather_client):
+    cached_data = [DailyForecast("2021-10-12", 25.0, 15.0, "clear sky")]
+    mock_openweather_client.get_weather.return_value = {
+        "daily": [{"dt": 1634143200, "temp": {"max": 22.0, "min": 14.0}, "weather": [{"description": "partly cloudy"}]}]
+    }
+    city_list = [
+        City("Monterrey", None, 25.6866, -100.3161),
+        City("Ciudad de México", None, 19.4326, -99.1332),
+    ]
+
+    def cache_get(key, *args):
+        return (time.time() + 60, cached_data) if key == "weather_forecast_19.43_-99.13" else None
+
+    with patch("django.core.cache.cache.get", side_effect=cache_get), \
+         patch("django.core.cache.cache.set"):
+        results = [item async for item in weather_service.iter_weather_forecast(city_list)]
+
+    assert results[0] == (1, cached_data)
+    assert results[1][0] == 0
+    assert results[1][1][0].weather == "partly cloudy"
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_returns_partial_results_at_deadline(weather_service, mock_openweather_client):
+    async def get_weather(latitude, longitude):
+        if latitude > 20:
+            await asyncio.sleep(1)
+        return {"daily": [{"dt": 1634056800, "temp": {"max": 25.0, "min": 15.0}, "weather": [{"description": "clear sky"}]}]}
+    mock_openweather_client.get_weather.side_effect = get_weather
+    city_list = [
+        City("Ciudad de México", None, 19.4326, -99.1332),
+        City("Monterrey", None, 25.6866, -100.3161),
+    ]
+
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.set"), \
+         deadline_scope(0.05):
+        result = await weather_service.get_weather_forecast(city_list)
+
+    assert result[0][0].weather == "clear sky"
+    assert result[1] is None
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_batches_cache_reads_and_writes(mock_openweather_client):
+    cached_data = [DailyForecast("2021-10-12", 25.0, 15.0, "clear sky")]
+    mock_openweather_client.get_weather.return_value = {
+        "daily": [{"dt": 1634143200, "temp": {"max": 22.0, "min": 14.0}, "weather": [{"description": "partly cloudy"}]}]
+    }
+    cache_backend = AsyncMock()
+    cache_backend.aget_many.return_value = {"weather_forecast_19.43_-99.13": (time.time() + 60, cached_data)}
+    weather_service = WeatherService(openweather_client=mock_openweather_client, cache_backend=cache_backend)
+    city_list = [
+        City("Ciudad de México", None, 19.4326, -99.1332),
+        City("Monterrey", None, 25.6866, -100.3161),
+        City("Guadalajara", None, 20.6597, -103.3496),
+    ]
+
+    result = await weather_service.get_weather_forecast(city_list)
+
+    assert result[0] == cached_data
+    assert result[1][0].weather == "partly cloudy"
+    cache_backend.aget_many.assert_awaited_once_with(
+        ["weather_forecast_19.43_-99.13", "weather_forecast_25.69_-100.32", "weather_forecast_20.66_-103.35"]
+    )
+    cache_backend.aset_many.assert_awaited_once()
+    assert set(cache_backend.aset_many.call_args.args[0]) == {"weather_forecast_25.69_-100.32", "weather_forecast_20.66_-103.35"}
+    assert mock_openweather_client.get_weather.await_count == 2
+
+@pytest.mark.asyncio
+async def test_get_weather_forecast_projects_from_full_cached_forecast(weather_service):
+    cached_data = [
+        DailyForecast("2021-10-12", 25.0, 15.0, "clear sky"),
+        DailyForecast("2021-10-13", 22.0, 14.0, "partly cloudy"),
+    ]
+    city_list = [City("Ciudad de México", None, 19.4326, -99.1332)]
+    projection = ForecastProjection(days=1, fields=("temperature_max", "weather"), units="imperial")
+
+    with patch("django.core.cache.cache.get", return_value=(time.time() + 60, cached_data)):
+        result = await weather_service.get_weather_forecast(city_list, projection=projection)
+
+    assert result == [[{"date": "2021-10-12", "temperature_max": 77.0, "weather": "clear sky"}]]
+    weather_service.openweather_client.get_weather.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_malformed_forecast_only_marks_its_city_unavailable(weather_service, mock_openweather_client):
+    async def get_weather(latitude, longitude):
+        weather = [] if latitude == 25.69 else [{"description": "clear sky"}]
+        return {"daily": [{"dt": 1634056800, "temp": {"max": 25.0, "min": 15.0}, "weather": weather}]}
+    mock_openweather_client.get_weather.side_effect = get_weather
+    city_list = [City("Ciudad de México", None, 19.4326, -99.1332), City("Monterrey", None, 25.6866, -100.3161)]
+
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.set"):
+        result = await weather_service.get_weather_forecast(city_list)
+        streamed = dict([item async for item in weather_service.iter_weather_forecast(city_list)])
+    assert result == [[DailyForecast("2021-10-12", 25.0, 15.0, "clear sky")], []]
+    assert streamed == {0: result[0], 1: []}
+
+@pytest.mark.asyncio
+async def test_empty_daily_forecast_is_not_cached(weather_service, mock_openweather_client):
+    mock_openweather_client.get_weather.return_value = {"daily": []}
+    city_list = [City("Ciudad de México", None, 19.4326, -99.1332)]
+    with patch("django.core.cache.cache.get", return_value=None), \
+         patch("django.core.cache.cache.set") as mock_cache_set:
+        assert await weather_service.get_weather_forecast(city_list) == [[]]
+    mock_cache_set.assert_not_called()
+    stale = [DailyForecast("2021-10-12", 25.0, 15.0, "clear sky")]
+    cell = weather_service.quantizer.quantize(19.4326, -99.1332)
+    assert await weather_service._fetch_daily_forecast(cell, stale=stale) == stale
@@ -1,6 +1,8 @@
 from django.urls import path
-from .views import weather_forecast
+from .views import weather_forecast, weather_forecast_batch, weather_metrics
 
 urlpatterns = [
     path('forecast/', weather_forecast, name='weather_forecast'),
+    path('forecast/batch/', weather_forecast_batch, name='weather_forecast_batch'),
+    path('metrics/', weather_metrics, name='weather_metrics'),
 ]
\ No newline at end of file
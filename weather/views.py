@@ -1,61 +1,311 @@
+import asyncio
 import logging
-from django.http import JsonResponse, HttpRequest
+import os
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from django.http import JsonResponse, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from weather import deadline, metrics
 from weather.services.city_service import ICityService, CityList
+from weather.services.models import City
+from weather.services.popularity import PopularityTracker
+from weather.services.projection import ForecastProjection
+from weather.services.text_normalization import normalize_query
 from weather.services.weather_service import IWeatherService, ForecastList
-from weather.inject_container import container
+from weather.json_codec import FastJsonResponse, JsonCodec, get_codec
+from weather.metrics_constants import METRICS_CONTENT_TYPE
+from weather.pagination import decode_cursor, next_cursor
+from weather.response_cache import ResponseCache
+from weather.views_constants import (
+    BATCH_MAX_CONCURRENCY,
+    BATCH_MAX_QUERIES,
+    FORECAST_PAGE_DEFAULT_LIMIT,
+    FORECAST_PAGE_MAX_LIMIT,
+    REQUEST_DEADLINE,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    STATUS_UNAVAILABLE,
+    STREAM_CONTENT_TYPES,
+)
 
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 class WeatherForecastView:
-    def __init__(self, city_service: ICityService, weather_service: IWeatherService) -> None:
+    def __init__(
+        self,
+        city_service: ICityService,
+        weather_service: IWeatherService,
+        request_deadline: float = REQUEST_DEADLINE,
+        popularity: Optional[PopularityTracker] = None,
+        codec: Optional[JsonCodec] = None,
+        response_cache: Optional[ResponseCache] = None,
+    ) -> None:
         self.city_service = city_service
         self.weather_service = weather_service
+        self.request_deadline = request_deadline
+        self.popularity = popularity
+        self.codec = codec or get_codec()
+        self.response_cache = response_cache
 
-    async def get_weather_forecast(self, request: HttpRequest) -> JsonResponse:
+    async def get_weather_forecast(self, request: HttpRequest) -> HttpResponse:
         city_name = request.GET.get("city", "")
         if not city_name:
             return JsonResponse({"error": "No city name provided."}, status=400)
 
-        cities = await self._get_city_coordinates(city_name)
-        if not cities:
-            logger.error("No cities found for the given name.")
-            return JsonResponse({"error": "No cities found for the given name."}, status=404)
+        stream_format = request.GET.get("stream", "")
+        if stream_format and stream_format not in STREAM_CONTENT_TYPES:
+            return JsonResponse({"error": f"Unsupported stream format: {stream_format}."}, status=400)
+
+        try:
+            limit, offset = self._get_page(request)
+            projection = ForecastProjection.from_params(
+                request.GET.get("days", ""),
+                request.GET.get("fields", ""),
+                request.GET.get("units", ""),
+            )
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        if self.popularity is not None and not offset:
+            self.popularity.record(city_name)
+
+        response_cache_key = None
+        if self.response_cache is not None and not stream_format:
+            response_cache_key = self.response_cache.cache_key(
+                "forecast",
+                {"city": normalize_query(city_name), "limit": limit, "offset": offset, **(projection.cache_params() if projection else {})},
+            )
+            cached_response = self.response_cache.get(response_cache_key)
+            if cached_response is not None:
+                return self.response_cache.build_response(request, cached_response)
+
+        with deadline.deadline_scope(self.request_deadline) as deadline_at:
+            with metrics.measure("city"):
+                cities = await self._get_city_coordinates(city_name)
+            if not cities:
+                if deadline.expired():
+                    return JsonResponse({"error": "Timed out looking up cities."}, status=504)
+                logger.error("No cities found for the given name.")
+                return JsonResponse({"error": "No cities found for the given name."}, status=404)
+
+            # Forecasts are only fetched for the page returned, so upstream calls follow the limit rather than the match count.
+            page = cities[offset:offset + limit]
+            page_cursor = next_cursor(offset, limit, len(cities))
+            if stream_format:
+                return self._build_streaming_response(page, stream_format, deadline_at, projection, page_cursor)
+
+            with metrics.measure("forecast"):
+                forecasts = await self._get_weather_forecast(page, projection) if page else []
+            response = self._build_response(page, forecasts, page_cursor)
+            if not forecasts or any(self._get_forecast_status(forecast) != STATUS_OK for forecast in forecasts):
+                # Partial results must not be held by clients or CDNs once the upstream recovers.
+                response["Cache-Control"] = "no-store"
+            elif response_cache_key is not None:
+                cached_response = self.response_cache.set(response_cache_key, response.content)
+                return self.response_cache.build_response(request, cached_response)
+            return response
+
+    def _get_page(self, request: HttpRequest) -> Tuple[int, int]:
+        try:
+            limit = int(request.GET.get("limit", FORECAST_PAGE_DEFAULT_LIMIT))
+        except ValueError:
+            raise ValueError("limit must be an integer.")
+        if not 1 <= limit <= FORECAST_PAGE_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {FORECAST_PAGE_MAX_LIMIT}.")
+        cursor = request.GET.get("cursor", "")
+        return limit, decode_cursor(cursor) if cursor else 0
+
+    async def get_batch_weather_forecast(self, request: HttpRequest) -> HttpResponse:
+        with deadline.deadline_scope(self.request_deadline):
+            return await self._get_batch_weather_forecast(request)
+
+    async def _get_batch_weather_forecast(self, request: HttpRequest) -> HttpResponse:
+        try:
+            queries = self.codec.loads(request.body).get("queries")
+        except (ValueError, AttributeError):
+            return JsonResponse({"error": "Invalid JSON body."}, status=400)
+        if not isinstance(queries, list) or not queries:
+            return JsonResponse({"error": "No queries provided."}, status=400)
+        if len(queries) > BATCH_MAX_QUERIES:
+            return JsonResponse({"error": f"A batch accepts at most {BATCH_MAX_QUERIES} queries."}, status=400)
+
+        try:
+            with metrics.measure("city"):
+                cities_per_query = await self._resolve_batch_queries(queries)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        unique_cities: Dict[Any, City] = {}
+        for cities in cities_per_query:
+            for city in cities or []:
+                unique_cities.setdefault((city.latitude, city.longitude), city)
+        with metrics.measure("forecast"):
+            forecasts = await self._get_weather_forecast(list(unique_cities.values())) if unique_cities else []
+        forecast_by_coordinates = dict(zip(unique_cities, forecasts))
+        return FastJsonResponse({
+            "results": [
+                self._build_batch_result(query, cities, forecast_by_coordinates)
+                for query, cities in zip(queries, cities_per_query)
+            ]
+        }, codec=self.codec)
+
+    async def _resolve_batch_queries(self, queries: List[Any]) -> List[CityList]:
+        coordinate_cities = {
+            index: self._build_coordinate_city(query)
+            for index, query in enumerate(queries)
+            if not isinstance(query, str)
+        }
+        city_names = list(dict.fromkeys(query for query in queries if isinstance(query, str)))
+        if any(not city_name.strip() for city_name in city_names):
+            raise ValueError("City names must not be empty.")
+        if self.popularity is not None:
+            for city_name in city_names:
+                self.popularity.record(city_name)
+
+        semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+        async def lookup(city_name: str) -> CityList:
+            async with semaphore:
+                return await self._get_city_coordinates(city_name)
 
-        forecasts = await self._get_weather_forecast(cities)
-        return self._build_response(cities, forecasts)
+        cities_by_name = dict(zip(city_names, await asyncio.gather(*(lookup(city_name) for city_name in city_names))))
+        return [
+            coordinate_cities[index] if index in coordinate_cities else cities_by_name[query]
+            for index, query in enumerate(queries)
+        ]
+
+    def _build_coordinate_city(self, query: Any) -> List[City]:
+        if not isinstance(query, dict):
+            raise ValueError("Each query must be a city name or an object with latitude and longitude.")
+        try:
+            latitude, longitude = float(query["latitude"]), float(query["longitude"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Coordinate queries need numeric latitude and longitude.")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError("Coordinates are out of range.")
+        return [City(query.get("name") or f"{latitude},{longitude}", query.get("state"), latitude, longitude)]
+
+    def _build_batch_result(self, query: Any, cities: Optional[CityList], forecast_by_coordinates: Dict) -> Dict[str, Any]:
+        if not cities:
+            error = "Timed out looking up cities." if deadline.expired() else "No cities found for the given name."
+            return {"query": query, "error": error, "results": []}
+        forecasts = [forecast_by_coordinates.get((city.latitude, city.longitude), []) for city in cities]
+        return {"query": query, "results": self._build_results(cities, forecasts)}
         
     async def _get_city_coordinates(self, city_name: str) -> CityList:
         try:
             return await self.city_service.get_city_coordinates(city_name)
+        except asyncio.TimeoutError:
+            logger.error(f"Request deadline reached getting city coordinates from {city_name}")
+            return None
         except Exception as e:
             logger.error(f"Error getting city coordinates from {city_name}: {e}")
             return None
 
-    async def _get_weather_forecast(self, cities: CityList) -> ForecastList:
+    async def _get_weather_forecast(self, cities: CityList, projection: Optional[ForecastProjection] = None) -> ForecastList:
         try:
-            return await self.weather_service.get_weather_forecast(cities)
+            return await self.weather_service.get_weather_forecast(cities, projection=projection)
         except Exception as e:
             logger.error(f"Error getting forecast: {e}")
-            return []
+            return [[] for _ in cities]
         
-    def _build_response(self, cities: CityList, forecasts: ForecastList) -> JsonResponse:
-        results = [
+    def _build_streaming_response(
+        self,
+        cities: CityList,
+        stream_format: str,
+        deadline_at: float,
+        projection: Optional[ForecastProjection] = None,
+        page_cursor: Optional[str] = None,
+    ) -> StreamingHttpResponse:
+        response = StreamingHttpResponse(
+            self._stream_results(cities, stream_format, deadline_at, projection, page_cursor),
+            content_type=STREAM_CONTENT_TYPES[stream_format],
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        if page_cursor is not None:
+            response["X-Next-Cursor"] = page_cursor
+        return response
+
+    async def _stream_results(
+        self,
+        cities: CityList,
+        stream_format: str,
+        deadline_at: float,
+        projection: Optional[ForecastProjection] = None,
+        page_cursor: Optional[str] = None,
+    ) -> AsyncIterator[bytes]:
+        # The body is produced after the view returns, so the request deadline is re-entered here.
+        try:
+            with deadline.deadline_scope(at=deadline_at):
+                async for index, forecast in self.weather_service.iter_weather_forecast(cities, projection=projection):
+                    result = self._build_results([cities[index]], [forecast])[0]
+                    yield self._encode_stream_event("forecast", result, stream_format)
+        except Exception as e:
+            logger.error(f"Error streaming forecast: {e}")
+            yield self._encode_stream_event("error", {"error": "Error getting forecast."}, stream_format)
+            return
+        if stream_format == "sse":
+            yield self._encode_stream_event("end", {"count": len(cities), "next_cursor": page_cursor}, stream_format)
+        else:
+            yield self._encode_stream_event("end", {"next_cursor": page_cursor}, stream_format)
+
+    def _encode_stream_event(self, event: str, data: Dict[str, Any], stream_format: str) -> bytes:
+        payload = self.codec.dumps(data)
+        if stream_format == "sse":
+            return b"event: " + event.encode() + b"\ndata: " + payload + b"\n\n"
+        return payload + b"\n"
+
+    def _build_response(self, cities: CityList, forecasts: ForecastList, next_cursor: Optional[str] = None) -> HttpResponse:
+        return FastJsonResponse({"results": self._build_results(cities, forecasts), "next_cursor": next_cursor}, codec=self.codec)
+
+    def _build_results(self, cities: CityList, forecasts: ForecastList) -> List[Dict[str, Any]]:
+        return [
             {
-                "state": city["state"],
-                "city": city["name"],
-                "forecast": forecast
+                "state": city.state,
+                "city": city.name,
+                "status": self._get_forecast_status(forecast),
+                "forecast": forecast or []
             }
             for city, forecast in zip(cities, forecasts)
         ]
-        return JsonResponse({"results": results})
 
+    def _get_forecast_status(self, forecast: ForecastList) -> str:
+        if forecast is None:
+            return STATUS_TIMEOUT
+        return STATUS_OK if forecast else STATUS_UNAVAILABLE
 
-weather_forecast_view = WeatherForecastView(
-    city_service=container.get_city_service(),
-    weather_service=container.get_weather_service()
-)
 
+@lru_cache(maxsize=1)
+def build_weather_forecast_view(container: Any) -> WeatherForecastView:
+    return WeatherForecastView(
+        city_service=container.get_city_service(),
+        weather_service=container.get_weather_service(),
+        popularity=container.get_popularity_tracker(),
+        codec=container.get_codec(),
+        response_cache=container.get_response_cache(),
+    )
+
+def get_weather_forecast_view() -> WeatherForecastView:
+    # Importing the container pulls in every client, so it is deferred until the first request.
+    from weather.inject_container import get_container
+
+    return build_weather_forecast_view(get_container())
+
+server_timing_enabled = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+@metrics.instrument_view("forecast", add_server_timing=server_timing_enabled)
 async def weather_forecast(request):
-    return await weather_forecast_view.get_weather_forecast(request)
+    return await get_weather_forecast_view().get_weather_forecast(request)
+
+@csrf_exempt
+@require_POST
+@metrics.instrument_view("forecast_batch", add_server_timing=server_timing_enabled)
+async def weather_forecast_batch(request):
+    return await get_weather_forecast_view().get_batch_weather_forecast(request)
+
+async def weather_metrics(request):
+    return HttpResponse(metrics.registry.render(), content_type=METRICS_CONTENT_TYPE)
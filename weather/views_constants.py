@@ -0,0 +1,13 @@
+BATCH_MAX_QUERIES=50
+BATCH_MAX_CONCURRENCY=10 # city lookups in flight per batch request
+STREAM_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+REQUEST_DEADLINE=8.0 # seconds of latency budget per request, shared by city and forecast lookups
+STATUS_OK="ok"
+STATUS_TIMEOUT="timeout" # forecast still pending at the request deadline
+STATUS_UNAVAILABLE="unavailable" # upstream returned no forecast and nothing was cached
+RESPONSE_CACHE_TIME_OUT=300 # seconds, matches CACHE_TIME_OUT_FORECAST so clients never hold a response past its forecast
+FORECAST_PAGE_DEFAULT_LIMIT=10 # cities per /api/forecast/ page, forecasts are only fetched for these
+FORECAST_PAGE_MAX_LIMIT=50
@@ -13,4 +13,25 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "weather_api.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from weather.lifespan import LifespanMiddleware  # noqa: E402
+
+
+async def warm_up_container():
+    from weather.inject_container import get_container
+
+    await get_container().warm_up()
+
+
+async def close_container():
+    from weather.inject_container import get_container
+
+    await get_container().aclose()
+
+
+application = LifespanMiddleware(
+    django_application,
+    on_startup=[warm_up_container],
+    on_shutdown=[close_container],
+)
@@ -0,0 +1,31 @@
+"""
+Lean settings profile for serving the weather API.
+
+Drops the admin, auth, sessions, messages, CSRF and clickjacking layers and
+the database, none of which /api/ uses. Set DJANGO_ADMIN_ENABLED=true to keep
+the full stack and the admin/ route.
+"""
+
+from weather_api.settings import *  # noqa: F401,F403
+from weather_api.settings import os
+
+ADMIN_ENABLED = os.getenv("DJANGO_ADMIN_ENABLED", "false").lower() == "true"
+
+if not ADMIN_ENABLED:
+    INSTALLED_APPS = [
+        "weather",
+    ]
+
+    MIDDLEWARE = [
+        "django.middleware.security.SecurityMiddleware",
+        "django.middleware.common.CommonMiddleware",
+    ]
+
+    TEMPLATES = []
+
+    # No database is configured, so any accidental query fails loudly instead of opening SQLite.
+    DATABASES = {}
+
+    AUTH_PASSWORD_VALIDATORS = []
+
+    USE_I18N = False